@@ -1,14 +1,18 @@
 """客户端用户认证 API（注册、登录等）"""
 
+import asyncio
+
 from sqlalchemy.exc import IntegrityError
 
 from fastapi import APIRouter, Depends, Request, status
 
 # Services
+from app.services.counter_service import counter_service
 from app.services.email_verification_service import (
     SendResult,
     email_verification_service,
 )
+from app.services.quota_service import quota_service
 from app.services.user_auth_service import user_auth_service
 from app.services.user_service import user_service
 from app.services.user_token_service import user_token_service
@@ -56,8 +60,23 @@ _rate_limiter = RedisFixedLimiter(key_prefix="login_rate_limit")
 _ip_block_manager = IPBlockManager(key_prefix="ip_block")
 
 
+async def _merge_anonymous_usage(user_id: int, device_id: str) -> None:
+    """把游客设备的计数和当日配额合并到用户（失败只记录日志，不影响登录）"""
+    results = await asyncio.gather(
+        counter_service.merge_anonymous_to_user(user_id, device_id),
+        quota_service.merge_anonymous_to_user(user_id, device_id),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(
+                f"Failed to merge anonymous usage: user_id={user_id}, "
+                f"device_id={device_id}, error={result}"
+            )
+
+
 async def _complete_login_flow(user: UserModel, request: Request) -> LoginResponse:
-    """完成登录后的通用流程（生成Token、创建会话、更新登录信息）.
+    """完成登录后的通用流程（生成Token、创建会话、更新登录信息、合并游客数据）.
 
     Args:
         user: 用户对象
@@ -67,17 +86,14 @@ async def _complete_login_flow(user: UserModel, request: Request) -> LoginRespon
         LoginResponse: 登录响应
     """
     # 生成 Token
-    access_token, refresh_token, expires_in = user_auth_service.create_tokens_for_user(
-        user,
-    )
+    tokens = user_auth_service.create_tokens_for_user(user)
 
     # 创建会话
     ip_address = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent")
     await user_auth_service.create_user_session(
         user,
-        access_token,
-        refresh_token,
+        tokens,
         ip_address,
         user_agent,
     )
@@ -85,11 +101,16 @@ async def _complete_login_flow(user: UserModel, request: Request) -> LoginRespon
     # 更新登录信息
     await user_auth_service.update_user_login_info(user)
 
+    # 合并游客设备的计数和配额
+    device_id = request.headers.get("X-Device-Id")
+    if device_id:
+        await _merge_anonymous_usage(user.id, device_id)
+
     return LoginResponse(
-        access_token=access_token,
-        refresh_token=refresh_token,
+        access_token=tokens.access_token,
+        refresh_token=tokens.refresh_token,
         token_type=TokenType.BEARER.value,
-        expires_in=expires_in,
+        expires_in=tokens.expires_in,
         user=user.to_user_info(),
     )
 
@@ -131,8 +152,8 @@ async def login(data: LoginRequest, request: Request):
     ip_address = request.client.host if request.client else "unknown"
 
     # 检查 IP 是否被封禁
-    if await _ip_block_manager.is_blocked(ip_address):
-        remaining_time = await _ip_block_manager.get_remaining_time(ip_address)
+    blocked, remaining_time = await _ip_block_manager.check(ip_address)
+    if blocked:
         logger.warning(
             f"Blocked IP {ip_address} attempted login, remaining: {remaining_time}s",
         )
@@ -228,36 +249,32 @@ async def refresh_token(data: RefreshTokenRequest):
     if not ok:
         raise AppCommonException(code=CommonCode.AUTH_INVALID_CREDENTIALS)
 
-    new_access_token, new_refresh_token, expires_in = (
-        user_auth_service.create_tokens_for_user(user)
-    )
-
-    new_refresh_jwt_data = JwtUnit.decode_token(new_refresh_token)
-    new_refresh_expires_at = new_refresh_jwt_data.exp if new_refresh_jwt_data else 0
+    tokens = user_auth_service.create_tokens_for_user(user)
 
     rotation_success = await user_token_service.rotate_refresh_token(
         old_refresh_token=data.refresh_token,
-        new_refresh_token=new_refresh_token,
+        new_refresh_token=tokens.refresh_token,
         user_id=jwt_data.user_id,
-        new_expires_at=new_refresh_expires_at,
+        new_expires_at=tokens.refresh_expires_at,
     )
 
     if not rotation_success:
         logger.error(f"Failed to rotate refresh token for user_id={jwt_data.user_id}")
 
+    # 新 access token 使用自己的过期时间（而不是旧 refresh token 的）
     await user_auth_service.token_ops.store_token(
-        new_access_token,
+        tokens.access_token,
         jwt_data.user_id,
         TokenType.USER_ACCESS,
-        jwt_data.exp,
+        tokens.access_expires_at,
     )
 
     return ResponseUtils.ok(
         {
-            "access_token": new_access_token,
-            "refresh_token": new_refresh_token,
+            "access_token": tokens.access_token,
+            "refresh_token": tokens.refresh_token,
             "token_type": TokenType.BEARER.value,
-            "expires_in": expires_in,
+            "expires_in": tokens.expires_in,
         }
     )
 
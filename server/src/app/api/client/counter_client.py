@@ -11,6 +11,7 @@ from app.api.user_dependencies import (
     get_current_user_optional,
 )
 from app.constants.counter import CounterType
+from app.schemas.counter_schema import IncrementBatchRequest
 from app.services.counter_service import counter_service
 from app.utils.response import ResponseUtils
 
@@ -52,6 +53,27 @@ async def increment_counter(
     return ResponseUtils.ok({"counter_type": counter_type, "value": new_value})
 
 
+@router.post("/increment-batch")
+async def increment_counter_batch(
+    data: IncrementBatchRequest,
+    current_user: Optional[UserContext] = Depends(get_current_user_optional),
+):
+    """
+    批量增加计数器
+
+    一次请求、一次 Redis 调用更新多个计数器，用于一个用户动作触发多个计数的场景
+    """
+    user_id, device_id = _extract_user_or_device_id(current_user)
+
+    values = await counter_service.increment_many(
+        user_id=user_id,
+        device_id=device_id,
+        deltas=data.deltas,
+    )
+
+    return ResponseUtils.ok({"counters": {k.value: v for k, v in values.items()}})
+
+
 @router.get("/get")
 async def get_counter(
     counter_type: CounterType,
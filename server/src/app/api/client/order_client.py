@@ -1,8 +1,11 @@
 """订单管理 API - 客户端接口"""
 
-from fastapi import APIRouter, Depends, Request
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
 
 from app.api.user_dependencies import UserContext, get_current_user
+from app.constants.order import ORDER_LIST_MAX_LIMIT
 from app.i18n.common_code import CommonCode
 from app.schemas.order_schema import (
     CreateOrderRequest,
@@ -122,22 +125,24 @@ async def get_order_status(
 
 @router.get("/list")
 async def list_orders(
-    status: str = None,
-    offset: int = 0,
-    limit: int = 20,
+    status: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=ORDER_LIST_MAX_LIMIT),
+    with_total: bool = False,
     current_user: UserContext = Depends(get_current_user),
 ):
-    """获取订单列表
+    """获取订单列表（游标分页，按创建时间倒序）
 
     参数:
     - status: 订单状态（可选）
-    - offset: 偏移量
-    - limit: 限制数量
+    - cursor: 上一页返回的 next_cursor，不传表示第一页
+    - limit: 每页数量
+    - with_total: 是否返回订单总数（缓存的统计值）
     """
-    orders = await order_service.get_user_orders(
+    orders, next_cursor = await order_service.get_user_orders(
         user_id=current_user.user_id,
         status=status,
-        offset=offset,
+        cursor=cursor,
         limit=limit,
     )
 
@@ -155,14 +160,17 @@ async def list_orders(
         for o in orders
     ]
 
-    return ResponseUtils.ok(
-        {
-            "orders": order_list,
-            "total": len(order_list),
-            "offset": offset,
-            "limit": limit,
-        }
-    )
+    data: dict = {
+        "orders": order_list,
+        "next_cursor": next_cursor,
+        "limit": limit,
+    }
+    if with_total:
+        data["total"] = await order_service.count_user_orders(
+            current_user.user_id, status
+        )
+
+    return ResponseUtils.ok(data)
 
 
 @router.post("/callback/{payment_method}")
@@ -3,6 +3,8 @@ from fastapi import APIRouter
 from app.utils.logger import logger
 from app.schemas.health_schema import HealthResponse
 from app.core.database import check_db_connection
+from app.utils.metrics import collect_metrics
+from app.utils.response import ResponseUtils
 
 router = APIRouter()
 
@@ -27,3 +29,11 @@ async def health_check():
     except Exception as e:
         logger.error(f"Error during health check: {e}")
         return HealthResponse(msg="unhealthy")
+
+
+@router.get("/metrics")
+async def metrics():
+    """
+    进程内指标（缓存命中率等），每个 worker 独立统计
+    """
+    return ResponseUtils.ok(collect_metrics())
@@ -33,8 +33,8 @@ class UserContext:
     ip: Optional[str] = None
 
     async def check_strict(self):
-        # 严格验证模式
-        return await user_token_service.verify_token(
+        # 严格验证模式（本地撤销列表，落后过多时回退 Redis）
+        return await user_token_service.verify_token_local(
             self.token, self.user_id, token_type=TokenType.USER_ACCESS
         )
 
@@ -50,7 +50,7 @@ def _create_user_context(
 
     注意：此函数只验证 token 签名和类型，不检查 Redis 中的撤销状态
     """
-    jwt_data = JwtUnit.decode_token(token)
+    jwt_data = JwtUnit.decode_token_cached(token)
     if not jwt_data:
         return None
 
@@ -78,7 +78,7 @@ async def get_current_user(
     流程：
     1. 验证 Token 签名和过期时间
     2. 提取 userid（兼容旧的 sub）
-    3. 验证 Token 是否被撤销或已过期（通过 Redis）
+    3. 验证 Token 是否被撤销（本地撤销列表，落后过多时回退 Redis）
     4. 从 Accept-Language header 获取语言设置
     """
     token = credentials.credentials
@@ -92,6 +92,9 @@ async def get_current_user(
     if ctx is None:
         raise UserAuthFailedException("Invalid token")
 
+    if not await ctx.check_strict():
+        raise UserAuthFailedException("Token revoked")
+
     return ctx
 
 
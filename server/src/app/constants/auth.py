@@ -29,6 +29,18 @@ REFRESH_TOKEN_GRACE_PERIOD_SECONDS = 30
 # Token cleanup settings
 TOKEN_CLEANUP_BATCH_SIZE = 100
 TOKEN_CLEANUP_INTERVAL_SECONDS = 3600
+# Newest N sessions kept per user and token type, older ones are evicted
+TOKEN_MAX_SESSIONS_PER_USER = 10
+
+# Token revocation stream (per-worker local deny-list)
+TOKEN_REVOCATION_STREAM = "token_revocation"
+# Fall back to Redis ZSCORE when the local list lags behind by more than this
+TOKEN_REVOCATION_MAX_LAG_SECONDS = 5
+TOKEN_REVOCATION_READ_BLOCK_MS = 1000
+TOKEN_REVOCATION_READ_BATCH_SIZE = 500
+
+# Verified JWT in-process cache (per worker)
+JWT_VERIFY_CACHE_MAX_SIZE = 50000
 
 # HTTP Authentication
 HTTP_AUTH_BEARER_PREFIX = "Bearer "
@@ -47,6 +59,23 @@ LOGIN_RATE_LIMIT_MAX_ATTEMPTS = 10
 # IP block duration in seconds
 IP_BLOCK_DURATION = 600  # 10 minutes
 
+# IP block in-process cache
+IP_BLOCK_LOCAL_CACHE_MAX_SIZE = 100000
+# Unblocked IPs are cached briefly; blocks from other workers arrive via pub/sub
+IP_BLOCK_NEGATIVE_CACHE_TTL_SECONDS = 30
+IP_BLOCK_SYNC_CHANNEL = "ip_block"
+
+
+# Captcha
+CAPTCHA_EXPIRE_SECONDS = 300  # 5 minutes
+CAPTCHA_LENGTH = 4
+# Pre-rendered captchas kept ready in each process
+CAPTCHA_POOL_SIZE = 200
+# Refill starts when fewer than this many captchas are ready
+CAPTCHA_POOL_LOW_WATERMARK = 100
+CAPTCHA_RENDER_BATCH_SIZE = 20
+CAPTCHA_RENDER_WORKERS = 1
+
 
 # Email verification
 EMAIL_VERIFY_CODE_LENGTH = 6
@@ -57,8 +86,22 @@ EMAIL_VERIFY_MAX_ATTEMPTS = 5  # max verification attempts
 EMAIL_SEND_RETRY_TIMES = 3  # retry times for email sending
 EMAIL_SEND_RETRY_DELAY = 1  # initial retry delay in seconds
 
+# Email delivery queue (Redis Streams consumer group)
+EMAIL_QUEUE_STREAM = "email:verify_code"
+EMAIL_QUEUE_DEAD_LETTER_STREAM = "email:verify_code:dead"
+EMAIL_QUEUE_GROUP = "email_senders"
+EMAIL_QUEUE_WORKERS = 2  # consumer tasks per process
+EMAIL_QUEUE_BATCH_SIZE = 10
+EMAIL_QUEUE_BLOCK_MS = 1000
+# A failed delivery stays pending and is reclaimed (retried) after this idle time
+EMAIL_QUEUE_RETRY_IDLE_MS = 5000
+# Deliveries before a message is moved to the dead-letter stream
+EMAIL_QUEUE_MAX_DELIVERIES = EMAIL_SEND_RETRY_TIMES
+
 
 # Email templates
+# In debug mode template files are checked for changes at most this often
+EMAIL_TEMPLATE_RELOAD_INTERVAL_SECONDS = 1
 EMAIL_VERIFY_SUBJECT = "验证码登录"
 EMAIL_VERIFY_BODY_TEMPLATE = (
     "您的验证码是: {code}\n验证码有效期为10分钟,请勿泄露给他人。"
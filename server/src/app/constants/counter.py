@@ -7,6 +7,11 @@ from dataclasses import dataclass
 # Redis key 前缀常量
 COUNTER_KEY_PREFIX = "counter"
 
+# 写回缓冲（write-behind）配置
+# 缓冲的增量每隔 COUNTER_FLUSH_INTERVAL_MS 毫秒、或累计 COUNTER_FLUSH_MAX_ENTRIES 个 key 时写入 Redis
+COUNTER_FLUSH_INTERVAL_MS = 500
+COUNTER_FLUSH_MAX_ENTRIES = 1000
+
 
 class CounterType(str, enum.Enum):
     """计数器类型枚举"""
@@ -35,6 +40,9 @@ class CounterConfig:
     """计数器配置"""
 
     ttl_seconds: int
+    # 是否启用写回缓冲：增量先在 worker 内存中合并，由后台任务批量写入 Redis
+    # 计费相关的计数器（如 DOWNLOAD_COUNT）必须保持同步写入
+    write_behind: bool = False
 
 
 # 计数器类型 -> 配置映射
@@ -42,10 +50,12 @@ COUNTER_CONFIGS: dict[CounterType, CounterConfig] = {
     # 下载计数：30 天过期
     CounterType.DOWNLOAD_COUNT: CounterConfig(ttl_seconds=30 * 86400),
     CounterType.DOWNLOAD_SIZE_TOTAL: CounterConfig(ttl_seconds=30 * 86400),
-    # API 调用：7 天过期
-    CounterType.API_CALL_COUNT: CounterConfig(ttl_seconds=7 * 86400),
+    # API 调用：7 天过期，高频写入走写回缓冲
+    CounterType.API_CALL_COUNT: CounterConfig(
+        ttl_seconds=7 * 86400, write_behind=True
+    ),
     # 用户行为：1 天过期
-    CounterType.PAGE_VIEW_COUNT: CounterConfig(ttl_seconds=86400),
+    CounterType.PAGE_VIEW_COUNT: CounterConfig(ttl_seconds=86400, write_behind=True),
     CounterType.SEARCH_COUNT: CounterConfig(ttl_seconds=86400),
 }
 
@@ -43,6 +43,16 @@ ORDER_STATE_TRANSITIONS: dict[OrderStatus, list[OrderStatus]] = {
     OrderStatus.EXPIRED: [],  # 终态
 }
 
+# 反向状态机：目标状态 → 允许从哪些状态转换过来（用于 CAS 更新）
+ORDER_STATE_ALLOWED_FROM: dict[OrderStatus, list[OrderStatus]] = {
+    to_status: [
+        from_status
+        for from_status, targets in ORDER_STATE_TRANSITIONS.items()
+        if to_status in targets
+    ]
+    for to_status in OrderStatus
+}
+
 
 @dataclass
 class OrderCreateParam:
@@ -58,6 +68,13 @@ class OrderCreateParam:
     client_ip: Optional[str] = None
 
 
+# 订单列表分页
+ORDER_LIST_MAX_LIMIT = 100
+# 用户订单数缓存（Redis hash，字段 all / 各状态值），创建订单和状态变更时失效
+ORDER_COUNT_CACHE_KEY_PREFIX = "order:count"
+ORDER_COUNT_CACHE_TTL_SECONDS = 300
+
+
 # Redis Key 前缀
 REDIS_KEY_ORDER_CALLBACK_LOCK = "tg-download:order:callback:lock"
 REDIS_KEY_ORDER_STATUS_CACHE = "tg-download:order:status"
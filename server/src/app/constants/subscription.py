@@ -61,3 +61,13 @@ def get_subscription_config(period: SubscriptionPeriodEnum) -> SubscriptionConfi
 
 # 免费用户额外配置键名（用于 config.yaml）
 FREE_USER_CONFIG_KEY = "FREE_USER_DAILY_DOWNLOAD_LIMIT"
+
+
+# 订阅缓存配置
+# Redis Hash: subscription:{user_id} -> {period, expires_at}
+SUBSCRIPTION_CACHE_KEY_PREFIX = "subscription"
+SUBSCRIPTION_CACHE_TTL_SECONDS = 86400  # Redis 缓存 1 天
+SUBSCRIPTION_LOCAL_CACHE_TTL_SECONDS = 60  # 进程内缓存 60 秒
+SUBSCRIPTION_LOCAL_CACHE_MAX_SIZE = 10000
+# 订阅变更通知频道（消息内容为 user_id）
+SUBSCRIPTION_INVALIDATE_CHANNEL = "subscription:invalidate"
@@ -1,8 +1,8 @@
 import os
-from typing import Any
+from typing import Any, Literal
 
 import yaml  # type: ignore
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -34,6 +34,8 @@ class DatabaseSettings(BaseSettings):
     database: str = Field(default="scraper")
     pool_size: int = Field(default=10)
     max_overflow: int = Field(default=20)
+    pool_recycle: int = Field(default=3600, description="连接回收时间（秒）")
+    pool_timeout: int = Field(default=30, description="获取连接的最长等待时间（秒）")
 
     @property
     def url(self) -> str:
@@ -81,6 +83,11 @@ class AuthSettings(BaseSettings):
     lock_duration_minutes: int = Field(default=30)
     rate_limit_times: int = Field(default=10)
     rate_limit_period: int = Field(default=60)
+    bcrypt_rounds: int = Field(default=12, ge=4, le=31)
+    bcrypt_pool_size: int = Field(default=4, ge=1, description="bcrypt 线程池大小")
+    bcrypt_max_queue: int = Field(
+        default=32, ge=0, description="bcrypt 最大排队数，超出直接拒绝"
+    )
 
 
 class RedisSettings(BaseSettings):
@@ -134,6 +141,52 @@ class SMTPSettings(BaseSettings):
     from_email: str = Field(default="noreply@example.com", description="发件人邮箱")
     from_name: str = Field(default="TG Download", description="发件人名称")
     timeout: int = Field(default=10, ge=1, description="连接超时时间（秒）")
+    pool_size: int = Field(default=4, ge=1, description="SMTP 连接池最大连接数")
+    pool_idle_timeout: int = Field(
+        default=60, ge=1, description="空闲连接超过该时间（秒）后关闭"
+    )
+    pool_health_check_interval: int = Field(
+        default=10, ge=0, description="空闲超过该时间（秒）的连接复用前发送 NOOP 检查"
+    )
+    pool_max_messages_per_connection: int = Field(
+        default=100, ge=1, description="单个连接发送该数量的邮件后回收重建"
+    )
+
+
+class RateLimitRule(BaseModel):
+    """单条限流规则"""
+
+    path: str = Field(description="路径前缀，如 /api/client/auth/")
+    methods: list[str] = Field(
+        default_factory=list, description="HTTP 方法，空表示全部"
+    )
+    scope: Literal["ip", "user", "device"] = Field(
+        default="ip",
+        description="限流维度：ip / user（JWT 用户）/ device（X-Device-Id），"
+        "拿不到用户或设备时回退到 IP",
+    )
+    limit: int = Field(ge=1, description="窗口内允许的请求数")
+    window: int = Field(ge=1, description="时间窗口（秒）")
+    algorithm: Literal["fixed", "sliding"] = Field(
+        default="fixed", description="fixed 固定窗口 / sliding 近似滑动窗口"
+    )
+    name: str | None = Field(
+        default=None, description="规则名，用于 Redis key，默认取 path"
+    )
+
+
+class RateLimitSettings(BaseSettings):
+    """通用限流配置"""
+
+    model_config = SettingsConfigDict(
+        env_prefix="RATE_LIMIT_",
+        env_file=None,
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+    enabled: bool = Field(default=True)
+    rules: list[RateLimitRule] = Field(default_factory=list)
 
 
 class Settings:
@@ -153,6 +206,7 @@ class Settings:
         self.auth = AuthSettings(**self._config_data.get("auth", {}))
         self.redis = RedisSettings(**self._config_data.get("redis", {}))
         self.smtp = SMTPSettings(**self._config_data.get("smtp", {}))
+        self.rate_limit = RateLimitSettings(**self._config_data.get("rate_limit", {}))
 
     def _load_config(self) -> dict[str, Any]:
         """加载配置文件"""
@@ -169,6 +223,7 @@ class Settings:
         self.auth = AuthSettings(**self._config_data.get("auth", {}))
         self.redis = RedisSettings(**self._config_data.get("redis", {}))
         self.smtp = SMTPSettings(**self._config_data.get("smtp", {}))
+        self.rate_limit = RateLimitSettings(**self._config_data.get("rate_limit", {}))
 
 
 # 全局配置实例
@@ -1,13 +1,24 @@
 """
 数据库核心配置和会话管理
 使用 SQLAlchemy 异步引擎和连接池支持长久服务
+
+会话作用域（unit of work）：
+- session_scope() 内所有 get_async_session() 复用同一个会话（同一个连接），
+  服务代码里的 commit 只 flush，作用域结束时统一提交，出错时整体回滚
+- 作用域内每次 get_async_session() 在 SAVEPOINT 中执行，服务代码里的 rollback
+  只撤销本次调用的修改，调用方捕获异常后继续时之前的写入不受影响
+- DBSessionMiddleware 为每个 HTTP 请求开启一个作用域
+- transaction() 用于多步操作：作用域内为 SAVEPOINT，作用域外自行开启作用域
+- 并发使用会话的场景（如 asyncio.gather）必须传 scoped=False 使用独立会话
+- run_after_commit() 登记提交后才执行的操作（如失效缓存），回滚时丢弃
 """
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Awaitable, Callable
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Optional
 
-from sqlalchemy import MetaData, event
+from sqlalchemy import MetaData
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -15,9 +26,9 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import Pool
 
 from app.core.config import settings
+from app.core.db_pool import InstrumentedAsyncQueuePool, instrument_engine
 from app.utils.logger import logger
 
 # 全局引擎和会话工厂实例
@@ -51,32 +62,108 @@ def get_engine() -> AsyncEngine:
         # 创建异步引擎，配置连接池参数
         _engine = create_async_engine(
             url,
+            poolclass=InstrumentedAsyncQueuePool,  # 统计获取连接等待时间
             pool_size=db_config.pool_size,  # 连接池大小
             max_overflow=db_config.max_overflow,  # 超出连接池大小的最大连接数
-            pool_recycle=3600,  # 连接回收时间（秒）
+            pool_recycle=db_config.pool_recycle,  # 连接回收时间（秒）
+            pool_timeout=db_config.pool_timeout,  # 获取连接的最长等待时间（秒）
             echo=settings.app.debug,  # 调试模式打印 SQL
             future=True,  # 使用 SQLAlchemy 2.0 风格
             pool_pre_ping=True,  # 连接前检查连接是否有效
         )
-        # print(url)
 
-        # 添加连接池事件监听器，用于监控和调试
-        @event.listens_for(Pool, "connect")
-        def receive_connect(dbapi_connection, connection_record):
-            logger.info("数据库连接已建立")
+        # 连接池监控指标，见 /api/system/metrics
+        instrument_engine(_engine)
 
-        @event.listens_for(Pool, "checkout")
-        def receive_checkout(dbapi_connection, connection_record, connection_proxy):
-            logger.debug("从连接池获取连接")
+    return _engine
 
-        @event.listens_for(Pool, "checkin")
-        def receive_checkin(dbapi_connection, connection_record):
-            logger.debug("连接归还到连接池")
 
-    return _engine
+class UnitOfWorkSession(AsyncSession):
+    """
+    支持延迟提交的会话
+
+    defer_commit 为 True 时 commit 只 flush；rollback 只回滚最内层的
+    SAVEPOINT（没有 SAVEPOINT 时回滚整个事务）
+    """
+
+    defer_commit = False
+
+    async def commit(self) -> None:
+        if self.defer_commit:
+            await self.flush()
+            return
+        await super().commit()
+
+    async def rollback(self) -> None:
+        if self.defer_commit:
+            nested = self.get_nested_transaction()
+            if nested is not None:
+                await nested.rollback()
+                return
+        await super().rollback()
+
+
+class SessionScope:
+    """会话作用域：首次使用时才创建会话（不访问数据库的请求不占用连接）"""
+
+    def __init__(self) -> None:
+        self._session: Optional[UnitOfWorkSession] = None
+        self._after_commit: list[Callable[[], Awaitable[None]]] = []
+        self.finished = False
 
+    def get_session(self) -> UnitOfWorkSession:
+        """获取作用域内的会话"""
+        if self._session is None:
+            session = get_session_factory()()
+            session.defer_commit = True
+            self._session = session
+        return self._session
 
-def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    async def finish(self, commit: bool) -> None:
+        """
+        结束作用域：提交或回滚并释放连接，重复调用无效
+
+        提交成功后依次执行 run_after_commit() 登记的回调，回滚时丢弃。
+        结束后同一上下文中的 get_async_session() 回退为独立会话。
+        """
+        if self.finished:
+            return
+        self.finished = True
+        session, self._session = self._session, None
+        callbacks, self._after_commit = self._after_commit, []
+        if session is not None:
+            session.defer_commit = False
+            try:
+                if commit:
+                    await session.commit()
+                else:
+                    await session.rollback()
+            finally:
+                await session.close()
+
+        if not commit:
+            return
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"After-commit callback failed: {e}")
+
+
+# 当前上下文的会话作用域
+_current_scope: ContextVar[Optional[SessionScope]] = ContextVar(
+    "db_session_scope", default=None
+)
+
+
+def _get_active_scope() -> Optional[SessionScope]:
+    scope = _current_scope.get()
+    if scope is None or scope.finished:
+        return None
+    return scope
+
+
+def get_session_factory() -> async_sessionmaker[UnitOfWorkSession]:
     """
     获取会话工厂
     使用单例模式确保整个应用生命周期内使用同一个会话工厂
@@ -90,21 +177,32 @@ def get_session_factory() -> async_sessionmaker[AsyncSession]:
         engine = get_engine()
         _session_factory = async_sessionmaker(
             engine,
-            class_=AsyncSession,
+            class_=UnitOfWorkSession,
             expire_on_commit=False,  # 提交后不使对象过期
         )
     return _session_factory
 
 
 @asynccontextmanager
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+async def get_async_session(scoped: bool = True) -> AsyncGenerator[AsyncSession, None]:
     """
     获取异步数据库会话的上下文管理器
-    每个操作从工厂获取会话，使用后自动归还到连接池
+    处于会话作用域内时复用作用域的会话并开启 SAVEPOINT（块内回滚或抛出异常
+    只撤销本次调用的修改），否则从工厂获取会话，使用后自动归还到连接池
+
+    Args:
+        scoped: 是否复用作用域的会话；并发使用会话时必须为 False
 
     Yields:
         AsyncSession: SQLAlchemy 异步会话
     """
+    scope = _get_active_scope() if scoped else None
+    if scope is not None:
+        session = scope.get_session()
+        async with session.begin_nested():
+            yield session
+        return
+
     factory = get_session_factory()
     async with factory() as session:
         try:
@@ -116,6 +214,64 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def run_after_commit(callback: Callable[[], Awaitable[None]]) -> None:
+    """
+    在事务提交后执行回调（如失效缓存，避免提交前被并发请求用旧数据回填）
+
+    处于会话作用域内时登记到作用域，作用域提交后执行；
+    不在作用域内时服务代码已经提交，立即执行。
+    """
+    scope = _get_active_scope()
+    if scope is None:
+        await callback()
+        return
+    scope._after_commit.append(callback)
+
+
+@asynccontextmanager
+async def session_scope() -> AsyncGenerator[SessionScope, None]:
+    """
+    开启会话作用域：正常退出时提交，抛出异常时回滚
+
+    调用方可以提前调用 scope.finish() 结束作用域（如在发送响应前提交）。
+    """
+    scope = SessionScope()
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    except BaseException:
+        await scope.finish(commit=False)
+        raise
+    else:
+        await scope.finish(commit=True)
+    finally:
+        _current_scope.reset(token)
+
+
+@asynccontextmanager
+async def transaction() -> AsyncGenerator[AsyncSession, None]:
+    """
+    多步操作的显式事务
+
+    - 在会话作用域内：开启 SAVEPOINT，块内出错只回滚块内的修改，
+      成功后随作用域一起提交
+    - 不在作用域内：开启新的作用域，块内调用的服务共享同一个会话，
+      块结束时提交
+
+    Yields:
+        AsyncSession: 块内使用的会话
+    """
+    scope = _get_active_scope()
+    if scope is not None:
+        session = scope.get_session()
+        async with session.begin_nested():
+            yield session
+        return
+
+    async with session_scope() as new_scope:
+        yield new_scope.get_session()
+
+
 async def init_db() -> None:
     """初始化数据库"""
     try:
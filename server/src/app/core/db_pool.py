@@ -0,0 +1,154 @@
+"""
+数据库连接池监控
+
+- InstrumentedAsyncQueuePool：统计从池中获取连接的等待时间（直方图）和超时次数
+- instrument_engine：在单个引擎上注册事件，统计连接建立/关闭、连接年龄、
+  失效和 pre-ping 失败次数，并注册到 /api/system/metrics
+"""
+
+import bisect
+import time
+from typing import Any, cast
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.logger import logger
+from app.utils.metrics import register_metrics
+
+# 获取连接等待时间直方图的桶上界（毫秒），最后一个桶为 +Inf
+CHECKOUT_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """连接池统计（只在事件循环线程中修改）"""
+
+    def __init__(self) -> None:
+        self.wait_buckets = [0] * (len(CHECKOUT_WAIT_BUCKETS_MS) + 1)
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.pre_ping_failures = 0
+        # id(连接记录) → 连接建立时间（time.time()）
+        self.open_connections: dict[int, float] = {}
+
+    def observe_wait(self, wait_ms: float) -> None:
+        """记录一次获取连接的等待时间"""
+        self.wait_buckets[bisect.bisect_left(CHECKOUT_WAIT_BUCKETS_MS, wait_ms)] += 1
+        self.wait_count += 1
+        self.wait_total_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def wait_histogram(self) -> dict[str, int]:
+        """累计直方图：le_<上界> → 等待时间不超过该上界的次数"""
+        result = {}
+        cumulative = 0
+        # wait_buckets 比上界多一个 +Inf 桶，单独累加
+        finite_buckets = self.wait_buckets[:-1]
+        for bound, count in zip(CHECKOUT_WAIT_BUCKETS_MS, finite_buckets, strict=True):
+            cumulative += count
+            result[f"le_{bound}"] = cumulative
+        result["le_inf"] = cumulative + self.wait_buckets[-1]
+        return result
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """统计获取连接等待时间的连接池"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.checkout_timeouts += 1
+            raise
+        finally:
+            self.metrics.observe_wait((time.perf_counter() - start) * 1000)
+
+    def recreate(self) -> "InstrumentedAsyncQueuePool":
+        # dispose 时重建连接池，统计延续
+        pool = super().recreate()
+        pool.metrics = self.metrics  # type: ignore[attr-defined]
+        return pool  # type: ignore[return-value]
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "db_pool") -> None:
+    """
+    为引擎注册连接池事件并暴露指标
+
+    Args:
+        engine: 使用 InstrumentedAsyncQueuePool 的异步引擎
+        name: 指标分组名
+    """
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+    if not isinstance(pool, InstrumentedAsyncQueuePool):
+        logger.warning(f"Engine pool {type(pool).__name__} is not instrumented")
+        return
+    metrics = pool.metrics
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        metrics.connects += 1
+        metrics.open_connections[id(connection_record)] = connection_record.starttime
+
+    @event.listens_for(pool, "close")
+    def on_close(dbapi_connection: Any, connection_record: Any) -> None:
+        metrics.closes += 1
+        metrics.open_connections.pop(id(connection_record), None)
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(
+        dbapi_connection: Any, connection_record: Any, exception: Any
+    ) -> None:
+        metrics.invalidations += 1
+
+    @event.listens_for(sync_engine, "handle_error")
+    def on_handle_error(context: Any) -> None:
+        if getattr(context, "is_pre_ping", False):
+            metrics.pre_ping_failures += 1
+            logger.warning(f"Database pre-ping failed: {context.original_exception}")
+
+    def collect() -> dict[str, Any]:
+        # dispose 后 engine.pool 是新实例，始终读取当前的连接池
+        current = cast(InstrumentedAsyncQueuePool, sync_engine.pool)
+        now = time.time()
+        ages = [now - started for started in metrics.open_connections.values()]
+        return {
+            "pool_size": current.size(),
+            "checked_out": current.checkedout(),
+            "checked_in": current.checkedin(),
+            "overflow_in_use": max(current.overflow(), 0),
+            "checkout_wait_ms": {
+                "count": metrics.wait_count,
+                "avg": (
+                    round(metrics.wait_total_ms / metrics.wait_count, 3)
+                    if metrics.wait_count
+                    else 0.0
+                ),
+                "max": round(metrics.wait_max_ms, 3),
+                "histogram": metrics.wait_histogram(),
+            },
+            "checkout_timeouts": metrics.checkout_timeouts,
+            "connection_age_seconds": {
+                "open": len(ages),
+                "max": round(max(ages), 1) if ages else 0.0,
+                "avg": round(sum(ages) / len(ages), 1) if ages else 0.0,
+            },
+            "connects": metrics.connects,
+            "closes": metrics.closes,
+            "invalidations": metrics.invalidations,
+            "pre_ping_failures": metrics.pre_ping_failures,
+        }
+
+    register_metrics(name, collect)
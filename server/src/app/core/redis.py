@@ -1,10 +1,16 @@
 """Redis 客户端 - 连接池管理"""
 
 import asyncio
+import hashlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
 
 from redis.asyncio import BlockingConnectionPool, Redis
+from redis.exceptions import NoScriptError
 
 from app.core.config import settings
+from app.utils.logger import logger
 
 
 class RedisException(Exception):
@@ -25,10 +31,18 @@ class RedisOperationError(RedisException):
     pass
 
 
+@dataclass(frozen=True)
+class RedisScript:
+    """已注册的 Lua 脚本"""
+
+    script: str
+    sha: str
+
+
 class RedisClient:
     """
     Redis 客户端单例
-    负责连接池管理和基础 Redis 操作
+    负责连接池管理、Lua 脚本注册和基础 Redis 操作
     """
 
     def __init__(self) -> None:
@@ -36,6 +50,7 @@ class RedisClient:
         self._client: Redis | None = None
         self._lock = asyncio.Lock()
         self._is_available = True
+        self._scripts: dict[str, RedisScript] = {}
 
     async def _create_pool(self) -> BlockingConnectionPool:
         """创建 Redis 阻塞式连接池"""
@@ -91,6 +106,66 @@ class RedisClient:
             await self._close_internal()
             self._is_available = False
 
+    def register_script(self, script: str) -> RedisScript:
+        """
+        注册 Lua 脚本
+
+        在模块导入时调用一次，之后通过 eval_script 以 EVALSHA 执行，
+        避免每次请求都发送完整脚本文本。
+
+        Args:
+            script: Lua 脚本文本
+
+        Returns:
+            脚本句柄
+        """
+        sha = hashlib.sha1(script.encode("utf-8")).hexdigest()
+        registered = self._scripts.get(sha)
+        if registered is None:
+            registered = RedisScript(script=script, sha=sha)
+            self._scripts[sha] = registered
+        return registered
+
+    async def load_scripts(self) -> None:
+        """
+        预加载所有已注册的脚本（SCRIPT LOAD）
+
+        应用启动时调用。失败只记录日志，执行时会按需重新加载。
+        """
+        try:
+            client = await self.get_client()
+            for registered in self._scripts.values():
+                await client.script_load(registered.script)
+            logger.info(f"Loaded {len(self._scripts)} Redis Lua scripts")
+        except Exception as e:
+            logger.warning(f"Failed to preload Redis Lua scripts: {e}")
+
+    async def eval_script(
+        self,
+        registered: RedisScript,
+        keys: Sequence[Any] = (),
+        args: Sequence[Any] = (),
+    ) -> Any:
+        """
+        以 EVALSHA 执行已注册的脚本
+
+        Redis 重启或执行 SCRIPT FLUSH 后会返回 NOSCRIPT，此时重新加载脚本后重试一次。
+
+        Args:
+            registered: register_script 返回的脚本句柄
+            keys: KEYS 参数
+            args: ARGV 参数
+
+        Returns:
+            脚本返回值
+        """
+        client = await self.get_client()
+        try:
+            return await client.evalsha(registered.sha, len(keys), *keys, *args)  # type: ignore[misc]
+        except NoScriptError:
+            await client.script_load(registered.script)
+            return await client.evalsha(registered.sha, len(keys), *keys, *args)  # type: ignore[misc]
+
     # execute_command 已经弃用
 
 
@@ -19,6 +19,7 @@ class CommonCode(IntEnum):
     INVALID_REQUEST = 400
     NOT_FOUND = 404
     PERMISSION_DENIED = 403
+    SERVICE_BUSY = 503
     RATE_LIMIT_EXCEEDED = 998
     VALIDATION_ERROR = 999
 
@@ -5,7 +5,8 @@
 """
 
 from dataclasses import dataclass
-from typing import Final, Literal
+from functools import lru_cache
+from typing import Final, Literal, cast
 
 
 # 支持的语言类型
@@ -29,6 +30,67 @@ LANGUAGE_MAPPING: Final = {
     "ko-KR": "ko-KR",
 }
 
+# 小写语言标签 → 支持的语言（Accept-Language 不区分大小写）
+_LANGUAGE_MAPPING_LOWER: Final = {k.lower(): v for k, v in LANGUAGE_MAPPING.items()}
+
+
+@lru_cache(maxsize=256)
+def resolve_language(tag: str) -> SupportedLanguage | None:
+    """
+    把语言标签解析为支持的语言
+
+    不区分大小写，匹配不到时逐级去掉末尾子标签重试，
+    例如 zh-Hant-HK → zh-Hant → zh-TW，en-GB → en → en-US。
+
+    Returns:
+        支持的语言，无法识别时返回 None
+    """
+    tag = tag.strip().lower()
+    while tag:
+        language = _LANGUAGE_MAPPING_LOWER.get(tag)
+        if language is not None:
+            return cast(SupportedLanguage, language)
+        tag = tag.rpartition("-")[0]
+    return None
+
+
+@lru_cache(maxsize=1024)
+def parse_accept_language(accept_language: str) -> SupportedLanguage:
+    """
+    解析 Accept-Language header，返回权重最高的支持语言
+
+    格式: "zh-CN,zh;q=0.9,en;q=0.8"。q=0 表示不接受，"*" 和无法识别的标签跳过；
+    权重相同时保持 header 中的顺序。
+
+    Returns:
+        支持的语言，没有可用语言时返回默认语言
+    """
+    candidates: list[tuple[float, str]] = []
+    for item in accept_language.split(","):
+        tag, _, params = item.partition(";")
+        tag = tag.strip()
+        if not tag or tag == "*":
+            continue
+
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((quality, tag))
+
+    # sort 是稳定排序，权重相同的保持原顺序
+    candidates.sort(key=lambda c: c[0], reverse=True)
+    for _, tag in candidates:
+        language = resolve_language(tag)
+        if language is not None:
+            return language
+    return DEFAULT_LANGUAGE
+
 
 @dataclass(frozen=True)
 class LocaleContext:
@@ -2,20 +2,70 @@
 翻译管理器
 
 从 JSON 文件加载翻译，提供翻译服务。
+
+加载时把嵌套结构展开为 (语言, 点分键) → 文本 的平铺表，
+带格式化参数的文本预先解析为片段，翻译时只需一次字典查找。
 """
 
 import json
 from pathlib import Path
+from string import Formatter
 from typing import Any
 
-from app.i18n.dependencies import DEFAULT_LANGUAGE, LANGUAGE_MAPPING
+from app.i18n.dependencies import DEFAULT_LANGUAGE, resolve_language
+
+
+class _CompiledMessage:
+    """预解析的格式化模板"""
+
+    __slots__ = ("text", "_segments")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        # [(字面量, 参数名)]，参数名为 None 表示只有字面量；
+        # 含格式说明、转换或属性访问的模板不预解析，回退到 str.format
+        self._segments: list[tuple[str, str | None]] | None = None
+        try:
+            parsed = list(Formatter().parse(text))
+        except ValueError:
+            # 模板格式错误，与原来一样在格式化时才报错
+            return
+        if all(
+            field is None or (not spec and not conversion and field.isidentifier())
+            for _, field, spec, conversion in parsed
+        ):
+            self._segments = [(literal, field) for literal, field, _, _ in parsed]
+
+    def format(self, kwargs: dict[str, Any]) -> str:
+        if self._segments is None:
+            return self.text.format(**kwargs)
+        return "".join(
+            literal if field is None else f"{literal}{kwargs[field]}"
+            for literal, field in self._segments
+        )
+
+
+def _flatten(data: dict[str, Any], prefix: str = "") -> dict[str, str]:
+    """把嵌套翻译展开为 点分键 → 文本"""
+    result: dict[str, str] = {}
+    for key, value in data.items():
+        full_key = f"{prefix}{key}"
+        if isinstance(value, dict):
+            result.update(_flatten(value, f"{full_key}."))
+        elif isinstance(value, str):
+            result[full_key] = value
+    return result
 
 
 class Translator:
     """翻译管理器"""
 
     def __init__(self) -> None:
-        self._translations: dict[str, Any] = {}
+        self._languages: list[str] = []
+        # (语言, 点分键) → 文本
+        self._messages: dict[tuple[str, str], str] = {}
+        # (语言, 点分键) → 预解析模板，仅包含带格式化参数的文本
+        self._templates: dict[tuple[str, str], _CompiledMessage] = {}
         self._load_translations()
 
     def _load_translations(self) -> None:
@@ -24,8 +74,12 @@ class Translator:
         for json_file in locales_dir.glob("*.json"):
             lang = json_file.stem  # 例如: zh-CN, en-US
             with open(json_file, encoding="utf-8") as f:
-                # print(f"加载语言文件: {json_file}")
-                self._translations[lang] = json.load(f)
+                flat = _flatten(json.load(f))
+            self._languages.append(lang)
+            for key, text in flat.items():
+                self._messages[(lang, key)] = text
+                if "{" in text:
+                    self._templates[(lang, key)] = _CompiledMessage(text)
 
     def translate(
         self,
@@ -42,25 +96,22 @@ class Translator:
             **kwargs: 格式化参数
 
         Returns:
-            翻译后的消息
+            翻译后的消息，找不到时返回 key
         """
-        # 规范化语言代码
-        lang = LANGUAGE_MAPPING.get(language, DEFAULT_LANGUAGE)
-
-        # 获取翻译
-        translations = self._translations.get(lang, {})
-        keys = key.split(".")
-        for k in keys:
-            translations = translations.get(k, {})
-        if isinstance(translations, str):
-            if kwargs:
-                return translations.format(**kwargs)
-            return translations
-        return key
+        # 规范化语言代码（结果缓存）
+        lang = resolve_language(language) or DEFAULT_LANGUAGE
+
+        text = self._messages.get((lang, key))
+        if text is None:
+            return key
+        if kwargs:
+            template = self._templates.get((lang, key))
+            return template.format(kwargs) if template is not None else text
+        return text
 
     def get_supported_languages(self) -> list[str]:
         """获取支持的语言列表"""
-        return list(self._translations.keys())
+        return list(self._languages)
 
 
 # 全局单例
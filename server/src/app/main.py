@@ -9,14 +9,14 @@ FastAPI 请求处理流程
    ┌────────────────────────────────────────────────────────────────────┐
    │  RequestLoggingMiddleware (最后添加，最先执行)                     │
    │  ├─ 记录请求开始                                                    │
-   │  └─ await call_next(request) ──────────────────────────┐           │
+   │  └─ await self.app(...)      ──────────────────────────┐           │
    │                                                          │           │
    │  CrossOriginMiddleware (中间添加)                        │           │
    │  ├─ 处理 CORS                                            │           │
-   │  └─ await call_next(request) ───────────────────┐       │           │
+   │  └─ await self.app(...)      ───────────────────┐       │           │
    │                                                    │       │           │
    │  ErrorHandlingMiddleware (最先添加，最后执行)     │       │           │
-   │  ├─ try: await call_next(request) ────────┐       │       │           │
+   │  ├─ try: await self.app(...)      ────────┐       │       │           │
    │  │                                        │       │       │           │
    │  │  ↓ 路由处理 & 业务逻辑                  │       │       │           │
    └──┼────────────────────────────────────────┼───────┼───────┼───────────┘
@@ -63,22 +63,25 @@ Middleware 添加顺序与执行顺序
 ================================================================================
 
 添加顺序:
-  app.add_middleware(ErrorHandlingMiddleware)      # ① 最先添加
+  app.add_middleware(DBSessionMiddleware)          # ⓿ 最先添加（请求级数据库会话）
+  app.add_middleware(RateLimitMiddleware)          # ⓪ 限流
+  app.add_middleware(ErrorHandlingMiddleware)      # ①
   app.add_middleware(CrossOriginMiddleware)        # ②
   app.add_middleware(RequestLoggingMiddleware)     # ③ 最后添加
 
 请求进入顺序 (从外到内):
-  ③ RequestLoggingMiddleware → ② CrossOrigin → ① ErrorHandling → 路由
+  ③ RequestLoggingMiddleware → ② CrossOrigin → ① ErrorHandling → ⓪ RateLimit
+  → ⓿ DBSession → 路由
 
 响应返回顺序 (从内到外):
-  路由 → ① ErrorHandling → ② CrossOrigin → ③ RequestLogging → 响应
+  路由 → ⓿ DBSession（发送响应头前提交）→ ⓪ RateLimit → ① ErrorHandling
+  → ② CrossOrigin → ③ RequestLogging → 响应
 
 ================================================================================
 """
 
 from contextlib import asynccontextmanager
 
-from app.middleware.cross_origin import CrossOriginMiddleware
 import uvicorn
 
 from app.api.system.health import router as health_router
@@ -90,9 +93,19 @@ from app.api.client.order_client import router as order_router
 from app.api.callback.test_pay_callback import router as callback_router
 from app.core.config import settings
 from app.core.database import close_engine, init_db
+from app.core.redis import redis_client
+from app.services.captcha_service import captcha_service
+from app.services.counter_service import counter_service
+from app.services.email_delivery_service import email_delivery_service
+from app.services.token_revocation_service import token_revocation_service
+from app.services.token_sweeper_service import token_sweeper_service
 from app.utils.logger import logger, setup_logger
+from app.utils.redis_pubsub import redis_pubsub
 from app.middleware import (
+    CrossOriginMiddleware,
+    DBSessionMiddleware,
     ErrorHandlingMiddleware,
+    RateLimitMiddleware,
     RequestLoggingMiddleware,
 )
 from fastapi import FastAPI
@@ -110,6 +123,13 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.app.name} v{settings.app.version}")
 
     await init_db()
+    await redis_client.load_scripts()
+    await redis_pubsub.start()
+    await counter_service.start()
+    await token_revocation_service.start()
+    await token_sweeper_service.start()
+    await email_delivery_service.start()
+    await captcha_service.start()
 
     logger.info("Application started successfully")
 
@@ -118,6 +138,12 @@ async def lifespan(app: FastAPI):
     # 关闭事件
     logger.info("Application is shutting down")
 
+    await captcha_service.stop()
+    await email_delivery_service.stop()
+    await token_sweeper_service.stop()
+    await token_revocation_service.stop()
+    await counter_service.stop()
+    await redis_pubsub.stop()
     await close_engine()
 
 
@@ -131,6 +157,10 @@ app = FastAPI(
 )
 
 # 添加中间件
+# 数据库会话在最内层：被限流拒绝的请求不开启会话，提交失败由 ErrorHandling 处理
+app.add_middleware(DBSessionMiddleware)
+# 限流在会话之外：被拒绝的请求同样带上 CORS 与 Request ID 响应头
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(ErrorHandlingMiddleware)
 app.add_middleware(CrossOriginMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
@@ -1,4 +1,13 @@
+from .cross_origin import CrossOriginMiddleware
+from .db_session import DBSessionMiddleware
 from .error_handling import ErrorHandlingMiddleware
+from .rate_limit import RateLimitMiddleware
 from .request_logging import RequestLoggingMiddleware
 
-__all__ = ["ErrorHandlingMiddleware", "RequestLoggingMiddleware"]
+__all__ = [
+    "CrossOriginMiddleware",
+    "DBSessionMiddleware",
+    "ErrorHandlingMiddleware",
+    "RateLimitMiddleware",
+    "RequestLoggingMiddleware",
+]
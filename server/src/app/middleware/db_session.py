@@ -0,0 +1,29 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.database import session_scope
+
+
+class DBSessionMiddleware:
+    """请求级数据库会话中间件（纯 ASGI 实现）
+
+    每个请求开启一个会话作用域，请求内的服务调用共享同一个会话和连接。
+    在发送响应头之前提交（5xx 时回滚），提交失败时客户端收到错误响应
+    而不是已经成功的响应；请求处理抛出异常时回滚。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async with session_scope() as db_scope:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    await db_scope.finish(commit=message["status"] < 500)
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -1,42 +1,69 @@
-from collections.abc import Callable
-
 from app.i18n.common_code import CommonCode
 from app.utils.common import get_locale
 from app.utils.response import ResponseUtils
 from fastapi import Request, Response
 from pydantic import ValidationError
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from app.i18n import translator
+from app.i18n import LocaleContext, translator
 from app.exceptions.common_exception import AppCommonException, UserAuthFailedException
 from app.utils.logger import logger
 
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    """错误处理中间件
+class ErrorHandlingMiddleware:
+    """错误处理中间件（纯 ASGI 实现）
 
     处理 AppCommonException 和未捕获的异常，支持 i18n 翻译。
+    响应头已发出后发生的异常无法再替换响应，直接向上抛出。
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
         # 获取语言上下文（在异常发生前获取，避免重复）
         locale = get_locale(request)
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
         try:
-            return await call_next(request)
-        except AppCommonException as e:
+            await self.app(scope, receive, send_wrapper)
+            return
+        except Exception as e:
+            if response_started:
+                raise
+            response = self._build_error_response(request, locale, e)
+
+        await response(scope, receive, send)
+
+    @staticmethod
+    def _build_error_response(
+        request: Request, locale: LocaleContext, exc: Exception
+    ) -> Response:
+        """把异常转换为错误响应"""
+        if isinstance(exc, AppCommonException):
             # 业务异常 - 翻译后返回
-            message = translator.translate(e.code.name, locale.language)
-            return ResponseUtils.json(e.code.value, {}, message)
-        except ValidationError:
+            message = translator.translate(exc.code.name, locale.language)
+            return ResponseUtils.json(exc.code.value, {}, message)
+        if isinstance(exc, ValidationError):
             return ResponseUtils.error(CommonCode.VALIDATION_ERROR, locale)
-        except UserAuthFailedException:
+        if isinstance(exc, UserAuthFailedException):
             return Response(
                 status_code=401,
             )
-        except Exception as e:
-            logger.error(
-                f"Unhandled error in request {request.method} {request.url.path}: {e}",
-                exc_info=True,
-            )
-            return ResponseUtils.error(CommonCode.INTERNAL_SERVER_ERROR, locale)
+
+        logger.error(
+            f"Unhandled error in request {request.method} {request.url.path}: {exc}",
+            exc_info=exc,
+        )
+        return ResponseUtils.error(CommonCode.INTERNAL_SERVER_ERROR, locale)
@@ -0,0 +1,132 @@
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.constants.auth import HTTP_AUTH_BEARER_PREFIX, HTTP_AUTH_BEARER_PREFIX_LENGTH
+from app.core.config import RateLimitRule, settings
+from app.i18n.common_code import CommonCode
+from app.utils.common import get_client_ip, get_locale
+from app.utils.jwt import JwtUnit
+from app.utils.logger import logger
+from app.utils.redis_fixed_limiter import RedisFixedLimiter
+from app.utils.redis_rate_limiter import RateLimitResult, RedisRateLimiter
+from app.utils.response import ResponseUtils
+
+
+class RateLimitMiddleware:
+    """通用限流中间件（纯 ASGI 实现）
+
+    按配置 settings.rate_limit.rules 对匹配的路由限流，
+    在请求体解析和任何 DB 操作之前拒绝超限请求。
+    一个请求匹配多条规则时逐条检查，任意一条超限即拒绝；
+    RateLimit-* 响应头取剩余次数最少的规则。
+    """
+
+    def __init__(
+        self, app: ASGIApp, rules: Optional[list[RateLimitRule]] = None
+    ) -> None:
+        self.app = app
+        if rules is None:
+            rules = settings.rate_limit.rules if settings.rate_limit.enabled else []
+        self._rules = rules
+        self._fixed_limiter = RedisFixedLimiter(key_prefix="route_rate_limit")
+        self._sliding_limiter = RedisRateLimiter(approximate=True)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._rules:
+            await self.app(scope, receive, send)
+            return
+
+        rules = self._match_rules(scope["method"], scope["path"])
+        if not rules:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        rule = rules[0]
+        result = await self._check_rule(rule, request)
+        for candidate in rules[1:]:
+            if not result.allowed:
+                break
+            candidate_result = await self._check_rule(candidate, request)
+            if (
+                not candidate_result.allowed
+                or candidate_result.remaining < result.remaining
+            ):
+                rule, result = candidate, candidate_result
+
+        rate_limit_headers = {
+            "RateLimit-Limit": str(rule.limit),
+            "RateLimit-Remaining": str(result.remaining),
+            "RateLimit-Reset": str(result.reset_after),
+        }
+
+        if not result.allowed:
+            logger.warning(
+                f"Rate limit exceeded: {scope['method']} {scope['path']} "
+                f"- rule: {rule.name or rule.path} - scope: {rule.scope}"
+            )
+            response = ResponseUtils.error(
+                CommonCode.RATE_LIMIT_EXCEEDED, get_locale(request)
+            )
+            response.status_code = 429
+            response.headers.update(rate_limit_headers)
+            response.headers["Retry-After"] = str(result.retry_after)
+            await response(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limit_headers.items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _match_rules(self, method: str, path: str) -> list[RateLimitRule]:
+        """获取匹配当前请求的规则"""
+        method = method.upper()
+        return [
+            rule
+            for rule in self._rules
+            if path.startswith(rule.path)
+            and (not rule.methods or method in (m.upper() for m in rule.methods))
+        ]
+
+    async def _check_rule(
+        self, rule: RateLimitRule, request: Request
+    ) -> RateLimitResult:
+        """按规则检查一次请求"""
+        identifier = f"{rule.name or rule.path}:{self._resolve_identity(rule, request)}"
+
+        if rule.algorithm == "sliding":
+            return await self._sliding_limiter.check(
+                f"route:{identifier}", rule.limit, rule.window
+            )
+        return await self._fixed_limiter.check(identifier, rule.limit, rule.window)
+
+    @staticmethod
+    def _resolve_identity(rule: RateLimitRule, request: Request) -> str:
+        """
+        解析限流维度标识
+
+        user 维度只校验 JWT 签名（与 get_current_user 一致），不查撤销状态；
+        拿不到用户或设备标识时回退到 IP。
+        """
+        if rule.scope == "user":
+            auth_header = request.headers.get("authorization")
+            if auth_header and auth_header.startswith(HTTP_AUTH_BEARER_PREFIX):
+                jwt_data = JwtUnit.decode_token_cached(
+                    auth_header[HTTP_AUTH_BEARER_PREFIX_LENGTH:]
+                )
+                if jwt_data:
+                    return f"user:{jwt_data.user_id}"
+        elif rule.scope == "device":
+            device_id = request.headers.get("X-Device-Id")
+            if device_id:
+                return f"device:{device_id}"
+
+        return f"ip:{get_client_ip(request) or 'unknown'}"
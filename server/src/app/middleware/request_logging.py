@@ -1,49 +1,61 @@
 import time
 import uuid
-from collections.abc import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.utils.logger import logger
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """请求日志中间件"""
+class RequestLoggingMiddleware:
+    """请求日志中间件（纯 ASGI 实现）"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # 生成请求ID
         request_id = str(uuid.uuid4())
 
         # 记录请求开始时间
         start_time = time.time()
 
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+
         # 记录请求信息
         logger.info(
-            f"Request started: {request.method} {request.url.path} "
+            f"Request started: {method} {path} "
             f"- Request ID: {request_id} "
-            f"- Client: {request.client.host if request.client else 'unknown'}"
+            f"- Client: {client[0] if client else 'unknown'}"
         )
 
-        # 将请求ID添加到请求状态中
-        request.state.request_id = request_id
+        # 将请求ID添加到请求状态中（request.state 读取 scope["state"]）
+        scope.setdefault("state", {})["request_id"] = request_id
 
-        # 处理请求
-        response = await call_next(request)
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # 计算处理时间
+                process_time = time.time() - start_time
 
-        # 计算处理时间
-        process_time = time.time() - start_time
+                # 记录响应信息
+                logger.info(
+                    f"Request completed: {method} {path} "
+                    f"- Request ID: {request_id} "
+                    f"- Status: {message['status']} "
+                    f"- Time: {process_time:.4f}s"
+                )
 
-        # 记录响应信息
-        logger.info(
-            f"Request completed: {request.method} {request.url.path} "
-            f"- Request ID: {request_id} "
-            f"- Status: {response.status_code} "
-            f"- Time: {process_time:.4f}s"
-        )
+                # 添加响应头
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Process-Time"] = str(process_time)
+            await send(message)
 
-        # 添加响应头
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Process-Time"] = str(process_time)
-
-        return response
+        # 处理请求
+        await self.app(scope, receive, send_wrapper)
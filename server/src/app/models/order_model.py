@@ -94,7 +94,11 @@ class OrderModel(BaseDBModel):
     )
 
     # 索引
-    __table_args__ = (Index("idx_order_no", "order_no"),)
+    __table_args__ = (
+        Index("idx_order_no", "order_no"),
+        # 用户订单列表按 (created_at, id) 游标分页
+        Index("idx_user_created", "user_id", "created_at", "id"),
+    )
 
     def __repr__(self) -> str:
         return (
@@ -0,0 +1,15 @@
+"""计数器相关数据模型"""
+
+from pydantic import BaseModel, Field
+
+from app.constants.counter import CounterType
+
+
+class IncrementBatchRequest(BaseModel):
+    """批量增加计数器请求"""
+
+    deltas: dict[CounterType, int] = Field(
+        ...,
+        min_length=1,
+        description="计数器类型 -> 增量，例如 {\"download_count\": 1}",
+    )
@@ -44,9 +44,9 @@ class OrderListResponse(BaseModel):
     """订单列表响应"""
 
     orders: list[OrderStatusResponse]
-    total: int
-    offset: int
+    next_cursor: Optional[str] = Field(None, description="下一页游标，None 表示没有更多")
     limit: int
+    total: Optional[int] = Field(None, description="订单总数，仅 with_total=true 时返回")
 
 
 class PaymentCallbackRequest(BaseModel):
@@ -6,7 +6,7 @@
 from abc import ABC
 from typing import Any, Generic, Optional, Type, TypeVar
 
-from sqlalchemy import select
+from sqlalchemy import select, update
 
 from app.core.database import get_async_session
 from app.models.base import BaseDBModel
@@ -57,19 +57,37 @@ class BaseService(ABC, Generic[ModelType]):
         if not self.primary_key_field:
             raise ValueError(f"{self.__class__.__name__} must define primary_key_field")
 
+        return await self.update_where({self.primary_key_field: id}, **kwargs) > 0
+
+    async def update_where(self, where: dict[str, Any], **values: Any) -> int:
+        """
+        按条件更新记录（单条 UPDATE ... WHERE，不先查询整行）
+
+        Args:
+            where: 字段名 → 值，多个条件为 AND；值为 list/tuple/set 时为 IN
+            **values: 字段名 → 新值，可以是 SQL 表达式，
+                如 login_count=UserModel.login_count + 1
+
+        Returns:
+            匹配的行数
+        """
+        if not where:
+            raise ValueError("update_where requires at least one condition")
+
+        conditions = []
+        for key, value in where.items():
+            column = getattr(self.model_class, key)
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(column.in_(value))
+            else:
+                conditions.append(column == value)
+
+        stmt = update(self.model_class).where(*conditions).values(**values)
         async with get_async_session() as db:
             try:
-                pk_attr = getattr(self.model_class, self.primary_key_field)
-                stmt = select(self.model_class).where(pk_attr == id)
                 result = await db.execute(stmt)
-                instance = result.scalar_one_or_none()
-
-                if instance:
-                    for key, value in kwargs.items():
-                        setattr(instance, key, value)
-                    await db.commit()
-                    return True
-                return False
+                await db.commit()
+                return result.rowcount
             except Exception:
                 await db.rollback()
                 raise
@@ -124,7 +142,7 @@ class ShardedService(BaseService[ModelType], Generic[ModelType]):
 
         shard_index = shard_key % shard_count
         suffix = f"{shard_index:02d}"
-        class_name = f"{getattr(self.model_class, "__tablename_base__")}_{suffix}"
+        class_name = f"{getattr(self.model_class, '__tablename_base__')}_{suffix}"
 
         # 从模块中获取动态生成的分表类
         import sys
@@ -160,9 +178,9 @@ class ShardedService(BaseService[ModelType], Generic[ModelType]):
             shard_indices = set(range(shard_count))
 
         async def query_shard(shard_index: int) -> list[ModelType]:
-            """查询单个分表"""
+            """查询单个分表（并发时不能共享请求级会话，使用独立会话）"""
             model_class = self._get_model_for_shard(shard_index)
-            async with get_async_session() as db:
+            async with get_async_session(scoped=not concurrent) as db:
                 return await query_fn(model_class, db)
 
         if concurrent:
@@ -1,156 +1,273 @@
 """
 验证码服务
+
+- 答案存 Redis 并设置过期时间，多 worker 部署下任意 worker 都能校验
+- 图片由后台进程池预先渲染到有界队列中，生成验证码只需取出一个
+- 进程池以 spawn 方式创建：应用进程已有多个线程（bcrypt 线程池、Redis 等），
+  fork 多线程进程可能死锁
+- 队列为空时（启动前或消耗过快）临时在进程池中渲染单个验证码
 """
 
+import asyncio
 import base64
 import io
+import multiprocessing
+import os
 import random
 import string
-import time
 import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any
 
 from PIL import Image, ImageDraw, ImageFont  # type: ignore[import]
 
+from app.constants.auth import (
+    CAPTCHA_EXPIRE_SECONDS,
+    CAPTCHA_LENGTH,
+    CAPTCHA_POOL_LOW_WATERMARK,
+    CAPTCHA_POOL_SIZE,
+    CAPTCHA_RENDER_BATCH_SIZE,
+    CAPTCHA_RENDER_WORKERS,
+)
+from app.core.redis import redis_client
 from app.core.singleton import singleton
+from app.utils.logger import logger
+from app.utils.metrics import register_metrics
+from app.utils.redis_key import build_redis_key
 
+CAPTCHA_WIDTH = 120
+CAPTCHA_HEIGHT = 40
+CAPTCHA_FONT_SIZE = 28
 
-@singleton
-class CaptchaService:
-    """验证码服务"""
-
-    def __init__(self) -> None:
-        self._storage: dict[str, tuple[str, int]] = {}
-        self.width = 120
-        self.height = 40
-        self.font_size = 28
 
-    def _generate_text(self, length: int = 4) -> str:
-        """生成随机验证码文本"""
-        chars = string.digits + string.ascii_uppercase
-        return "".join(random.choices(chars, k=length))
+# ==================== 渲染（在进程池中执行） ====================
 
-    def _generate_image(self, text: str) -> Image.Image:
-        """生成验证码图片"""
-        image = Image.new("RGB", (self.width, self.height), color=(255, 255, 255))
-        draw = ImageDraw.Draw(image)
 
+@lru_cache(maxsize=None)
+def _load_font(font_size: int) -> Any:
+    """加载字体（每个进程只加载一次）"""
+    try:
+        return ImageFont.truetype(
+            "/System/Library/Fonts/Supplemental/Arial.ttf", font_size
+        )
+    except Exception:
         try:
-            font = ImageFont.truetype(
-                "/System/Library/Fonts/Supplemental/Arial.ttf", self.font_size
-            )
+            return ImageFont.truetype("arial.ttf", font_size)
         except Exception:
+            return ImageFont.load_default()
+
+
+def _generate_text(length: int = CAPTCHA_LENGTH) -> str:
+    """生成随机验证码文本"""
+    chars = string.digits + string.ascii_uppercase
+    return "".join(random.choices(chars, k=length))
+
+
+def _generate_image(text: str) -> Image.Image:
+    """生成验证码图片"""
+    width, height = CAPTCHA_WIDTH, CAPTCHA_HEIGHT
+    image = Image.new("RGB", (width, height), color=(255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    font = _load_font(CAPTCHA_FONT_SIZE)
+
+    for i, char in enumerate(text):
+        x = 10 + i * 25
+        y = random.randint(2, 8)
+        angle = random.randint(-15, 15)
+
+        char_image = Image.new("RGBA", (30, 30), (255, 255, 255, 0))
+        char_draw = ImageDraw.Draw(char_image)
+        char_draw.text((0, 0), char, font=font, fill=(0, 0, 0))
+
+        rotated = char_image.rotate(angle, expand=False)
+        image.paste(rotated, (x, y), rotated)
+
+    for _ in range(5):
+        x1 = random.randint(0, width)
+        y1 = random.randint(0, height)
+        x2 = random.randint(0, width)
+        y2 = random.randint(0, height)
+        draw.line(
+            [(x1, y1), (x2, y2)],
+            fill=(
+                random.randint(150, 200),
+                random.randint(150, 200),
+                random.randint(150, 200),
+            ),
+            width=1,
+        )
+
+    for _ in range(50):
+        x = random.randint(0, width)
+        y = random.randint(0, height)
+        draw.point(
+            (x, y),
+            fill=(
+                random.randint(150, 220),
+                random.randint(150, 220),
+                random.randint(150, 220),
+            ),
+        )
+
+    return image
+
+
+def _render_captchas(count: int) -> list[tuple[str, str]]:
+    """
+    批量渲染验证码
+
+    Returns:
+        [(答案, base64 PNG 图片)]
+    """
+    result = []
+    for _ in range(count):
+        text = _generate_text()
+        buffer = io.BytesIO()
+        _generate_image(text).save(buffer, format="PNG")
+        result.append((text, base64.b64encode(buffer.getvalue()).decode("utf-8")))
+    return result
+
+
+# ==================== 服务 ====================
+
+
+@singleton
+class CaptchaService:
+    """验证码服务"""
+
+    def __init__(self) -> None:
+        self._ready: deque[tuple[str, str]] = deque(maxlen=CAPTCHA_POOL_SIZE)
+        self._executor: ProcessPoolExecutor | None = None
+        self._refill_event: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._served = 0
+        self._pool_misses = 0
+
+    async def start(self) -> None:
+        """启动渲染进程池和补充任务"""
+        if self._task is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=CAPTCHA_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._refill_event = asyncio.Event()
+        self._refill_event.set()
+        self._task = asyncio.create_task(self._refill_loop(self._refill_event))
+
+    async def stop(self) -> None:
+        """停止补充任务并关闭进程池"""
+        if self._task is not None:
+            self._task.cancel()
             try:
-                font = ImageFont.truetype("arial.ttf", self.font_size)
-            except Exception:
-                font = ImageFont.load_default()
-
-        for i, char in enumerate(text):
-            x = 10 + i * 25
-            y = random.randint(2, 8)
-            angle = random.randint(-15, 15)
-
-            char_image = Image.new("RGBA", (30, 30), (255, 255, 255, 0))
-            char_draw = ImageDraw.Draw(char_image)
-            char_draw.text((0, 0), char, font=font, fill=(0, 0, 0))
-
-            rotated = char_image.rotate(angle, expand=False)
-            image.paste(rotated, (x, y), rotated)
-
-        for _ in range(5):
-            x1 = random.randint(0, self.width)
-            y1 = random.randint(0, self.height)
-            x2 = random.randint(0, self.width)
-            y2 = random.randint(0, self.height)
-            draw.line(
-                [(x1, y1), (x2, y2)],
-                fill=(
-                    random.randint(150, 200),
-                    random.randint(150, 200),
-                    random.randint(150, 200),
-                ),
-                width=1,
-            )
-
-        for _ in range(50):
-            x = random.randint(0, self.width)
-            y = random.randint(0, self.height)
-            draw.point(
-                (x, y),
-                fill=(
-                    random.randint(150, 220),
-                    random.randint(150, 220),
-                    random.randint(150, 220),
-                ),
-            )
-
-        return image
-
-    def generate_captcha(self) -> tuple[str, str]:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _refill_loop(self, refill_event: asyncio.Event) -> None:
+        """低于水位线时批量渲染，补满队列后等待下次唤醒"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await refill_event.wait()
+            refill_event.clear()
+            try:
+                while len(self._ready) < CAPTCHA_POOL_SIZE:
+                    batch = await loop.run_in_executor(
+                        self._executor, _render_captchas, CAPTCHA_RENDER_BATCH_SIZE
+                    )
+                    self._ready.extend(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to pre-render captchas: {e}")
+                await asyncio.sleep(1)
+                refill_event.set()
+
+    async def _take(self) -> tuple[str, str]:
+        """取出一个预渲染的验证码，队列为空时临时渲染"""
+        if self._refill_event is not None and (
+            len(self._ready) <= CAPTCHA_POOL_LOW_WATERMARK
+        ):
+            self._refill_event.set()
+
+        if self._ready:
+            return self._ready.popleft()
+
+        self._pool_misses += 1
+        loop = asyncio.get_running_loop()
+        # 未启动时 executor 为 None，使用默认线程池，同样不阻塞事件循环
+        batch = await loop.run_in_executor(self._executor, _render_captchas, 1)
+        return batch[0]
+
+    @staticmethod
+    def _build_key(captcha_id: str) -> str:
+        return build_redis_key(f"captcha:{captcha_id}")
+
+    async def generate_captcha(self) -> tuple[str, str]:
         """
         生成验证码
 
         Returns:
             tuple[str, str]: (captcha_id, image_data)
+
+        Raises:
+            Redis 异常：答案无法保存时验证码不可用，直接抛出
         """
         captcha_id = str(uuid.uuid4())
-        text = self._generate_text()
-        image = self._generate_image(text)
-
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
-        image_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        text, image_data = await self._take()
 
-        self._storage[captcha_id] = (text.upper(), self._get_timestamp())
-
-        self._cleanup_expired()
+        redis = await redis_client.get_client()
+        await redis.set(
+            self._build_key(captcha_id), text.upper(), ex=CAPTCHA_EXPIRE_SECONDS
+        )
+        self._served += 1
 
         return captcha_id, image_data
 
-    def verify_captcha(self, captcha_id: str, user_text: str) -> bool:
+    async def verify_captcha(self, captcha_id: str, user_text: str) -> bool:
         """
-        验证验证码
+        验证验证码（一次性，无论结果都会删除）
 
         Args:
             captcha_id: 验证码ID
             user_text: 用户输入的验证码
 
         Returns:
-            bool: 是否验证成功
+            bool: 是否验证成功（Redis 异常时视为失败）
         """
-        # 测试环境特殊处理：如果是测试验证码ID，接受 "test" 作为验证文本
-        import os
-
-        if os.getenv("PYTEST_RUNNING") == "true" or os.getenv("TESTING") == "true":
-            if user_text == "test" and captcha_id in self._storage:
-                del self._storage[captcha_id]
-                return True
-
-        if captcha_id not in self._storage:
+        try:
+            redis = await redis_client.get_client()
+            stored_text = await redis.getdel(self._build_key(captcha_id))
+        except Exception as e:
+            logger.error(f"Failed to verify captcha: {e}")
             return False
 
-        stored_text, timestamp = self._storage[captcha_id]
-
-        if self._get_timestamp() - timestamp > 300:
-            del self._storage[captcha_id]
+        if stored_text is None:
             return False
 
-        del self._storage[captcha_id]
-        return stored_text == user_text.upper()
+        # 测试环境特殊处理：接受 "test" 作为验证文本
+        if os.getenv("PYTEST_RUNNING") == "true" or os.getenv("TESTING") == "true":
+            if user_text == "test":
+                return True
 
-    def _get_timestamp(self) -> int:
-        """获取当前时间戳（秒）"""
-        return int(time.time())
+        return stored_text == user_text.upper()
 
-    def _cleanup_expired(self):
-        """清理过期的验证码"""
-        current_time = self._get_timestamp()
-        expired_keys = [
-            key
-            for key, (_, timestamp) in self._storage.items()
-            if current_time - timestamp > 300
-        ]
-        for key in expired_keys:
-            del self._storage[key]
+    def get_stats(self) -> dict[str, Any]:
+        """获取预渲染队列统计"""
+        return {
+            "ready": len(self._ready),
+            "pool_size": CAPTCHA_POOL_SIZE,
+            "served": self._served,
+            "pool_misses": self._pool_misses,
+        }
 
 
 captcha_service = CaptchaService()
+
+register_metrics("captcha_pool", captcha_service.get_stats)
@@ -2,9 +2,12 @@
 用户计数器服务 - 支持匿名和已登录用户的计数功能
 """
 
+import asyncio
 from typing import Optional
 
 from app.constants.counter import (
+    COUNTER_FLUSH_INTERVAL_MS,
+    COUNTER_FLUSH_MAX_ENTRIES,
     COUNTER_KEY_PREFIX,
     CounterType,
     UserType,
@@ -12,50 +15,77 @@ from app.constants.counter import (
 )
 from app.core.redis import redis_client
 from app.core.singleton import singleton
+from app.utils.local_cache import LocalTTLCache
 from app.utils.redis_key import build_redis_key
 from app.utils.logger import logger
 
 
 # Lua 脚本：原子性地增加计数器并在首次设置时添加过期时间
-_INCR_WITH_EXPIRE_SCRIPT = """
+_INCR_WITH_EXPIRE_SCRIPT = redis_client.register_script(
+    """
 local current = redis.call('INCRBY', KEYS[1], ARGV[1])
 if current == tonumber(ARGV[1]) then
     redis.call('EXPIRE', KEYS[1], ARGV[2])
 end
 return current
 """
+)
 
-# Lua 脚本：原子性地合并匿名计数到用户计数
-_MERGE_ANONYMOUS_SCRIPT = """
-local anonymous_key = KEYS[1]
-local user_key = KEYS[2]
-local ttl = ARGV[1]
-
--- 获取匿名计数值
-local anonymous_value = redis.call('GET', anonymous_key)
-if anonymous_value then
-    -- 累加到用户计数
-    local new_value = redis.call('INCRBY', user_key, tonumber(anonymous_value))
-
-    -- 只在必要时设置 TTL（避免重置较新的 TTL）
-    -- -2: key 不存在，需要设置
-    -- -1: key 存在但没有过期时间，不覆盖
-    -- >= 0: key 有过期时间，只在当前 TTL 大于目标 TTL 时才延长
-    local current_ttl = redis.call('TTL', user_key)
-    if current_ttl == -2 or (current_ttl >= 0 and current_ttl > tonumber(ttl)) then
-        redis.call('EXPIRE', user_key, ttl)
+# Lua 脚本：批量增加多个计数器，首次设置时添加过期时间
+# KEYS[i]: 计数器 key，ARGV[2i-1]: 增量，ARGV[2i]: TTL（秒）
+_INCR_MANY_WITH_EXPIRE_SCRIPT = redis_client.register_script(
+    """
+local results = {}
+for i, key in ipairs(KEYS) do
+    local delta = tonumber(ARGV[2 * i - 1])
+    local current = redis.call('INCRBY', key, delta)
+    if current == delta then
+        redis.call('EXPIRE', key, ARGV[2 * i])
     end
+    results[i] = current
+end
+return results
+"""
+)
 
-    -- 删除匿名计数器
-    redis.call('DEL', anonymous_key)
-
-    return new_value
-else
-    -- 没有匿名计数，返回当前用户计数值
-    local current_value = redis.call('GET', user_key)
-    return current_value or 0
+# Lua 脚本：原子性地合并匿名计数到用户计数（支持批量）
+# KEYS[2i-1]: 匿名计数器 key，KEYS[2i]: 用户计数器 key，ARGV[i]: TTL（秒）
+# 返回每对 key 合并后的用户计数值
+_MERGE_ANONYMOUS_SCRIPT = redis_client.register_script(
+    """
+local results = {}
+for i = 1, #ARGV do
+    local anonymous_key = KEYS[2 * i - 1]
+    local user_key = KEYS[2 * i]
+    local ttl = tonumber(ARGV[i])
+
+    -- 获取匿名计数值
+    local anonymous_value = redis.call('GET', anonymous_key)
+    if anonymous_value then
+        -- 累加到用户计数
+        local new_value = redis.call('INCRBY', user_key, tonumber(anonymous_value))
+
+        -- 只在必要时设置 TTL（避免重置较新的 TTL）
+        -- -2: key 不存在，需要设置
+        -- -1: key 存在但没有过期时间，不覆盖
+        -- >= 0: key 有过期时间，只在当前 TTL 大于目标 TTL 时才延长
+        local current_ttl = redis.call('TTL', user_key)
+        if current_ttl == -2 or (current_ttl >= 0 and current_ttl > ttl) then
+            redis.call('EXPIRE', user_key, ttl)
+        end
+
+        -- 删除匿名计数器
+        redis.call('DEL', anonymous_key)
+
+        results[i] = new_value
+    else
+        -- 没有匿名计数，返回当前用户计数值
+        results[i] = tonumber(redis.call('GET', user_key)) or 0
+    end
 end
+return results
 """
+)
 
 
 @singleton
@@ -68,8 +98,134 @@ class CounterService:
     - 已登录用户（通过 user_id）
     - 登录时合并匿名计数器
     - 可配置的 TTL
+    - 高频计数器写回缓冲（CounterConfig.write_behind）
+
+    写回缓冲：
+    - 增量按 _build_key 合并在 worker 内存中，由后台任务定期批量写入 Redis
+    - 仅在 start() 启动后台任务后生效，否则全部同步写入
+    - 应用关闭时 stop() 会写入所有未落盘的增量
     """
 
+    def __init__(self) -> None:
+        # key -> [累计增量, TTL]
+        self._pending: dict[str, list[int]] = {}
+        # 最近一次写入 Redis 后的计数值，用于缓冲写入时返回近似值
+        self._flushed_values: LocalTTLCache[int] = LocalTTLCache(
+            max_size=COUNTER_FLUSH_MAX_ENTRIES * 10, default_ttl=60
+        )
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """启动写回缓冲后台任务"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """停止后台任务并写入所有未落盘的增量"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        try:
+            await self.flush()
+        except Exception:
+            pass
+        if self._pending:
+            logger.error(
+                f"Counter buffer not fully flushed on shutdown, "
+                f"dropped {len(self._pending)} keys"
+            )
+
+    async def _flush_loop(self) -> None:
+        """定时或缓冲达到上限时写入 Redis"""
+        interval = COUNTER_FLUSH_INTERVAL_MS / 1000
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Counter buffer flush failed: {e}")
+
+    async def flush(self) -> None:
+        """
+        将缓冲的增量写入 Redis
+
+        每 COUNTER_FLUSH_MAX_ENTRIES 个 key 一次脚本调用；写入失败的增量放回缓冲，下次重试
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, {}
+            items = list(pending.items())
+
+            for start in range(0, len(items), COUNTER_FLUSH_MAX_ENTRIES):
+                chunk = items[start : start + COUNTER_FLUSH_MAX_ENTRIES]
+                keys = [key for key, _ in chunk]
+                args: list[int] = []
+                for _, (delta, ttl) in chunk:
+                    args.append(delta)
+                    args.append(ttl)
+
+                try:
+                    result = await redis_client.eval_script(
+                        _INCR_MANY_WITH_EXPIRE_SCRIPT, keys=keys, args=args
+                    )
+                except Exception as e:
+                    # 放回缓冲，与期间新增的增量合并
+                    for key, (delta, ttl) in items[start:]:
+                        self._buffer(key, delta, ttl)
+                    logger.error(
+                        f"Counter flush failed, {len(items) - start} keys requeued: {e}"
+                    )
+                    raise
+
+                for key, value in zip(keys, result, strict=True):
+                    self._flushed_values.set(key, int(value))
+
+    def _buffer(self, key: str, delta: int, ttl: int) -> int:
+        """
+        缓冲增量
+
+        Returns:
+            近似计数值（最近一次写入后的值 + 未落盘增量）
+        """
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = [0, ttl]
+            self._pending[key] = entry
+        entry[0] += delta
+
+        if len(self._pending) >= COUNTER_FLUSH_MAX_ENTRIES:
+            self._flush_event.set()
+
+        return self._flushed_values.get(key, 0) + entry[0]
+
+    def _pending_delta(self, key: str) -> int:
+        """获取 key 未落盘的增量"""
+        entry = self._pending.get(key)
+        return entry[0] if entry else 0
+
+    def _is_buffered(self, counter_type: CounterType) -> bool:
+        """计数器是否走写回缓冲"""
+        return (
+            self._flush_task is not None
+            and get_counter_config(counter_type).write_behind
+        )
+
     def _validate_user_or_device(
         self,
         user_id: Optional[int],
@@ -90,6 +246,18 @@ class CounterService:
             if len(device_id) > 256:
                 raise ValueError("device_id too long (max 256 characters)")
 
+    def _validate_delta(self, delta: int) -> None:
+        """
+        验证增量
+
+        Raises:
+            ValueError: delta 不合法
+        """
+        if delta <= 0:
+            raise ValueError("delta must be positive")
+        if delta > 1_000_000:
+            raise ValueError("delta too large")
+
     async def increment(
         self,
         counter_type: CounterType,
@@ -107,28 +275,27 @@ class CounterService:
             delta: 增量，默认 1
 
         Returns:
-            增加后的计数值
+            增加后的计数值（写回缓冲的计数器返回近似值）
 
         Raises:
             ValueError: user_id 和 device_id 都为空，或 delta 不合法
             RuntimeError: Redis 操作失败
         """
         self._validate_user_or_device(user_id, device_id)
-
-        if delta <= 0:
-            raise ValueError("delta must be positive")
-        if delta > 1_000_000:
-            raise ValueError("delta too large")
+        self._validate_delta(delta)
 
         key = self._build_key(counter_type, user_id, device_id)
         config = get_counter_config(counter_type)
 
-        try:
-            redis = await redis_client.get_client()
+        if self._is_buffered(counter_type):
+            return self._buffer(key, delta, config.ttl_seconds)
 
+        try:
             # 使用 Lua 脚本原子性地增加计数并设置过期时间
-            result = await redis.eval(  # type: ignore[misc]
-                _INCR_WITH_EXPIRE_SCRIPT, 1, key, delta, config.ttl_seconds
+            result = await redis_client.eval_script(
+                _INCR_WITH_EXPIRE_SCRIPT,
+                keys=[key],
+                args=[delta, config.ttl_seconds],
             )
 
             if result is None:
@@ -142,11 +309,73 @@ class CounterService:
             )
             raise
 
+    async def increment_many(
+        self,
+        user_id: Optional[int],
+        device_id: Optional[str],
+        deltas: dict[CounterType, int],
+    ) -> dict[CounterType, int]:
+        """
+        批量增加多个计数器（一次 Redis 调用）
+
+        Args:
+            user_id: 用户 ID（已登录用户）
+            device_id: 设备 ID（匿名用户）
+            deltas: {counter_type: delta} 映射
+
+        Returns:
+            增加后的计数值 {counter_type: value}（写回缓冲的计数器为近似值）
+
+        Raises:
+            ValueError: user_id 和 device_id 都为空，或任一 delta 不合法
+            RuntimeError: Redis 操作失败
+        """
+        self._validate_user_or_device(user_id, device_id)
+        for delta in deltas.values():
+            self._validate_delta(delta)
+
+        results: dict[CounterType, int] = {}
+        counter_types = []
+        keys = []
+        args: list[int] = []
+        for counter_type, delta in deltas.items():
+            key = self._build_key(counter_type, user_id, device_id)
+            ttl = get_counter_config(counter_type).ttl_seconds
+            if self._is_buffered(counter_type):
+                results[counter_type] = self._buffer(key, delta, ttl)
+                continue
+            counter_types.append(counter_type)
+            keys.append(key)
+            args.append(delta)
+            args.append(ttl)
+
+        if not keys:
+            return results
+
+        try:
+            result = await redis_client.eval_script(
+                _INCR_MANY_WITH_EXPIRE_SCRIPT, keys=keys, args=args
+            )
+
+            if result is None:
+                raise RuntimeError("Redis INCRBY operation failed - connection error")
+
+            for counter_type, value in zip(counter_types, result, strict=True):
+                results[counter_type] = int(value)
+            return results
+        except Exception as e:
+            logger.error(
+                f"Counter increment_many failed: types={counter_types}, "
+                f"user_id={user_id}, device_id={device_id}, error={e}"
+            )
+            raise
+
     async def get(
         self,
         counter_type: CounterType,
         user_id: Optional[int],
         device_id: Optional[str],
+        exact: bool = False,
     ) -> int:
         """
         获取当前计数值
@@ -157,6 +386,8 @@ class CounterService:
             counter_type: 计数器类型
             user_id: 用户 ID
             device_id: 设备 ID
+            exact: True 时先写入本 worker 的缓冲增量，再只读取 Redis；
+                False 时返回 Redis 值 + 本 worker 未落盘的增量
 
         Returns:
             当前计数值（不存在或出错返回 0）
@@ -166,9 +397,13 @@ class CounterService:
         key = self._build_key(counter_type, user_id, device_id)
 
         try:
+            if exact and self._pending_delta(key):
+                await self.flush()
+
             redis = await redis_client.get_client()
             value = await redis.get(key)
-            return int(value) if value else 0
+            current = int(value) if value else 0
+            return current if exact else current + self._pending_delta(key)
         except Exception as e:
             logger.error(
                 f"Counter get failed: type={counter_type}, "
@@ -185,7 +420,7 @@ class CounterService:
         """
         合并匿名用户计数到已登录用户
 
-        使用 Lua 脚本保证原子性：
+        所有计数器在一次 Lua 脚本调用中合并，保证原子性：
         1. 读取匿名计数值
         2. 累加到用户计数
         3. 只在必要时更新 TTL（不覆盖无 TTL 的 key）
@@ -202,45 +437,45 @@ class CounterService:
         if counter_types is None:
             counter_types = list(CounterType)
 
-        redis = await redis_client.get_client()
-        results = {}
+        # 先写入缓冲的增量，避免未落盘的匿名计数被遗漏
+        await self.flush()
 
-        try:
-            for counter_type in counter_types:
-                anonymous_key = self._build_key(
-                    counter_type, user_id=None, device_id=device_id
-                )
-                user_key = self._build_key(
-                    counter_type, user_id=user_id, device_id=None
-                )
-                config = get_counter_config(counter_type)
-
-                # 使用 Lua 脚本原子性地合并计数器
-                result = await redis.eval(  # type: ignore[misc]
-                    _MERGE_ANONYMOUS_SCRIPT,
-                    2,
-                    anonymous_key,
-                    user_key,
-                    config.ttl_seconds,
-                )
-
-                merged_value = int(result) if result is not None else 0
-                results[counter_type] = merged_value
-
-                # 只记录实际合并了数据的操作
-                if merged_value > 0:
-                    logger.info(
-                        f"Merged anonymous counter: type={counter_type}, "
-                        f"device_id={device_id}, user_id={user_id}, "
-                        f"merged_value={merged_value}"
-                    )
+        if not counter_types:
+            return {}
+
+        keys = []
+        args: list[int] = []
+        for counter_type in counter_types:
+            keys.append(
+                self._build_key(counter_type, user_id=None, device_id=device_id)
+            )
+            keys.append(self._build_key(counter_type, user_id=user_id, device_id=None))
+            args.append(get_counter_config(counter_type).ttl_seconds)
 
+        try:
+            # 使用 Lua 脚本原子性地合并所有计数器
+            result = await redis_client.eval_script(
+                _MERGE_ANONYMOUS_SCRIPT, keys=keys, args=args
+            )
         except Exception as e:
             logger.error(
                 f"Counter merge failed: user_id={user_id}, device_id={device_id}, error={e}"
             )
             raise
 
+        results = {
+            counter_type: int(value) if value is not None else 0
+            for counter_type, value in zip(counter_types, result, strict=True)
+        }
+
+        # 只记录实际合并了数据的操作
+        merged = {k.value: v for k, v in results.items() if v > 0}
+        if merged:
+            logger.info(
+                f"Merged anonymous counters: device_id={device_id}, "
+                f"user_id={user_id}, merged_values={merged}"
+            )
+
         return results
 
     async def reset(
@@ -263,6 +498,8 @@ class CounterService:
         self._validate_user_or_device(user_id, device_id)
 
         key = self._build_key(counter_type, user_id, device_id)
+        self._pending.pop(key, None)
+        self._flushed_values.pop(key)
 
         try:
             redis = await redis_client.get_client()
@@ -333,8 +570,8 @@ class CounterService:
             values = await redis.mget(*keys)
 
             results = {
-                counter_type: int(v) if v else 0
-                for counter_type, v in zip(CounterType, values)
+                counter_type: (int(v) if v else 0) + self._pending_delta(key)
+                for counter_type, key, v in zip(CounterType, keys, values, strict=True)
             }
 
             return results
@@ -0,0 +1,183 @@
+"""
+邮件投递服务（Redis Streams 消费者组）
+
+EmailVerificationService 把验证码邮件写入 Stream，由本服务的后台 worker 发送：
+- 通过 EmailSender 的 SMTP 连接池发送，连接在 worker 之间复用
+- 发送失败不确认，消息留在 PEL 中，空闲超过 EMAIL_QUEUE_RETRY_IDLE_MS 后
+  由任意 worker 通过 XPENDING + XCLAIM 认领重试
+- 投递次数达到上限的消息转入死信 Stream，并清理验证码和限流记录
+- 处理完成后 XACK + XDEL
+"""
+
+import asyncio
+import os
+import socket
+from typing import Any
+
+from app.constants.auth import (
+    EMAIL_QUEUE_BATCH_SIZE,
+    EMAIL_QUEUE_BLOCK_MS,
+    EMAIL_QUEUE_DEAD_LETTER_STREAM,
+    EMAIL_QUEUE_GROUP,
+    EMAIL_QUEUE_MAX_DELIVERIES,
+    EMAIL_QUEUE_RETRY_IDLE_MS,
+    EMAIL_QUEUE_STREAM,
+    EMAIL_QUEUE_WORKERS,
+)
+from app.core.singleton import singleton
+from app.i18n.dependencies import DEFAULT_LANGUAGE
+from app.services.email_verification_service import email_verification_service
+from app.utils.email_sender import email_sender
+from app.utils.logger import logger
+from app.utils.metrics import register_metrics
+from app.utils.redis_queue import RedisQueue
+from app.utils.time import timestamp_now
+
+
+@singleton
+class EmailDeliveryService:
+    """邮件投递服务"""
+
+    def __init__(self) -> None:
+        self._queue = RedisQueue()
+        self._tasks: list[asyncio.Task] = []
+        self._sent = 0
+        self._failed_attempts = 0
+        self._reclaimed = 0
+        self._dead_lettered = 0
+
+    async def start(self) -> None:
+        """创建消费者组并启动 worker"""
+        if self._tasks:
+            return
+        await self._queue.create_group(EMAIL_QUEUE_STREAM, EMAIL_QUEUE_GROUP)
+
+        base_name = f"{socket.gethostname()}-{os.getpid()}"
+        for i in range(EMAIL_QUEUE_WORKERS):
+            consumer = f"{base_name}-{i}"
+            self._tasks.append(asyncio.create_task(self._run(consumer)))
+
+    async def stop(self) -> None:
+        """停止 worker（未确认的消息会被其他进程认领）"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        await email_sender.close()
+
+    async def _run(self, consumer: str) -> None:
+        """worker 主循环"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await self._reclaim_stale(consumer)
+
+                started = loop.time()
+                messages = await self._queue.read_group(
+                    EMAIL_QUEUE_STREAM,
+                    EMAIL_QUEUE_GROUP,
+                    consumer,
+                    count=EMAIL_QUEUE_BATCH_SIZE,
+                    block=EMAIL_QUEUE_BLOCK_MS,
+                )
+                for message in messages:
+                    await self._deliver(message)
+
+                # read_group 出错时立即返回空列表，避免空转
+                elapsed = loop.time() - started
+                if not messages and elapsed < EMAIL_QUEUE_BLOCK_MS / 2000:
+                    await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email worker {consumer} error: {e}")
+                await asyncio.sleep(1)
+
+    async def _reclaim_stale(self, consumer: str) -> None:
+        """认领空闲超时的待确认消息：重试或转入死信"""
+        pending = await self._queue.get_stale_pending(
+            EMAIL_QUEUE_STREAM,
+            EMAIL_QUEUE_GROUP,
+            min_idle_ms=EMAIL_QUEUE_RETRY_IDLE_MS,
+            count=EMAIL_QUEUE_BATCH_SIZE,
+        )
+        if not pending:
+            return
+
+        deliveries = {p["message_id"]: p["times_delivered"] for p in pending}
+        messages = await self._queue.claim(
+            EMAIL_QUEUE_STREAM,
+            EMAIL_QUEUE_GROUP,
+            consumer,
+            min_idle_ms=EMAIL_QUEUE_RETRY_IDLE_MS,
+            message_ids=list(deliveries.keys()),
+        )
+
+        for message in messages:
+            self._reclaimed += 1
+            if deliveries.get(message["message_id"], 0) >= EMAIL_QUEUE_MAX_DELIVERIES:
+                await self._dead_letter(message, deliveries[message["message_id"]])
+            else:
+                await self._deliver(message)
+
+    async def _deliver(self, message: dict[str, Any]) -> None:
+        """发送一封邮件，成功后确认并删除消息"""
+        email = message.get("email", "")
+        try:
+            email_message = email_sender.build_verify_code_message(
+                email,
+                message.get("code", ""),
+                message.get("language", DEFAULT_LANGUAGE),  # type: ignore[arg-type]
+            )
+            await email_sender.send_message(email_message)
+        except Exception as e:
+            # 不确认：消息留在 PEL 中，空闲超时后重试
+            self._failed_attempts += 1
+            logger.warning(f"Email delivery to {email} failed, will retry: {e}")
+            return
+
+        self._sent += 1
+        logger.info(f"Verification code sent to {email}")
+        await self._queue.acknowledge(
+            EMAIL_QUEUE_STREAM, EMAIL_QUEUE_GROUP, message["message_id"], delete=True
+        )
+
+    async def _dead_letter(self, message: dict[str, Any], deliveries: int) -> None:
+        """转入死信 Stream（不保存验证码），并允许用户立即重新获取验证码"""
+        email = message.get("email", "")
+        self._dead_lettered += 1
+        logger.error(f"Email delivery to {email} failed after {deliveries} attempts")
+
+        await self._queue.add_message(
+            EMAIL_QUEUE_DEAD_LETTER_STREAM,
+            {
+                "email": email,
+                "language": message.get("language", DEFAULT_LANGUAGE),
+                "deliveries": deliveries,
+                "failed_at": timestamp_now(),
+            },
+        )
+        await email_verification_service.on_delivery_failed(email)
+        await self._queue.acknowledge(
+            EMAIL_QUEUE_STREAM, EMAIL_QUEUE_GROUP, message["message_id"], delete=True
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取投递统计"""
+        return {
+            "workers": len(self._tasks),
+            "sent": self._sent,
+            "failed_attempts": self._failed_attempts,
+            "reclaimed": self._reclaimed,
+            "dead_lettered": self._dead_lettered,
+        }
+
+
+# 全局邮件投递服务实例
+email_delivery_service = EmailDeliveryService()
+
+register_metrics("email_delivery", email_delivery_service.get_stats)
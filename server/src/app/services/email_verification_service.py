@@ -4,6 +4,7 @@ import secrets
 from enum import Enum
 
 from app.constants.auth import (
+    EMAIL_QUEUE_STREAM,
     EMAIL_VERIFY_CODE_EXPIRE_SECONDS,
     EMAIL_VERIFY_CODE_LENGTH,
     EMAIL_VERIFY_MAX_ATTEMPTS,
@@ -13,9 +14,9 @@ from app.constants.auth import (
 from app.core.redis import redis_client
 from app.core.singleton import singleton
 from app.i18n.dependencies import DEFAULT_LANGUAGE, SupportedLanguage
-from app.utils.email_sender import email_sender
 from app.utils.logger import logger
 from app.utils.redis_key import build_redis_key
+from app.utils.redis_queue import RedisQueue
 from app.utils.redis_rate_limiter import RedisRateLimiter
 
 
@@ -35,6 +36,7 @@ class EmailVerificationService:
         self._key_prefix = "email_verify"
         self._attempts_prefix = "email_verify_attempts"
         self._rate_limiter = RedisRateLimiter()
+        self._queue = RedisQueue()
 
     def _build_key(self, email: str) -> str:
         """构建验证码 Redis key."""
@@ -57,6 +59,8 @@ class EmailVerificationService:
     ) -> SendResult:
         """发送验证码（原子操作，包含限流检查）.
 
+        验证码存储后投递到邮件队列即返回，不等待 SMTP 发送。
+
         Args:
             email: 邮箱地址
             language: 语言代码
@@ -90,22 +94,32 @@ class EmailVerificationService:
             logger.error(f"Failed to store verification code: {e}")
             return SendResult.SEND_FAILED
 
-        # 发送邮件
-        success = await email_sender.send_verify_code(email, code, language)
+        # 投递到邮件队列，由后台 worker 发送
+        message_id = await self._queue.add_message(
+            EMAIL_QUEUE_STREAM,
+            {"email": email, "code": code, "language": language},
+        )
 
-        # 如果发送失败,删除验证码并清除限流记录
-        if not success:
-            try:
-                redis = await redis_client.get_client()
-                await redis.delete(redis_key)
-                # 清除限流记录(CD),允许用户立即重试
-                await self._rate_limiter.reset(f"email_verify:{email}")
-            except Exception as e:
-                logger.warning(f"Failed to cleanup verification code: {e}")
+        # 入队失败，删除验证码并清除限流记录
+        if message_id is None:
+            await self.on_delivery_failed(email)
             return SendResult.SEND_FAILED
 
         return SendResult.SUCCESS
 
+    async def on_delivery_failed(self, email: str) -> None:
+        """邮件最终发送失败：删除验证码并清除限流记录(CD)，允许用户立即重试.
+
+        Args:
+            email: 邮箱地址
+        """
+        try:
+            redis = await redis_client.get_client()
+            await redis.delete(self._build_key(email))
+            await self._rate_limiter.reset(f"email_verify:{email}")
+        except Exception as e:
+            logger.warning(f"Failed to cleanup verification code: {e}")
+
     async def verify_code(
         self,
         email: str,
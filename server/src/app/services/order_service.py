@@ -1,23 +1,55 @@
 """订单核心服务"""
 
+import base64
+import binascii
 import time
-from typing import Optional
+from functools import partial
+from typing import Any, Optional
 
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select
 
 from app.constants.order import (
+    ORDER_COUNT_CACHE_KEY_PREFIX,
+    ORDER_COUNT_CACHE_TTL_SECONDS,
+    ORDER_LIST_MAX_LIMIT,
+    ORDER_STATE_ALLOWED_FROM,
     ORDER_STATE_TRANSITIONS,
     OrderCreateParam,
     OrderStatus,
 )
-from app.core.database import get_async_session
+from app.core.database import get_async_session, run_after_commit
+from app.core.redis import redis_client
 from app.core.singleton import singleton
+from app.exceptions.common_exception import AppCommonException
+from app.i18n.common_code import CommonCode
 from app.models.order_model import OrderModel
 from app.services.base_service import BaseService
 from app.utils.logger import logger
+from app.utils.redis_key import build_redis_key
 from app.utils.time import timestamp_now
 
 
+def _encode_cursor(created_at: int, order_id: int) -> str:
+    """把分页位置编码为不透明游标"""
+    raw = f"{created_at}:{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, int]:
+    """
+    解析游标
+
+    Raises:
+        AppCommonException: 游标无效（INVALID_REQUEST）
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, order_id = base64.urlsafe_b64decode(padded).decode().split(":")
+        return int(created_at), int(order_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise AppCommonException(code=CommonCode.INVALID_REQUEST)
+
+
 @singleton
 class OrderService(BaseService[OrderModel]):
     """订单核心服务"""
@@ -61,7 +93,9 @@ class OrderService(BaseService[OrderModel]):
             expired_at=expired_at,
             client_ip=param.client_ip,
         )
-        return await self.create(order)
+        order = await self.create(order)
+        await run_after_commit(partial(self.invalidate_order_count, param.user_id))
+        return order
 
     async def get_order_by_no(self, order_no: str) -> Optional[OrderModel]:
         """根据订单号查询订单
@@ -80,40 +114,176 @@ class OrderService(BaseService[OrderModel]):
     async def get_user_orders(
         self,
         user_id: int,
-        status: Optional[str] = None,
-        offset: int = 0,
+        status: Optional[int] = None,
+        cursor: Optional[str] = None,
         limit: int = 20,
-    ) -> list[OrderModel]:
-        """获取用户订单列表
+    ) -> tuple[list[OrderModel], Optional[str]]:
+        """获取用户订单列表（游标分页，按创建时间倒序）
+
+        WHERE user_id = :uid AND (created_at, id) < 游标位置，
+        走 idx_user_created 索引，翻到多深都只扫描 limit + 1 行。
 
         Args:
             user_id: 用户ID
             status: 订单状态（可选）
-            offset: 偏移量
-            limit: 限制数量
+            cursor: 上一页返回的游标，None 表示第一页
+            limit: 每页数量
 
         Returns:
-            list[OrderModel]: 订单列表
+            (订单列表, 下一页游标)，没有下一页时游标为 None
+
+        Raises:
+            AppCommonException: 游标无效（INVALID_REQUEST）
         """
+        limit = max(1, min(limit, ORDER_LIST_MAX_LIMIT))
+
+        stmt = select(OrderModel).where(OrderModel.user_id == user_id)
+        if status is not None:
+            stmt = stmt.where(OrderModel.order_status == status)
+        if cursor:
+            created_at, order_id = _decode_cursor(cursor)
+            stmt = stmt.where(
+                or_(
+                    OrderModel.created_at < created_at,
+                    and_(
+                        OrderModel.created_at == created_at,
+                        OrderModel.id < order_id,
+                    ),
+                )
+            )
+        stmt = stmt.order_by(
+            OrderModel.created_at.desc(), OrderModel.id.desc()
+        ).limit(limit + 1)
+
+        async with get_async_session() as db:
+            result = await db.execute(stmt)
+            orders = list(result.scalars().all())
+
+        next_cursor = None
+        if len(orders) > limit:
+            orders = orders[:limit]
+            next_cursor = _encode_cursor(orders[-1].created_at, orders[-1].id)
+        return orders, next_cursor
+
+    async def count_user_orders(
+        self, user_id: int, status: Optional[int] = None
+    ) -> int:
+        """统计用户订单数（Redis 缓存，创建订单和状态变更时失效）"""
+        cache_key = self._build_count_cache_key(user_id)
+        field = "all" if status is None else str(status)
+        try:
+            redis = await redis_client.get_client()
+            cached = await redis.hget(cache_key, field)  # type: ignore[misc]
+            if cached is not None:
+                return int(cached)
+        except Exception as e:
+            # Redis 故障时回源数据库
+            logger.warning(f"Order count cache read failed: {e}")
+
+        stmt = (
+            select(func.count())
+            .select_from(OrderModel)
+            .where(OrderModel.user_id == user_id)
+        )
+        if status is not None:
+            stmt = stmt.where(OrderModel.order_status == status)
         async with get_async_session() as db:
-            stmt = select(OrderModel).where(OrderModel.user_id == user_id)
+            total = (await db.execute(stmt)).scalar_one()
+
+        try:
+            redis = await redis_client.get_client()
+            pipe = redis.pipeline()
+            pipe.hset(cache_key, field, str(total))
+            pipe.expire(cache_key, ORDER_COUNT_CACHE_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Order count cache write failed: {e}")
+        return total
+
+    async def invalidate_order_count(self, user_id: int) -> None:
+        """失效用户订单数缓存"""
+        try:
+            redis = await redis_client.get_client()
+            await redis.delete(self._build_count_cache_key(user_id))
+        except Exception as e:
+            logger.warning(f"Order count cache delete failed: {e}")
+
+    async def _invalidate_order_count_by(self, where: dict[str, Any]) -> None:
+        """状态变更提交后失效订单所属用户的订单数缓存
+
+        MySQL 的 UPDATE 没有 RETURNING，更新成功后再查一次 user_id；
+        查询失败只记录日志，不影响已经成功的状态转换。
+        """
+        try:
+            async with get_async_session() as db:
+                stmt = select(OrderModel.user_id).filter_by(**where)
+                user_id = (await db.execute(stmt)).scalar_one_or_none()
+        except Exception as e:
+            logger.warning(f"Failed to look up order owner {where}: {e}")
+            return
+        if user_id is not None:
+            await run_after_commit(partial(self.invalidate_order_count, user_id))
+
+    @staticmethod
+    def _build_count_cache_key(user_id: int) -> str:
+        """构建订单数缓存 Redis key"""
+        return build_redis_key(f"{ORDER_COUNT_CACHE_KEY_PREFIX}:{user_id}")
+
+    async def _transition_order_status(
+        self,
+        where: dict[str, Any],
+        new_status: int,
+        **values: Any,
+    ) -> bool:
+        """原子状态转换（compare-and-set）
 
-            if status:
-                stmt = stmt.where(OrderModel.order_status == status)
+        UPDATE ... SET order_status = :to WHERE ... AND order_status IN (:allowed_from)
+        并发回调中只有一个能把状态从允许的前置状态改掉，其余匹配 0 行。
 
-            stmt = (
-                stmt.order_by(OrderModel.created_at.desc()).offset(offset).limit(limit)
+        Args:
+            where: 定位订单的条件（id 或 order_no）
+            new_status: 新状态
+            **values: 同时更新的其他字段
+
+        Returns:
+            bool: 是否更新成功
+        """
+        to_status = OrderStatus(new_status)
+        allowed_from = ORDER_STATE_ALLOWED_FROM.get(to_status, [])
+        if not allowed_from:
+            logger.warning(f"No status can transition to {to_status.value}")
+            return False
+
+        updated = await self.update_where(
+            {**where, "order_status": [s.value for s in allowed_from]},
+            order_status=to_status.value,
+            updated_at=timestamp_now(),
+            **values,
+        )
+        if updated:
+            await self._invalidate_order_count_by(where)
+            return True
+
+        # 失败路径才多查一次，区分订单不存在和状态不允许
+        async with get_async_session() as db:
+            stmt = select(OrderModel.order_status).filter_by(**where)
+            current = (await db.execute(stmt)).scalar_one_or_none()
+        if current is None:
+            logger.warning(f"Order not found: {where}")
+        else:
+            logger.warning(
+                f"Invalid status transition for order {where}: "
+                f"{current} -> {to_status.value}"
             )
-            result = await db.execute(stmt)
-            return list(result.scalars().all())
+        return False
 
     async def update_order_status(
         self,
         order_id: int,
-        new_status: str,
+        new_status: int,
         paid_at: Optional[int] = None,
     ) -> bool:
-        """更新订单状态（带状态机验证）
+        """更新订单状态（带状态机验证，原子操作）
 
         Args:
             order_id: 订单ID
@@ -123,40 +293,24 @@ class OrderService(BaseService[OrderModel]):
         Returns:
             bool: 是否更新成功
         """
-        order = await self.get_by_id(order_id)
-        if not order:
-            logger.warning(f"Order not found: {order_id}")
-            return False
-
-        # 验证状态转换
-        from_status = OrderStatus(order.order_status)
-        to_status = OrderStatus(new_status)
-
-        if not self.can_transition_order_status(from_status, to_status):
-            logger.warning(
-                f"Invalid status transition: {from_status.value} -> {to_status.value}"
-            )
-            return False
-
-        # 更新状态
-        update_data: dict = {
-            "order_status": new_status,
-            "updated_at": timestamp_now(),
-        }
-
+        values: dict[str, Any] = {}
         if paid_at is not None:
-            update_data["paid_at"] = paid_at
+            values["paid_at"] = paid_at
 
-        return await self.update(order_id, **update_data)
+        return await self._transition_order_status(
+            {"id": order_id}, new_status, **values
+        )
 
     async def update_order_by_no(
         self,
         order_no: str,
-        new_status: str,
+        new_status: int,
         channel_order_no: Optional[str] = None,
         paid_at: Optional[int] = None,
     ) -> bool:
-        """根据订单号更新订单状态
+        """根据订单号更新订单状态（带状态机验证，原子操作）
+
+        重复的支付回调只有一个会成功。
 
         Args:
             order_no: 订单号
@@ -167,69 +321,32 @@ class OrderService(BaseService[OrderModel]):
         Returns:
             bool: 是否更新成功
         """
-        # 先获取订单用于验证状态（session 会在此后关闭）
-        order = await self.get_order_by_no(order_no)
-        if not order:
-            logger.warning(f"Order not found: {order_no}")
-            return False
-
-        # 验证状态转换
-        from_status = OrderStatus(order.order_status)
-        to_status = OrderStatus(new_status)
+        values: dict[str, Any] = {}
+        if channel_order_no:
+            values["payment_channel_order_no"] = channel_order_no
+        if paid_at is not None:
+            values["paid_at"] = paid_at
 
-        if not self.can_transition_order_status(from_status, to_status):
-            logger.warning(
-                f"Invalid status transition: {from_status.value} -> {to_status.value}"
+        try:
+            updated = await self._transition_order_status(
+                {"order_no": order_no}, new_status, **values
             )
+        except Exception as e:
+            logger.error(f"Failed to update order {order_no}: {e}")
             return False
 
-        # 更新状态（在新 session 中重新查询并更新）
-        update_data: dict = {
-            "order_status": new_status,
-            "updated_at": timestamp_now(),
-        }
-
-        if channel_order_no:
-            update_data["payment_channel_order_no"] = channel_order_no
-
-        if paid_at is not None:
-            update_data["paid_at"] = paid_at
-
-        async with get_async_session() as db:
-            try:
-                # 在新 session 中重新查询订单
-                stmt = select(OrderModel).where(OrderModel.order_no == order_no)
-                result = await db.execute(stmt)
-                order = result.scalar_one_or_none()
-
-                if not order:
-                    logger.warning(f"Order not found in new session: {order_no}")
-                    return False
-
-                # 更新字段
-                for key, value in update_data.items():
-                    setattr(order, key, value)
-                await db.commit()
-                logger.info(f"Order {order_no} status updated to {new_status}")
-                return True
-            except Exception as e:
-                await db.rollback()
-                logger.error(f"Failed to update order {order_no}: {e}")
-                return False
+        if updated:
+            logger.info(f"Order {order_no} status updated to {new_status}")
+        return updated
 
     async def update_callback_status(self, order_no: str, callback_status: int) -> bool:
-        async with get_async_session() as db:
-            stmt = select(OrderModel).where(OrderModel.order_no == order_no)
-            result = await db.execute(stmt)
-            order = result.scalar_one_or_none()
-            
-            if not order:
-                return False
-            
-            order.callback_status = callback_status
-            order.updated_at = timestamp_now()
-            await db.commit()
-            return True
+        """更新订单回调状态"""
+        updated = await self.update_where(
+            {"order_no": order_no},
+            callback_status=callback_status,
+            updated_at=timestamp_now(),
+        )
+        return updated > 0
 
     def _generate_order_no(self) -> str:
         """生成订单号
@@ -3,21 +3,41 @@
 from typing import Optional
 
 from app.api.user_dependencies import UserContext
+from app.constants.subscription import SubscriptionPeriodEnum, get_subscription_config
 from app.core.redis import redis_client
 from app.core.singleton import singleton
 from app.services.subscription_service import subscription_service
 from app.utils.logger import logger
 from app.utils.redis_key import build_redis_key
-from app.utils.time import get_today_date
+from app.utils.time import get_today_date, timestamp_now
 
 
 # Lua 脚本：原子性配额检查与增加（支持批量）
-_CHECK_AND_INCR_QUOTA_SCRIPT = """
+# 订阅层级从 KEYS[3] 的订阅缓存 Hash 读取，一次调用完成判定，无需查询 MySQL
+# ARGV[5] == '1' 时读取订阅 Hash；为 '0' 时直接使用 ARGV[1] 作为每日限额
+_CHECK_AND_INCR_QUOTA_SCRIPT = redis_client.register_script(
+    """
 local reset_key = KEYS[1]
 local counter_key = KEYS[2]
+local subscription_key = KEYS[3]
 local daily_limit = tonumber(ARGV[1])
 local today_date = ARGV[2]
 local count = tonumber(ARGV[3]) or 1
+local now = tonumber(ARGV[4])
+local use_subscription = ARGV[5]
+
+-- 从订阅缓存读取每日限额
+if use_subscription == '1' then
+    local subscription = redis.call('HMGET', subscription_key, 'daily_limit', 'expires_at')
+    if not subscription[1] then
+        return {-2, 0, 0}  -- 订阅缓存缺失，由调用方回源
+    end
+    -- 订阅过期（或没有过期时间）按免费版处理，ARGV[1] 为免费版限额
+    local expires_at = tonumber(subscription[2])
+    if expires_at and expires_at > now then
+        daily_limit = tonumber(subscription[1])
+    end
+end
 
 -- 无限制检查（-1 表示无限制）
 if daily_limit == -1 then
@@ -57,6 +77,46 @@ redis.call('EXPIRE', counter_key, 86400 * 2)
 
 return {new_value, daily_limit - new_value, count}
 """
+)
+
+# Lua 脚本：原子性地合并游客当日配额计数到已登录用户
+# 只合并今日的游客计数；用户计数不是今日的先按懒重置规则清零
+_MERGE_ANONYMOUS_QUOTA_SCRIPT = redis_client.register_script(
+    """
+local anonymous_reset_key = KEYS[1]
+local anonymous_counter_key = KEYS[2]
+local user_reset_key = KEYS[3]
+local user_counter_key = KEYS[4]
+local today_date = ARGV[1]
+
+local anonymous_value = 0
+if redis.call('GET', anonymous_reset_key) == today_date then
+    anonymous_value = tonumber(redis.call('GET', anonymous_counter_key)) or 0
+end
+
+-- 用户计数器日期已变更，先重置
+if redis.call('GET', user_reset_key) ~= today_date then
+    redis.call('SET', user_reset_key, today_date, 'EX', 86400 * 2)
+    redis.call('SET', user_counter_key, 0, 'EX', 86400 * 2)
+end
+
+local new_value
+if anonymous_value > 0 then
+    new_value = redis.call('INCRBY', user_counter_key, anonymous_value)
+    redis.call('EXPIRE', user_counter_key, 86400 * 2)
+else
+    new_value = tonumber(redis.call('GET', user_counter_key)) or 0
+end
+
+-- 删除游客计数器
+redis.call('DEL', anonymous_reset_key, anonymous_counter_key)
+
+return new_value
+"""
+)
+
+# Lua 脚本返回值：订阅缓存缺失
+_SUBSCRIPTION_CACHE_MISS = -2
 
 
 @singleton
@@ -97,16 +157,10 @@ class QuotaService:
         if count > 10000:
             raise ValueError("count too large")
 
-        # 获取用户订阅配置
         user_id = user_context.user_id if user_context else 0
-        subscription, config = await subscription_service.get_user_subscription_config(
-            user_id
-        )
-        daily_limit = config.daily_download_limit
-
-        # 无限制用户直接放行
-        if daily_limit == -1:
-            return True, 0, -1
+        free_limit = get_subscription_config(
+            SubscriptionPeriodEnum.FREE
+        ).daily_download_limit
 
         # 构建 Redis key
         reset_key, counter_key = self._build_redis_keys(user_context)
@@ -115,21 +169,47 @@ class QuotaService:
         today = get_today_date()
 
         try:
-            redis = await redis_client.get_client()
-            result = await redis.eval(  # type: ignore[misc]
-                _CHECK_AND_INCR_QUOTA_SCRIPT,
-                2,
-                reset_key,
-                counter_key,
-                daily_limit,
-                today,
-                count,
-            )
+            if user_id:
+                # 已登录用户：由 Lua 脚本读取订阅缓存中的限额，一次 Redis 调用完成
+                result = await self._eval_quota_script(
+                    reset_key,
+                    counter_key,
+                    subscription_service.build_cache_key(user_id),
+                    free_limit,
+                    today,
+                    count,
+                    use_subscription=True,
+                )
+                if result is not None and int(result[0]) == _SUBSCRIPTION_CACHE_MISS:
+                    # 订阅缓存缺失：回源获取限额（同时回填缓存），再以显式限额执行
+                    _, config = await subscription_service.get_user_subscription_config(
+                        user_id
+                    )
+                    result = await self._eval_quota_script(
+                        reset_key,
+                        counter_key,
+                        subscription_service.build_cache_key(user_id),
+                        config.daily_download_limit,
+                        today,
+                        count,
+                        use_subscription=False,
+                    )
+            else:
+                # 游客：固定使用免费版限额
+                result = await self._eval_quota_script(
+                    reset_key,
+                    counter_key,
+                    counter_key,
+                    free_limit,
+                    today,
+                    count,
+                    use_subscription=False,
+                )
 
             if result is None:
                 logger.error("Redis quota check failed")
                 # fail-open：允许请求，但记录错误
-                return True, 0, daily_limit
+                return True, 0, free_limit
 
             used, remaining, consumed = result
             used_int, remaining_int, consumed_int = (
@@ -138,6 +218,10 @@ class QuotaService:
                 int(consumed),
             )
 
+            # 无限制用户
+            if remaining_int == -1:
+                return True, 0, -1
+
             # 检查是否允许（consumed == count 表示成功消耗了配额）
             # Lua 脚本超限时返回 {current, 0, 0}，其中 consumed = 0
             # Lua 脚本成功时返回 {new_value, remaining, count}，其中 consumed = count
@@ -152,7 +236,30 @@ class QuotaService:
         except Exception as e:
             logger.error(f"Quota check error: {e}")
             # fail-open：允许请求
-            return True, 0, daily_limit
+            return True, 0, free_limit
+
+    async def _eval_quota_script(
+        self,
+        reset_key: str,
+        counter_key: str,
+        subscription_key: str,
+        daily_limit: int,
+        today: str,
+        count: int,
+        use_subscription: bool,
+    ) -> Optional[list]:
+        """执行配额检查 Lua 脚本"""
+        return await redis_client.eval_script(
+            _CHECK_AND_INCR_QUOTA_SCRIPT,
+            keys=[reset_key, counter_key, subscription_key],
+            args=[
+                daily_limit,
+                today,
+                count,
+                timestamp_now(),
+                "1" if use_subscription else "0",
+            ],
+        )
 
     def _build_redis_keys(
         self,
@@ -177,19 +284,56 @@ class QuotaService:
             # 游客：使用 device_id
             if not user_context.device_id:
                 raise ValueError("device_id is required for anonymous users")
-            user_type = "anonymous"
-            identifier = user_context.device_id
-        else:
-            # 已登录用户：使用 user_id
-            user_type = "authenticated"
-            identifier = str(user_context.user_id)
+            return self._build_keys_for("anonymous", user_context.device_id)
+
+        # 已登录用户：使用 user_id
+        return self._build_keys_for("authenticated", str(user_context.user_id))
 
+    def _build_keys_for(self, user_type: str, identifier: str) -> tuple[str, str]:
+        """构建 (reset_key, counter_key)"""
         base = f"quota:daily:{user_type}:{identifier}"
         counter_key = build_redis_key(base)
         reset_key = build_redis_key(f"quota:reset_date:{user_type}:{identifier}")
 
         return reset_key, counter_key
 
+    async def merge_anonymous_to_user(self, user_id: int, device_id: str) -> int:
+        """
+        合并游客当日已用配额到已登录用户（一次 Lua 脚本调用）
+
+        Args:
+            user_id: 目标用户 ID
+            device_id: 游客设备 ID
+
+        Returns:
+            合并后用户当日已用次数
+        """
+        anonymous_reset_key, anonymous_counter_key = self._build_keys_for(
+            "anonymous", device_id
+        )
+        user_reset_key, user_counter_key = self._build_keys_for(
+            "authenticated", str(user_id)
+        )
+
+        try:
+            result = await redis_client.eval_script(
+                _MERGE_ANONYMOUS_QUOTA_SCRIPT,
+                keys=[
+                    anonymous_reset_key,
+                    anonymous_counter_key,
+                    user_reset_key,
+                    user_counter_key,
+                ],
+                args=[get_today_date()],
+            )
+        except Exception as e:
+            logger.error(
+                f"Quota merge failed: user_id={user_id}, device_id={device_id}, error={e}"
+            )
+            raise
+
+        return int(result) if result is not None else 0
+
     async def get_user_daily_used(self, user_id: int) -> int:
         """获取用户每日已用次数"""
         # 从 Redis 获取已用次数
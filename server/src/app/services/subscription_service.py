@@ -4,26 +4,164 @@ from datetime import timedelta
 from typing import Optional
 
 from app.constants.subscription import (
+    SUBSCRIPTION_CACHE_KEY_PREFIX,
+    SUBSCRIPTION_CACHE_TTL_SECONDS,
+    SUBSCRIPTION_INVALIDATE_CHANNEL,
+    SUBSCRIPTION_LOCAL_CACHE_MAX_SIZE,
+    SUBSCRIPTION_LOCAL_CACHE_TTL_SECONDS,
     SubscriptionConfig,
     SubscriptionPeriodEnum,
     get_subscription_config,
 )
+from app.core.redis import redis_client
 from app.core.singleton import singleton
 from app.models.order_model import OrderModel
 from app.models.subscription_model import UserSubscriptionModel
 from app.services.base_service import BaseService
+from app.utils.local_cache import LocalTTLCache
 from app.utils.logger import logger
+from app.utils.metrics import register_metrics
+from app.utils.redis_key import build_redis_key
+from app.utils.redis_pubsub import redis_pubsub
 from app.utils.time import timestamp_now, timestamp_now_datetime
 
+# 缓存的订阅记录：(period, expires_at)
+CachedSubscription = tuple[str, Optional[int]]
+
+
+def _period_value(period: SubscriptionPeriodEnum | str) -> str:
+    """订阅周期转为字符串值（str 枚举的 str() 会带上类名）"""
+    if isinstance(period, SubscriptionPeriodEnum):
+        return period.value
+    return str(period)
+
 
 @singleton
 class SubscriptionService(BaseService[UserSubscriptionModel]):
-    """订阅管理服务"""
+    """订阅管理服务
+
+    读取走两级缓存：进程内 LRU -> Redis Hash -> MySQL。
+    订阅变更时写穿 Redis 并通过 Pub/Sub 通知所有 worker 淘汰本地缓存。
+    """
 
     primary_key_field = "user_id"
 
     def __init__(self):
         super().__init__(UserSubscriptionModel)
+        self._local_cache: LocalTTLCache[CachedSubscription] = LocalTTLCache(
+            max_size=SUBSCRIPTION_LOCAL_CACHE_MAX_SIZE,
+            default_ttl=SUBSCRIPTION_LOCAL_CACHE_TTL_SECONDS,
+        )
+        self._redis_hits = 0
+        self._db_loads = 0
+        redis_pubsub.subscribe(
+            SUBSCRIPTION_INVALIDATE_CHANNEL, self._on_invalidate_message
+        )
+
+    def _build_cache_key(self, user_id: int) -> str:
+        """构建订阅缓存 Redis key"""
+        return build_redis_key(f"{SUBSCRIPTION_CACHE_KEY_PREFIX}:{user_id}")
+
+    async def _get_cached_subscription(self, user_id: int) -> CachedSubscription:
+        """
+        读取订阅记录（进程内缓存 -> Redis -> MySQL）
+
+        用户没有订阅记录时返回 ("free", None)，同样会被缓存
+        """
+        cached = self._local_cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        cache_key = self.build_cache_key(user_id)
+        try:
+            redis = await redis_client.get_client()
+            data = await redis.hgetall(cache_key)  # type: ignore[misc]
+            if data:
+                expires_at = data.get("expires_at")
+                cached = (
+                    data.get("period", SubscriptionPeriodEnum.FREE.value),
+                    int(expires_at) if expires_at else None,
+                )
+                self._redis_hits += 1
+                self._local_cache.set(user_id, cached)
+                return cached
+        except Exception as e:
+            # Redis 故障时回源数据库
+            logger.warning(f"Subscription cache read failed: {e}")
+
+        subscription = await self.get_by_id(user_id)
+        self._db_loads += 1
+        if subscription:
+            cached = (_period_value(subscription.period), subscription.expires_at)
+        else:
+            cached = (SubscriptionPeriodEnum.FREE.value, None)
+
+        await self._store_cache(user_id, cached)
+        return cached
+
+    async def _store_cache(self, user_id: int, cached: CachedSubscription) -> None:
+        """写入 Redis 和进程内缓存"""
+        period, expires_at = cached
+        cache_key = self.build_cache_key(user_id)
+        # 当前周期的每日配额（未过期时生效，过期判断由读取方完成）
+        daily_limit = get_subscription_config(period).daily_download_limit  # type: ignore[arg-type]
+        try:
+            redis = await redis_client.get_client()
+            pipe = redis.pipeline()
+            pipe.hset(
+                cache_key,
+                mapping={
+                    "period": period,
+                    "expires_at": "" if expires_at is None else str(expires_at),
+                    "daily_limit": str(daily_limit),
+                },
+            )
+            pipe.expire(cache_key, SUBSCRIPTION_CACHE_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Subscription cache write failed: {e}")
+
+        self._local_cache.set(user_id, cached)
+
+    async def refresh_cache(
+        self, user_id: int, period: str, expires_at: Optional[int]
+    ) -> None:
+        """
+        订阅变更后写穿缓存
+
+        写入 Redis（配额检查依赖其中的 daily_limit）并通知所有 worker 淘汰进程内缓存
+        """
+        await self._store_cache(user_id, (period, expires_at))
+        await redis_pubsub.publish(SUBSCRIPTION_INVALIDATE_CHANNEL, str(user_id))
+
+    async def invalidate_cache(self, user_id: int) -> None:
+        """
+        失效用户订阅缓存
+
+        删除 Redis 缓存并通知所有 worker 淘汰进程内缓存
+        """
+        self._local_cache.pop(user_id)
+        try:
+            redis = await redis_client.get_client()
+            await redis.delete(self.build_cache_key(user_id))
+        except Exception as e:
+            logger.warning(f"Subscription cache delete failed: {e}")
+        await redis_pubsub.publish(SUBSCRIPTION_INVALIDATE_CHANNEL, str(user_id))
+
+    def _on_invalidate_message(self, message: str) -> None:
+        """处理其他 worker 发来的订阅变更通知"""
+        try:
+            self._local_cache.pop(int(message))
+        except ValueError:
+            logger.warning(f"Invalid subscription invalidate message: {message}")
+
+    def get_cache_stats(self) -> dict:
+        """获取缓存命中统计"""
+        return {
+            "local": self._local_cache.stats(),
+            "redis_hits": self._redis_hits,
+            "db_loads": self._db_loads,
+        }
 
     async def get_user_subscription(self, user_id: int) -> UserSubscriptionModel:
         """
@@ -31,12 +169,14 @@ class SubscriptionService(BaseService[UserSubscriptionModel]):
 
         默认返回 'free'，无需显式创建记录
         """
-        subscription = await self.get_by_id(user_id)
-        logger.info(subscription)
-        if subscription:
-            # 检查是否未过期（< 表示未过期）
-            if subscription.expires_at and subscription.expires_at > timestamp_now():
-                return subscription
+        period, expires_at = await self._get_cached_subscription(user_id)
+        # 检查是否未过期（< 表示未过期）
+        if expires_at and expires_at > timestamp_now():
+            return UserSubscriptionModel(
+                user_id=user_id,
+                period=period,
+                expires_at=expires_at,
+            )
 
         # logger.info("fuck")
         return UserSubscriptionModel(
@@ -63,7 +203,7 @@ class SubscriptionService(BaseService[UserSubscriptionModel]):
             existing = await self.get_by_id(user_id)
 
             if existing:
-                return await self.update(
+                updated = await self.update(
                     user_id,
                     period=period,
                     expires_at=expires_at,
@@ -76,11 +216,15 @@ class SubscriptionService(BaseService[UserSubscriptionModel]):
                     expires_at=expires_at,
                 )
                 await self.create(subscription)
-                return True
+                updated = True
         except Exception as e:
             logger.error(f"Update user subscription failed: {e}")
+            await self.invalidate_cache(user_id)
             raise
 
+        await self.refresh_cache(user_id, _period_value(period), expires_at)
+        return updated
+
     async def get_user_subscription_config(
         self, user_id: int
     ) -> tuple[UserSubscriptionModel, SubscriptionConfig]:
@@ -150,3 +294,5 @@ class SubscriptionService(BaseService[UserSubscriptionModel]):
 
 # 全局实例
 subscription_service = SubscriptionService()
+
+register_metrics("subscription_cache", subscription_service.get_cache_stats)
@@ -0,0 +1,291 @@
+"""
+Token 撤销同步服务（基于 Redis Stream）
+
+每个 worker 在本地维护一份撤销列表，由 Redis Stream 驱动：
+- 单个 token 撤销：token 哈希 → 过期时间（过期后自动清理）
+- 用户全部撤销：user_id → 撤销时间点（在此之前签发的 token 全部失效）
+
+revoke_token / revoke_all_user_tokens / rotate_refresh_token 写入 Stream，
+各 worker 后台 XREAD 追加到本地。启动时用 XRANGE 回放最近一个 token 有效期内的记录。
+本地追赶延迟超过阈值时返回 None，由调用方回退到 Redis ZSCORE 校验。
+"""
+
+import asyncio
+import time
+from typing import Any, Optional
+
+from app.constants.auth import (
+    TOKEN_REVOCATION_MAX_LAG_SECONDS,
+    TOKEN_REVOCATION_READ_BATCH_SIZE,
+    TOKEN_REVOCATION_READ_BLOCK_MS,
+    TOKEN_REVOCATION_STREAM,
+)
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.core.singleton import singleton
+from app.utils.logger import logger
+from app.utils.metrics import register_metrics
+from app.utils.redis_key import build_redis_key
+from app.utils.time import timestamp_now
+
+# Stream 消息类型
+_KIND_TOKEN = "token"
+_KIND_USER = "user"
+
+# 本地过期条目清理间隔（秒）
+_PRUNE_INTERVAL_SECONDS = 60
+
+
+def _next_stream_id(stream_id: str) -> str:
+    """返回紧跟在 stream_id 之后的 ID（用于 XRANGE 分页）"""
+    ms, seq = stream_id.split("-")
+    return f"{ms}-{int(seq) + 1}"
+
+
+@singleton
+class TokenRevocationService:
+    """Token 撤销同步服务"""
+
+    def __init__(self):
+        self._stream_key = build_redis_key(f"stream:{TOKEN_REVOCATION_STREAM}")
+        # md5(token) 原始字节 → (生效时间, 过期时间)，毫秒时间戳
+        self._revoked_tokens: dict[bytes, tuple[int, int]] = {}
+        # user_id → 撤销时间点（毫秒时间戳）
+        self._revoked_before: dict[int, int] = {}
+        self._last_id = "0-0"
+        # 最近一次成功读取 Stream 的 monotonic 时间，None 表示尚未同步
+        self._last_synced_at: Optional[float] = None
+        self._last_pruned_at = 0.0
+        self._task: asyncio.Task | None = None
+        self._local_checks = 0
+        self._fallbacks = 0
+
+    @staticmethod
+    def _max_token_lifetime_ms() -> int:
+        """token 最长有效期（毫秒），决定 Stream 保留和回放的范围"""
+        return (
+            max(settings.auth.access_token_expire, settings.auth.refresh_token_expire)
+            * 1000
+        )
+
+    async def start(self) -> None:
+        """回放历史记录并启动后台同步任务"""
+        if self._task is not None:
+            return
+        try:
+            await self._load_history()
+        except Exception as e:
+            logger.error(f"Failed to load token revocation history: {e}")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台同步任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._last_synced_at = None
+
+    async def publish_token_revoked(
+        self, token_hash: str, expires_at: int, effective_at: Optional[int] = None
+    ) -> None:
+        """
+        发布单个 token 撤销
+
+        Args:
+            token_hash: token 的 MD5 哈希（十六进制）
+            expires_at: token 过期时间（毫秒时间戳），之后无需再记录
+            effective_at: 撤销生效时间（毫秒时间戳），默认立即生效
+        """
+        effective_at = effective_at or timestamp_now()
+        self._apply_token(token_hash, effective_at, expires_at)
+        await self._publish(
+            {
+                "kind": _KIND_TOKEN,
+                "hash": token_hash,
+                "effective_at": effective_at,
+                "expires_at": expires_at,
+            }
+        )
+
+    async def publish_user_revoked(self, user_id: int, revoked_before: int) -> None:
+        """
+        发布用户全部 token 撤销
+
+        Args:
+            user_id: 用户 ID
+            revoked_before: 撤销时间点（毫秒时间戳），此前签发的 token 全部失效
+        """
+        self._apply_user(user_id, revoked_before)
+        await self._publish(
+            {"kind": _KIND_USER, "user_id": user_id, "revoked_before": revoked_before}
+        )
+
+    def is_revoked(
+        self, token_hash: str, user_id: int, issued_at: int
+    ) -> Optional[bool]:
+        """
+        本地判断 token 是否已撤销
+
+        Args:
+            token_hash: token 的 MD5 哈希（十六进制）
+            user_id: 用户 ID
+            issued_at: token 签发时间（毫秒时间戳）
+
+        Returns:
+            True 已撤销，False 未撤销；本地列表落后过多时返回 None（调用方需回退 Redis）
+        """
+        if not self.is_synced():
+            self._fallbacks += 1
+            return None
+
+        self._local_checks += 1
+        now = timestamp_now()
+
+        revoked_before = self._revoked_before.get(user_id)
+        if revoked_before is not None and issued_at < revoked_before:
+            return True
+
+        entry = self._revoked_tokens.get(bytes.fromhex(token_hash))
+        if entry is not None:
+            effective_at, _ = entry
+            return effective_at <= now
+
+        return False
+
+    def is_synced(self) -> bool:
+        """本地撤销列表是否在允许的延迟范围内"""
+        if self._last_synced_at is None:
+            return False
+        lag = time.monotonic() - self._last_synced_at
+        return lag <= TOKEN_REVOCATION_MAX_LAG_SECONDS
+
+    async def _publish(self, fields: dict[str, Any]) -> None:
+        """写入 Stream，同时按最长有效期裁剪旧记录"""
+        try:
+            redis = await redis_client.get_client()
+            min_id = timestamp_now() - self._max_token_lifetime_ms()
+            await redis.xadd(
+                self._stream_key,
+                {k: str(v) for k, v in fields.items()},
+                minid=min_id,
+                approximate=True,
+            )
+        except Exception as e:
+            logger.error(f"Failed to publish token revocation: {e}")
+
+    async def _load_history(self) -> None:
+        """启动时回放最近一个 token 有效期内的撤销记录"""
+        redis = await redis_client.get_client()
+        start_id = f"{timestamp_now() - self._max_token_lifetime_ms()}-0"
+        # 没有历史记录时从回放起点开始追加读取，不会漏掉回放期间写入的消息
+        self._last_id = start_id
+        loaded = 0
+
+        while True:
+            entries = await redis.xrange(
+                self._stream_key,
+                min=start_id,
+                max="+",
+                count=TOKEN_REVOCATION_READ_BATCH_SIZE,
+            )
+            if not entries:
+                break
+            for entry_id, fields in entries:
+                self._apply_message(fields)
+                self._last_id = entry_id
+            loaded += len(entries)
+            start_id = _next_stream_id(self._last_id)
+
+        self._last_synced_at = time.monotonic()
+        logger.info(f"Loaded {loaded} token revocation records")
+
+    async def _run(self) -> None:
+        """后台同步循环"""
+        while True:
+            try:
+                redis = await redis_client.get_client()
+                result = await redis.xread(
+                    {self._stream_key: self._last_id},
+                    count=TOKEN_REVOCATION_READ_BATCH_SIZE,
+                    block=TOKEN_REVOCATION_READ_BLOCK_MS,
+                )
+                for _, entries in result or []:
+                    for entry_id, fields in entries:
+                        self._apply_message(fields)
+                        self._last_id = entry_id
+                self._last_synced_at = time.monotonic()
+                self._prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Token revocation sync error, retrying: {e}")
+                await asyncio.sleep(1)
+
+    def _apply_message(self, fields: dict[str, str]) -> None:
+        """应用一条 Stream 消息"""
+        try:
+            kind = fields.get("kind")
+            if kind == _KIND_TOKEN:
+                self._apply_token(
+                    fields["hash"],
+                    int(fields["effective_at"]),
+                    int(fields["expires_at"]),
+                )
+            elif kind == _KIND_USER:
+                self._apply_user(int(fields["user_id"]), int(fields["revoked_before"]))
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Invalid token revocation message {fields}: {e}")
+
+    def _apply_token(self, token_hash: str, effective_at: int, expires_at: int) -> None:
+        """记录单个 token 撤销，已过期的 token 无需记录"""
+        if expires_at <= timestamp_now():
+            return
+        self._revoked_tokens[bytes.fromhex(token_hash)] = (effective_at, expires_at)
+
+    def _apply_user(self, user_id: int, revoked_before: int) -> None:
+        """记录用户撤销时间点，只保留最晚的一次"""
+        current = self._revoked_before.get(user_id, 0)
+        self._revoked_before[user_id] = max(current, revoked_before)
+
+    def _prune(self) -> None:
+        """清理已过期的本地条目"""
+        if time.monotonic() - self._last_pruned_at < _PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_pruned_at = time.monotonic()
+
+        now = timestamp_now()
+        self._revoked_tokens = {
+            k: v for k, v in self._revoked_tokens.items() if v[1] > now
+        }
+        # 撤销时间点早于最长有效期的用户记录已无意义
+        cutoff = now - self._max_token_lifetime_ms()
+        self._revoked_before = {
+            k: v for k, v in self._revoked_before.items() if v > cutoff
+        }
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取同步状态统计"""
+        lag = (
+            round(time.monotonic() - self._last_synced_at, 3)
+            if self._last_synced_at is not None
+            else None
+        )
+        return {
+            "revoked_tokens": len(self._revoked_tokens),
+            "revoked_users": len(self._revoked_before),
+            "last_id": self._last_id,
+            "lag_seconds": lag,
+            "local_checks": self._local_checks,
+            "fallbacks": self._fallbacks,
+        }
+
+
+# 全局 Token 撤销同步服务实例
+token_revocation_service = TokenRevocationService()
+
+register_metrics("token_revocation", token_revocation_service.get_stats)
@@ -0,0 +1,188 @@
+"""
+Token 清理服务
+
+定期清理 access_token:{user_id} / refresh_token:{user_id} ZSet：
+- 删除已过期的成员
+- 每个用户只保留最新的 N 个会话（被淘汰的 token 同步到撤销列表）
+- key 的过期时间设置为剩余成员中最晚的过期时间
+
+多 worker 通过 Redis 锁选主，每个周期只有一个 worker 执行清理。
+"""
+
+import asyncio
+from typing import Any
+
+from app.constants.auth import (
+    TOKEN_CLEANUP_BATCH_SIZE,
+    TOKEN_CLEANUP_INTERVAL_SECONDS,
+    TOKEN_MAX_SESSIONS_PER_USER,
+)
+from app.core.redis import redis_client
+from app.core.singleton import singleton
+from app.services.token_revocation_service import token_revocation_service
+from app.utils.logger import logger
+from app.utils.metrics import register_metrics
+from app.utils.redis_key import build_redis_key
+from app.utils.redis_lock import RedisLock
+from app.utils.time import timestamp_now
+
+# Lua 脚本：批量清理 token ZSet
+# KEYS: token ZSet keys
+# ARGV[1]: 当前时间（毫秒时间戳）
+# ARGV[2]: 每个用户最多保留的会话数
+# 返回值：{过期删除数, 淘汰的 token 哈希1, 过期时间1, 哈希2, 过期时间2, ...}
+_SWEEP_TOKENS_SCRIPT = redis_client.register_script(
+    """
+local max_sessions = tonumber(ARGV[2])
+local result = {0}
+
+for _, key in ipairs(KEYS) do
+    -- 删除已过期的成员（score 为过期时间）
+    result[1] = result[1] + redis.call('ZREMRANGEBYSCORE', key, '-inf', '(' .. ARGV[1])
+
+    local count = redis.call('ZCARD', key)
+    if count > max_sessions then
+        -- 只保留过期时间最晚（最新签发）的会话
+        local evicted = redis.call('ZRANGE', key, 0, count - max_sessions - 1, 'WITHSCORES')
+        redis.call('ZREMRANGEBYRANK', key, 0, count - max_sessions - 1)
+        for i = 1, #evicted do
+            table.insert(result, evicted[i])
+        end
+    end
+
+    if count > 0 then
+        local latest = redis.call('ZRANGE', key, -1, -1, 'WITHSCORES')
+        redis.call('PEXPIREAT', key, latest[2])
+    end
+end
+
+return result
+"""
+)
+
+# 需要清理的 key 模式
+_TOKEN_KEY_PATTERNS = ("access_token:*", "refresh_token:*")
+
+_LOCK_KEY = "token_sweeper"
+
+
+@singleton
+class TokenSweeperService:
+    """Token 清理服务"""
+
+    def __init__(self):
+        self._lock = RedisLock()
+        self._task: asyncio.Task | None = None
+        self._runs = 0
+        self._last_run_at = 0
+        self._last_scanned = 0
+        self._last_expired = 0
+        self._last_evicted = 0
+
+    async def start(self) -> None:
+        """启动后台清理任务"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台清理任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """每个周期尝试抢锁，抢到的 worker 执行清理"""
+        while True:
+            try:
+                # 锁持有一个周期不主动释放，保证每个周期只清理一次
+                lock_value = await self._lock.acquire(
+                    _LOCK_KEY, ttl=TOKEN_CLEANUP_INTERVAL_SECONDS
+                )
+                if lock_value is not None:
+                    await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token sweep failed: {e}")
+
+            await asyncio.sleep(TOKEN_CLEANUP_INTERVAL_SECONDS)
+
+    async def sweep(self) -> tuple[int, int, int]:
+        """
+        执行一次清理
+
+        Returns:
+            (扫描的 key 数, 删除的过期 token 数, 淘汰的 token 数)
+        """
+        redis = await redis_client.get_client()
+        scanned = expired = evicted = 0
+
+        for pattern in _TOKEN_KEY_PATTERNS:
+            batch: list[str] = []
+            async for key in redis.scan_iter(
+                match=build_redis_key(pattern), count=TOKEN_CLEANUP_BATCH_SIZE
+            ):
+                batch.append(key)
+                if len(batch) >= TOKEN_CLEANUP_BATCH_SIZE:
+                    batch_expired, batch_evicted = await self._sweep_batch(batch)
+                    scanned += len(batch)
+                    expired += batch_expired
+                    evicted += batch_evicted
+                    batch = []
+
+            if batch:
+                batch_expired, batch_evicted = await self._sweep_batch(batch)
+                scanned += len(batch)
+                expired += batch_expired
+                evicted += batch_evicted
+
+        self._runs += 1
+        self._last_run_at = timestamp_now()
+        self._last_scanned = scanned
+        self._last_expired = expired
+        self._last_evicted = evicted
+
+        logger.info(
+            f"Token sweep finished: scanned={scanned}, "
+            f"expired={expired}, evicted={evicted}"
+        )
+        return scanned, expired, evicted
+
+    async def _sweep_batch(self, keys: list[str]) -> tuple[int, int]:
+        """清理一批 key（一次 Lua 脚本调用）"""
+        result = await redis_client.eval_script(
+            _SWEEP_TOKENS_SCRIPT,
+            keys=keys,
+            args=[timestamp_now(), TOKEN_MAX_SESSIONS_PER_USER],
+        )
+        expired = int(result[0])
+        evicted = result[1:]
+
+        # 被淘汰的会话仍在有效期内，需要同步到各 worker 的本地撤销列表
+        for i in range(0, len(evicted), 2):
+            await token_revocation_service.publish_token_revoked(
+                evicted[i], int(float(evicted[i + 1]))
+            )
+
+        return expired, len(evicted) // 2
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取清理统计（只有执行过清理的 worker 有数据）"""
+        return {
+            "runs": self._runs,
+            "last_run_at": self._last_run_at,
+            "last_scanned": self._last_scanned,
+            "last_expired": self._last_expired,
+            "last_evicted": self._last_evicted,
+        }
+
+
+# 全局 Token 清理服务实例
+token_sweeper_service = TokenSweeperService()
+
+register_metrics("token_sweeper", token_sweeper_service.get_stats)
@@ -2,10 +2,16 @@
 User 认证服务
 """
 
-from typing import Optional, Tuple
+from dataclasses import dataclass
+from typing import Optional
 
 from app.utils.jwt import JwtData, JwtUnit
-from app.utils.crypto import verify_password
+from app.utils.crypto import (
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from app.utils.logger import logger
 from app.core.config import settings
 from app.core.singleton import singleton
 from app.services.user_service import UserService
@@ -14,7 +20,17 @@ from app.services.user_token_service import (
 )
 from app.models.user_model import UserModel
 from app.utils.time import timestamp_now
-from app.constants.auth import TokenType
+
+
+@dataclass
+class UserTokens:
+    """为用户签发的令牌对"""
+
+    access_token: str
+    refresh_token: str
+    access_expires_at: int  # 时间戳 毫秒
+    refresh_expires_at: int  # 时间戳 毫秒
+    expires_in: int
 
 
 @singleton
@@ -39,49 +55,46 @@ class UserAuthService:
         if not user:
             return None
 
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             return None
 
+        # 成本因子变更后，登录时透明地重新哈希
+        if password_needs_rehash(user.password_hash):
+            try:
+                password_hash = await hash_password_async(password)
+                await self.user_ops.update(
+                    user.user_id,
+                    password_hash=password_hash,
+                    updated_at=timestamp_now(),
+                )
+                user.password_hash = password_hash
+            except Exception as e:
+                logger.warning(
+                    f"Password rehash failed for user_id={user.user_id}: {e}"
+                )
+
         return user
 
     async def create_user_session(
         self,
         user: UserModel,
-        access_token: str,
-        refresh_token: str,
+        tokens: UserTokens,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
     ) -> bool:
         """
         创建用户 Token（替代原来的 Session）
 
+        两个 token 在一次 MULTI 往返中写入。
         注意：ip_address 和 user_agent 参数保留以兼容接口，但不再存储
         """
-
-        jwt_data = JwtUnit.decode_token(access_token)
-        refresh_jwt_data = JwtUnit.decode_token(refresh_token)
-        if not jwt_data or not refresh_jwt_data:
-            return False
-
-        success = True
-
-        if jwt_data.exp:
-            success &= await self.token_ops.store_token(
-                access_token,
-                user.user_id,
-                TokenType.USER_ACCESS,
-                jwt_data.exp,
-            )
-
-        if refresh_jwt_data.exp:
-            success &= await self.token_ops.store_token(
-                refresh_token,
-                user.user_id,
-                TokenType.USER_REFRESH,
-                refresh_jwt_data.exp,
-            )
-
-        return success
+        return await self.token_ops.store_session_tokens(
+            user.user_id,
+            tokens.access_token,
+            tokens.access_expires_at,
+            tokens.refresh_token,
+            tokens.refresh_expires_at,
+        )
 
     async def update_user_login_info(self, user: UserModel) -> bool:
         """更新用户登录信息"""
@@ -103,7 +116,7 @@ class UserAuthService:
     def create_tokens_for_user(
         self,
         user: UserModel,
-    ) -> Tuple[str, str, int]:
+    ) -> UserTokens:
         """
         为用户创建访问令牌和刷新令牌
 
@@ -111,7 +124,7 @@ class UserAuthService:
             user: 用户对象
 
         Returns:
-            Tuple[str, str, int]: (access_token, refresh_token, expires_in)
+            UserTokens: 令牌对及其过期时间（直接使用签发时的值，无需再解码）
         """
         # 创建访问令牌（使用 userid 字段）
         access_token, access_expire = JwtUnit.create_access_token(
@@ -133,7 +146,13 @@ class UserAuthService:
 
         expires_in = access_expire - timestamp_now()
 
-        return access_token, refresh_token, expires_in
+        return UserTokens(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            access_expires_at=access_expire,
+            refresh_expires_at=refresh_expire,
+            expires_in=expires_in,
+        )
 
 
 # 全局认证服务实例
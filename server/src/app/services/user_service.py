@@ -8,7 +8,7 @@ from app.core.database import get_async_session
 from app.core.singleton import singleton
 from app.services.base_service import BaseService
 from app.models.user_model import UserModel
-from app.utils.crypto import hash_password
+from app.utils.crypto import hash_password_async
 from app.utils.time import timestamp_now
 
 
@@ -29,7 +29,7 @@ class UserService(BaseService[UserModel]):
         avatar_url: Optional[str] = None,
     ) -> UserModel:
         """创建用户"""
-        password_hash = hash_password(password)
+        password_hash = await hash_password_async(password)
         user = UserModel(  # type: ignore[call-arg]
             email=email,
             password_hash=password_hash,
@@ -67,23 +67,15 @@ class UserService(BaseService[UserModel]):
             return result.scalar_one_or_none()
 
     async def update_login_info(self, user_id: int) -> bool:
-        """更新用户登录信息"""
-        async with get_async_session() as db:
-            try:
-                stmt = select(UserModel).where(UserModel.user_id == user_id)
-                result = await db.execute(stmt)
-                user = result.scalar_one_or_none()
-
-                if user:
-                    user.last_login_at = timestamp_now()
-                    user.login_count += 1
-                    user.updated_at = timestamp_now()
-                    await db.commit()
-                    return True
-                return False
-            except Exception:
-                await db.rollback()
-                raise
+        """更新用户登录信息（login_count 在数据库端自增，并发登录不丢计数）"""
+        now = timestamp_now()
+        updated = await self.update_where(
+            {"user_id": user_id},
+            last_login_at=now,
+            login_count=UserModel.login_count + 1,
+            updated_at=now,
+        )
+        return updated > 0
 
     async def increment_failed_attempts(self, user_id: int) -> bool:
         """增加用户失败登录次数"""
@@ -107,39 +99,17 @@ class UserService(BaseService[UserModel]):
 
     async def lock_user_until(self, user_id: int, lock_until: int) -> bool:
         """锁定用户直到指定时间"""
-        async with get_async_session() as db:
-            try:
-                stmt = select(UserModel).where(UserModel.user_id == user_id)
-                result = await db.execute(stmt)
-                user = result.scalar_one_or_none()
-
-                if user:
-                    user.locked_until = lock_until
-                    user.updated_at = timestamp_now()
-                    await db.commit()
-                    return True
-                return False
-            except Exception:
-                await db.rollback()
-                raise
+        updated = await self.update_where(
+            {"user_id": user_id}, locked_until=lock_until, updated_at=timestamp_now()
+        )
+        return updated > 0
 
     async def unlock_user(self, user_id: int) -> bool:
         """解锁用户"""
-        async with get_async_session() as db:
-            try:
-                stmt = select(UserModel).where(UserModel.user_id == user_id)
-                result = await db.execute(stmt)
-                user = result.scalar_one_or_none()
-
-                if user:
-                    user.locked_until = None
-                    user.updated_at = timestamp_now()
-                    await db.commit()
-                    return True
-                return False
-            except Exception:
-                await db.rollback()
-                raise
+        updated = await self.update_where(
+            {"user_id": user_id}, locked_until=None, updated_at=timestamp_now()
+        )
+        return updated > 0
 
 
 user_service = UserService()
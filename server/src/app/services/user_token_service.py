@@ -4,12 +4,16 @@
 
 import hashlib
 
+from redis.asyncio.client import Pipeline
+
 from app.core.redis import redis_client
 from app.core.singleton import singleton
 from app.constants.auth import (
     TokenType,
     REFRESH_TOKEN_GRACE_PERIOD_SECONDS,
 )
+from app.services.token_revocation_service import token_revocation_service
+from app.utils.jwt import JwtUnit
 from app.utils.redis_key import build_redis_key
 from app.utils.time import timestamp_now
 from app.utils.logger import logger
@@ -44,6 +48,17 @@ class UserTokenService:
         """计算 Token 的 MD5 哈希（用于存储）"""
         return hashlib.md5(token.encode()).hexdigest()
 
+    @staticmethod
+    def _extend_expiry(pipe: Pipeline, key: str, expires_at: int) -> None:
+        """
+        把 ZSet 的过期时间延长到新成员的过期时间（只延长不缩短）
+
+        GT 把没有过期时间的 key 视为永不过期而不生效，
+        所以先用 NX 给新建的 key 设置过期时间。
+        """
+        pipe.pexpireat(key, expires_at, nx=True)
+        pipe.pexpireat(key, expires_at, gt=True)
+
     async def store_token(
         self,
         token: str,
@@ -67,13 +82,56 @@ class UserTokenService:
         token_hash = self._hash_token(token)
         key = self._build_key(token_type, user_id)
 
-        await redis.zadd(key, {token_hash: expires_at})
+        pipe = redis.pipeline(transaction=True)
+        pipe.zadd(key, {token_hash: expires_at})
+        self._extend_expiry(pipe, key, expires_at)
+        await pipe.execute()
 
         logger.debug(
             f"Stored token: user_id={user_id}, type={token_type}, expires_at={expires_at}"
         )
         return True
 
+    async def store_session_tokens(
+        self,
+        user_id: int,
+        access_token: str,
+        access_expires_at: int,
+        refresh_token: str,
+        refresh_expires_at: int,
+    ) -> bool:
+        """
+        一次 MULTI 往返存储 access token 和 refresh token
+
+        Args:
+            user_id: 用户 ID
+            access_token: 访问令牌
+            access_expires_at: 访问令牌过期时间（毫秒时间戳）
+            refresh_token: 刷新令牌
+            refresh_expires_at: 刷新令牌过期时间（毫秒时间戳）
+
+        Returns:
+            是否存储成功
+        """
+        redis = await self._redis.get_client()
+
+        access_key = self._build_key(TokenType.USER_ACCESS, user_id)
+        refresh_key = self._build_key(TokenType.USER_REFRESH, user_id)
+
+        pipe = redis.pipeline(transaction=True)
+        pipe.zadd(access_key, {self._hash_token(access_token): access_expires_at})
+        self._extend_expiry(pipe, access_key, access_expires_at)
+        pipe.zadd(refresh_key, {self._hash_token(refresh_token): refresh_expires_at})
+        self._extend_expiry(pipe, refresh_key, refresh_expires_at)
+        await pipe.execute()
+
+        logger.debug(
+            f"Stored session tokens: user_id={user_id}, "
+            f"access_expires_at={access_expires_at}, "
+            f"refresh_expires_at={refresh_expires_at}"
+        )
+        return True
+
     async def verify_token(
         self,
         token: str,
@@ -113,6 +171,46 @@ class UserTokenService:
 
         return True
 
+    async def verify_token_local(
+        self,
+        token: str,
+        user_id: int,
+        token_type: TokenType,
+    ) -> bool:
+        """
+        验证 Token 是否有效（本地撤销列表，不访问 Redis）
+
+        校验签名、归属和过期时间后查询本地撤销列表；
+        本地列表落后超过阈值时回退到 verify_token（ZSCORE）。
+
+        与 verify_token 的区别：以撤销事件为准，而不是 ZSet 成员关系。
+        revoke_token、revoke_all_user_tokens、rotate_refresh_token 和过期清理
+        移除 token 时都会发布撤销事件；没有被撤销、但不在 ZSet 中的 token
+        （例如 Redis 数据丢失）仍视为有效。需要 ZSet 成员语义时使用 verify_token。
+
+        Args:
+            token: JWT Token 字符串
+            user_id: 用户 ID
+            token_type: Token 类型
+
+        Returns:
+            Token 是否有效
+        """
+        jwt_data = JwtUnit.decode_token_cached(token)
+        if (
+            jwt_data is None
+            or jwt_data.user_id != user_id
+            or jwt_data.exp < timestamp_now()
+        ):
+            return False
+
+        revoked = token_revocation_service.is_revoked(
+            self._hash_token(token), user_id, jwt_data.iat_ms
+        )
+        if revoked is None:
+            return await self.verify_token(token, user_id, token_type)
+        return not revoked
+
     async def revoke_token(
         self,
         token: str,
@@ -134,7 +232,18 @@ class UserTokenService:
         token_hash = self._hash_token(token)
         key = self._build_key(token_type, user_id)
 
-        result = await redis.zrem(key, token_hash)
+        pipe = redis.pipeline()
+        pipe.zscore(key, token_hash)
+        pipe.zrem(key, token_hash)
+        expires_at, result = await pipe.execute()
+
+        # 通知各 worker 的本地撤销列表
+        if expires_at is None:
+            jwt_data = JwtUnit.decode_token_cached(token)
+            expires_at = jwt_data.exp if jwt_data else 0
+        await token_revocation_service.publish_token_revoked(
+            token_hash, int(expires_at)
+        )
 
         logger.debug(
             f"Revoked token: user_id={user_id}, type={token_type}, result={result}"
@@ -154,17 +263,21 @@ class UserTokenService:
 
         redis = await self._redis.get_client()
 
-        access_key = self._build_key(TokenType.USER_ACCESS, user_id)
-        access_count = await redis.zcard(access_key)
-        await redis.delete(access_key)
+        keys = [
+            self._build_key(TokenType.USER_ACCESS, user_id),
+            self._build_key(TokenType.USER_REFRESH, user_id),
+            self._build_key(TokenType.USER_REFRESH_OLD, user_id),
+        ]
 
-        refresh_key = self._build_key(TokenType.USER_REFRESH, user_id)
-        refresh_count = await redis.zcard(refresh_key)
-        await redis.delete(refresh_key)
+        # 一次 MULTI 往返：先统计数量再删除
+        pipe = redis.pipeline(transaction=True)
+        for key in keys:
+            pipe.zcard(key)
+        pipe.delete(*keys)
+        access_count, refresh_count, refresh_old_count, _ = await pipe.execute()
 
-        refresh_old_key = self._build_key(TokenType.USER_REFRESH_OLD, user_id)
-        refresh_old_count = await redis.zcard(refresh_old_key)
-        await redis.delete(refresh_old_key)
+        # 通知各 worker：此前签发的 token 全部失效
+        await token_revocation_service.publish_user_revoked(user_id, timestamp_now())
 
         total = access_count + refresh_count + refresh_old_count
         logger.info(f"Revoked all tokens for user_id={user_id}, total={total}")
@@ -205,14 +318,28 @@ class UserTokenService:
 
         pipe = redis.pipeline()
 
+        pipe.zscore(refresh_key, old_token_hash)
         pipe.zrem(refresh_key, old_token_hash)
         pipe.zadd(refresh_old_key, {old_token_hash: grace_period_expires_at})
         pipe.expire(refresh_old_key, REFRESH_TOKEN_GRACE_PERIOD_SECONDS)
 
         new_token_hash = self._hash_token(new_refresh_token)
         pipe.zadd(refresh_key, {new_token_hash: new_expires_at})
-
-        await pipe.execute()
+        self._extend_expiry(pipe, refresh_key, new_expires_at)
+
+        results = await pipe.execute()
+
+        # 通知各 worker：旧 token 在宽限期结束后失效
+        old_expires_at = results[0]
+        await token_revocation_service.publish_token_revoked(
+            old_token_hash,
+            (
+                int(old_expires_at)
+                if old_expires_at is not None
+                else grace_period_expires_at
+            ),
+            effective_at=grace_period_expires_at,
+        )
 
         logger.info(
             f"Rotated refresh token: user_id={user_id}, "
@@ -1,7 +1,7 @@
 import hashlib
 from typing import Optional
 from app.i18n import LocaleContext
-from app.i18n.dependencies import DEFAULT_LANGUAGE, LANGUAGE_MAPPING
+from app.i18n.dependencies import DEFAULT_LANGUAGE, parse_accept_language
 from fastapi import Request
 
 
@@ -81,15 +81,9 @@ def get_locale(
     if not accept_language:
         return LocaleContext(language=DEFAULT_LANGUAGE, raw_accept_language=None)
 
-    # 解析 Accept-Language header
+    # 按 q 值解析 Accept-Language header（结果缓存）
     # 格式: "zh-CN,zh;q=0.9,en;q=0.8"
-    # 简化处理：取第一个语言
-    first_lang = accept_language.split(",")[0].strip()
-
-    # 规范化
-    language = LANGUAGE_MAPPING.get(first_lang, DEFAULT_LANGUAGE)
-
     return LocaleContext(
-        language=language,  # type: ignore
+        language=parse_accept_language(accept_language),
         raw_accept_language=accept_language,
     )
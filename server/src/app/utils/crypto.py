@@ -1,33 +1,150 @@
 """
 密码和加密相关工具函数
+
+bcrypt 每次计算耗时 100ms 以上，async 代码中使用 hash_password_async /
+verify_password_async，在独立的有界线程池中执行，避免阻塞事件循环。
 """
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
 import bcrypt
 
+from app.core.config import settings
+from app.exceptions.common_exception import AppCommonException
+from app.i18n.common_code import CommonCode
+from app.utils.metrics import register_metrics
+
+T = TypeVar("T")
+
 
-def hash_password(plain_password: str) -> str:
+def hash_password(plain_password: str, rounds: int | None = None) -> str:
     """使用 bcrypt 哈希密码
-    
+
     Args:
         plain_password: 明文密码
-        
+        rounds: bcrypt 成本因子，默认取 settings.auth.bcrypt_rounds
+
     Returns:
         哈希后的密码字符串
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or settings.auth.bcrypt_rounds)
     return bcrypt.hashpw(plain_password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """验证密码
-    
+
     Args:
         plain_password: 明文密码
         hashed_password: 哈希后的密码
-        
+
     Returns:
-        密码是否匹配
+        密码是否匹配（哈希格式无效时视为不匹配，如无密码用户）
+    """
+    try:
+        return bcrypt.checkpw(
+            plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+        )
+    except ValueError:
+        return False
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """哈希的成本因子与当前配置不一致时需要重新哈希
+
+    bcrypt 哈希格式：$2b$<rounds>$<salt+hash>
+    """
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return False
+    return int(parts[2]) != settings.auth.bcrypt_rounds
+
+
+class PasswordHasherPool:
+    """bcrypt 专用有界线程池
+
+    bcrypt 在计算时释放 GIL，线程池即可并行。
+    排队 + 执行中的任务数达到上限时直接拒绝，避免延迟无限堆积。
     """
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+
+    def __init__(self, pool_size: int, max_queue: int) -> None:
+        """
+        初始化线程池
+
+        Args:
+            pool_size: 线程数
+            max_queue: 允许排队等待的任务数
+        """
+        self._pool_size = pool_size
+        self._max_pending = pool_size + max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="bcrypt"
+        )
+        # 只在事件循环线程中修改
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        在线程池中执行
+
+        Raises:
+            AppCommonException: 线程池已满（SERVICE_BUSY）
+        """
+        if self._pending >= self._max_pending:
+            self._rejected += 1
+            raise AppCommonException(code=CommonCode.SERVICE_BUSY)
+
+        self._pending += 1
+        self._peak_pending = max(self._peak_pending, self._pending)
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+            self._total_seconds += time.perf_counter() - start
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取线程池统计"""
+        return {
+            "pool_size": self._pool_size,
+            "max_pending": self._max_pending,
+            "pending": self._pending,
+            "queued": max(self._pending - self._pool_size, 0),
+            "peak_pending": self._peak_pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_ms": (
+                round(self._total_seconds / self._completed * 1000, 2)
+                if self._completed
+                else 0.0
+            ),
+        }
+
+
+# 全局 bcrypt 线程池
+password_hasher_pool = PasswordHasherPool(
+    pool_size=settings.auth.bcrypt_pool_size,
+    max_queue=settings.auth.bcrypt_max_queue,
+)
+register_metrics("bcrypt_pool", password_hasher_pool.get_stats)
+
+
+async def hash_password_async(plain_password: str) -> str:
+    """在 bcrypt 线程池中哈希密码"""
+    return await password_hasher_pool.run(hash_password, plain_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在 bcrypt 线程池中验证密码"""
+    return await password_hasher_pool.run(
+        verify_password, plain_password, hashed_password
     )
@@ -1,17 +1,40 @@
 """邮件发送工具类 - 支持 SMTP 异步发送."""
 
 import asyncio
+import time
 from email.message import EmailMessage
 from pathlib import Path
+from typing import get_args
 
-import aiosmtplib
-
-from app.constants.auth import EMAIL_SEND_RETRY_DELAY
+from app.constants.auth import (
+    EMAIL_SEND_RETRY_DELAY,
+    EMAIL_TEMPLATE_RELOAD_INTERVAL_SECONDS,
+)
 from app.core.config import settings
 from app.core.singleton import singleton
 from app.i18n.dependencies import DEFAULT_LANGUAGE, SupportedLanguage
 from app.i18n.translator import translator
 from app.utils.logger import logger
+from app.utils.metrics import register_metrics
+from app.utils.smtp_pool import SMTPConnectionPool
+
+# 每封邮件单独替换的占位符
+CODE_PLACEHOLDER = "{code}"
+
+# 模板中的静态文本占位符，对应翻译键 email.<name>
+TEMPLATE_TEXT_KEYS = (
+    "title",
+    "greeting",
+    "instruction",
+    "your_code",
+    "valid_for",
+    "security_title",
+    "security_content",
+    "ignore_message",
+    "auto_send_notice",
+    "brand_name",
+    "brand_slogan",
+)
 
 
 @singleton
@@ -24,47 +47,103 @@ class EmailSender:
         self.template_path = (
             Path(__file__).parent.parent / "templates" / "email_verification.html"
         )
-
-    def _load_html_template(
+        # 语言 → (邮件主题, 按 {code} 切分并已填入翻译的模板片段)
+        self._compiled: dict[str, tuple[str, list[str]]] = {}
+        self._template_mtime = 0.0
+        self._template_checked_at = 0.0
+        self._compile_templates()
+        # 复用 SMTP 连接，避免每封邮件重新握手和登录
+        self.pool = SMTPConnectionPool(self.config)
+
+    def _compile_templates(self) -> None:
+        """加载模板文件，为每种语言预渲染所有静态文本.
+
+        模板先按 {code} 切分，每次发送只需把验证码拼接进去。
+        """
+        mtime = self.template_path.stat().st_mtime
+        source = self.template_path.read_text(encoding="utf-8")
+        segments = source.split(CODE_PLACEHOLDER)
+
+        compiled: dict[str, tuple[str, list[str]]] = {}
+        for language in get_args(SupportedLanguage):
+            replacements = {
+                f"{{{name}}}": translator.translate(f"email.{name}", language)
+                for name in TEMPLATE_TEXT_KEYS
+            }
+            parts = []
+            for segment in segments:
+                for placeholder, text in replacements.items():
+                    segment = segment.replace(placeholder, text)
+                parts.append(segment)
+            subject = translator.translate("email.subject", language)
+            compiled[language] = (subject, parts)
+
+        self._compiled = compiled
+        self._template_mtime = mtime
+        self._template_checked_at = time.monotonic()
+
+    def _reload_if_changed(self) -> None:
+        """调试模式下模板文件变更后重新编译（按间隔检查 mtime）."""
+        now = time.monotonic()
+        if now - self._template_checked_at < EMAIL_TEMPLATE_RELOAD_INTERVAL_SECONDS:
+            return
+        self._template_checked_at = now
+        try:
+            if self.template_path.stat().st_mtime != self._template_mtime:
+                self._compile_templates()
+                logger.info(f"Email template reloaded: {self.template_path.name}")
+        except Exception as e:
+            logger.warning(f"Failed to reload email template: {e}")
+
+    def _render(
         self, code: str, language: SupportedLanguage = DEFAULT_LANGUAGE
-    ) -> str:
-        """加载 HTML 模板并替换验证码和多语言文本.
+    ) -> tuple[str, str]:
+        """渲染验证码邮件.
+
+        Args:
+            code: 验证码
+            language: 语言代码
+
+        Returns:
+            (邮件主题, HTML 内容)
+        """
+        if settings.app.debug:
+            self._reload_if_changed()
+
+        compiled = self._compiled.get(language) or self._compiled[DEFAULT_LANGUAGE]
+        subject, parts = compiled
+        return subject, code.join(parts)
+
+    def build_verify_code_message(
+        self,
+        to_email: str,
+        code: str,
+        language: SupportedLanguage = DEFAULT_LANGUAGE,
+    ) -> EmailMessage:
+        """构建验证码邮件.
 
         Args:
+            to_email: 收件人邮箱
             code: 验证码
             language: 语言代码
 
         Returns:
-            渲染后的 HTML 内容
+            邮件对象
         """
-        html_content = self.template_path.read_text(encoding="utf-8")
-
-        # 替换验证码
-        html_content = html_content.replace("{code}", code)
-
-        # 替换多语言文本
-        replacements = {
-            "{title}": translator.translate("email.title", language),
-            "{greeting}": translator.translate("email.greeting", language),
-            "{instruction}": translator.translate("email.instruction", language),
-            "{your_code}": translator.translate("email.your_code", language),
-            "{valid_for}": translator.translate("email.valid_for", language),
-            "{security_title}": translator.translate("email.security_title", language),
-            "{security_content}": translator.translate(
-                "email.security_content", language
-            ),
-            "{ignore_message}": translator.translate("email.ignore_message", language),
-            "{auto_send_notice}": translator.translate(
-                "email.auto_send_notice", language
-            ),
-            "{brand_name}": translator.translate("email.brand_name", language),
-            "{brand_slogan}": translator.translate("email.brand_slogan", language),
-        }
-
-        for placeholder, text in replacements.items():
-            html_content = html_content.replace(placeholder, text)
-
-        return html_content
+        subject, html_body = self._render(code, language)
+        return self._build_message(to_email, subject, html_body)
+
+    async def send_message(self, message: EmailMessage) -> None:
+        """通过 SMTP 连接池发送邮件.
+
+        Args:
+            message: 邮件对象
+        """
+        await self.pool.send_message(message)
+
+    async def close(self) -> None:
+        """关闭连接池中的空闲连接."""
+        await self.pool.close()
 
     async def send_verify_code(
         self,
@@ -84,17 +163,11 @@ class EmailSender:
         Returns:
             是否发送成功
         """
-        html_body = self._load_html_template(code, language)
-        logger.info(f"send_verify_code: {code}")
-        subject = translator.translate("email.subject", language)
+        message = self.build_verify_code_message(to_email, code, language)
 
         for attempt in range(retry_times):
             try:
-                await self._send_email(
-                    to_email=to_email,
-                    subject=subject,
-                    html_body=html_body,
-                )
+                await self.send_message(message)
                 logger.info(f"Verification code sent to {to_email}")
                 return True
 
@@ -114,42 +187,29 @@ class EmailSender:
 
         return False
 
-    async def _send_email(
+    def _build_message(
         self,
         to_email: str,
         subject: str,
         html_body: str,
-    ) -> None:
-        """发送邮件的底层方法.
+    ) -> EmailMessage:
+        """构建邮件.
 
         Args:
             to_email: 收件人邮箱
             subject: 邮件主题
             html_body: 邮件 HTML 正文
         """
-        # 构建邮件
         message = EmailMessage()
         message["From"] = f"{self.config.from_name} <{self.config.from_email}>"
         message["To"] = to_email
         message["Subject"] = subject
         # 设置 HTML 内容，同时添加纯文本备用
         message.set_content(html_body, subtype="html")
-
-        # 使用 aiosmtplib 异步发送
-        # 端口 587: STARTTLS (start_tls=True)
-        # 端口 465: SSL/TLS (use_tls=True)
-        print(self.config)
-        await aiosmtplib.send(
-            message,
-            hostname=self.config.host,
-            port=self.config.port,
-            username=self.config.username,
-            password=self.config.password,
-            start_tls=(self.config.port == 587),
-            use_tls=(self.config.port == 465),
-            timeout=self.config.timeout,
-        )
+        return message
 
 
 # 全局邮件发送实例
 email_sender = EmailSender()
+
+register_metrics("smtp_pool", email_sender.pool.get_stats)
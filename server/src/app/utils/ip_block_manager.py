@@ -1,11 +1,30 @@
 """IP 封禁管理器
 
 管理 IP 封禁状态，使用 Redis 存储。
+
+进程内缓存封禁状态：
+- 已封禁（正缓存）：按 Redis key 剩余 TTL 过期
+- 未封禁（负缓存）：短 TTL，兜底 Pub/Sub 消息丢失
+- block / unblock 通过 Pub/Sub 通知其他 worker 删除本地条目
 """
 
+import math
+import time
+
+from app.constants.auth import (
+    IP_BLOCK_LOCAL_CACHE_MAX_SIZE,
+    IP_BLOCK_NEGATIVE_CACHE_TTL_SECONDS,
+    IP_BLOCK_SYNC_CHANNEL,
+)
 from app.utils.logger import logger
 from app.core.redis import redis_client
+from app.utils.local_cache import LocalTTLCache
+from app.utils.metrics import register_metrics
 from app.utils.redis_key import build_redis_key
+from app.utils.redis_pubsub import redis_pubsub
+
+# 未封禁的本地缓存值
+_NOT_BLOCKED = 0.0
 
 
 class IPBlockManager:
@@ -19,31 +38,69 @@ class IPBlockManager:
             key_prefix: Redis key 前缀
         """
         self._key_prefix = key_prefix
+        # ip -> 封禁到期时间（time.time() 秒），_NOT_BLOCKED 表示未封禁
+        self._local_cache: LocalTTLCache[float] = LocalTTLCache(
+            max_size=IP_BLOCK_LOCAL_CACHE_MAX_SIZE,
+            default_ttl=IP_BLOCK_NEGATIVE_CACHE_TTL_SECONDS,
+        )
+        self._sync_channel = f"{IP_BLOCK_SYNC_CHANNEL}:{key_prefix}"
+
+        redis_pubsub.subscribe(self._sync_channel, self._on_sync_message)
+        register_metrics(f"{key_prefix}_cache", self._local_cache.stats)
 
     def _build_key(self, ip_address: str) -> str:
         """构建封禁键名"""
         key = f"{self._key_prefix}:{ip_address}"
         return build_redis_key(key)
 
-    async def is_blocked(self, ip_address: str) -> bool:
+    async def check(self, ip_address: str) -> tuple[bool, int]:
         """
-        检查 IP 是否被封禁
+        检查 IP 封禁状态（优先读本地缓存，未命中时一次 PTTL）
 
         Args:
             ip_address: IP 地址
 
         Returns:
-            True 表示被封禁，False 表示未封禁
+            (是否被封禁, 剩余封禁秒数)
         """
+        blocked_until = self._local_cache.get(ip_address)
+        if blocked_until is not None:
+            if blocked_until == _NOT_BLOCKED:
+                return False, 0
+            return True, max(0, math.ceil(blocked_until - time.time()))
+
         try:
             redis_key = self._build_key(ip_address)
             redis = await redis_client.get_client()
-            exists = await redis.exists(redis_key)
-            return bool(exists)
+            pttl = await redis.pttl(redis_key)
         except Exception as e:
             logger.error(f"Failed to check IP block status: {e}")
             # Redis 故障时放行（fail-open），避免因 Redis 故障影响服务可用性
-            return False
+            return False, 0
+
+        if pttl == -2:
+            # key 不存在：未封禁
+            self._local_cache.set(ip_address, _NOT_BLOCKED)
+            return False, 0
+        if pttl == -1:
+            # 没有过期时间（不应出现）：视为封禁，不缓存剩余时间
+            return True, 0
+
+        self._local_cache.set(ip_address, time.time() + pttl / 1000, ttl=pttl / 1000)
+        return True, math.ceil(pttl / 1000)
+
+    async def is_blocked(self, ip_address: str) -> bool:
+        """
+        检查 IP 是否被封禁
+
+        Args:
+            ip_address: IP 地址
+
+        Returns:
+            True 表示被封禁，False 表示未封禁
+        """
+        blocked, _ = await self.check(ip_address)
+        return blocked
 
     async def block(self, ip_address: str, duration: int) -> bool:
         """
@@ -64,12 +121,14 @@ class IPBlockManager:
             await redis.set(redis_key, "1", ex=duration)
 
             logger.warning(f"IP {ip_address} blocked for {duration} seconds")
-            return True
-
         except Exception as e:
             logger.error(f"Failed to block IP {ip_address}: {e}")
             return False
 
+        self._local_cache.set(ip_address, time.time() + duration, ttl=duration)
+        await redis_pubsub.publish(self._sync_channel, ip_address)
+        return True
+
     async def get_remaining_time(self, ip_address: str) -> int:
         """
         获取剩余封禁时间
@@ -80,14 +139,8 @@ class IPBlockManager:
         Returns:
             剩余秒数，0 表示未封禁或已过期
         """
-        try:
-            redis_key = self._build_key(ip_address)
-            redis = await redis_client.get_client()
-            ttl = await redis.ttl(redis_key)
-            return max(0, ttl)
-        except Exception as e:
-            logger.error(f"Failed to get remaining time for IP {ip_address}: {e}")
-            return 0
+        _, remaining = await self.check(ip_address)
+        return remaining
 
     async def unblock(self, ip_address: str) -> bool:
         """
@@ -104,7 +157,14 @@ class IPBlockManager:
             redis = await redis_client.get_client()
             await redis.delete(redis_key)
             logger.info(f"IP {ip_address} unblocked")
-            return True
         except Exception as e:
             logger.error(f"Failed to unblock IP {ip_address}: {e}")
             return False
+
+        self._local_cache.pop(ip_address)
+        await redis_pubsub.publish(self._sync_channel, ip_address)
+        return True
+
+    def _on_sync_message(self, message: str) -> None:
+        """处理其他 worker 发来的封禁变更通知，下次检查时回源 Redis"""
+        self._local_cache.pop(message)
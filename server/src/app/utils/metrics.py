@@ -0,0 +1,38 @@
+"""进程内指标注册表
+
+各模块注册一个返回 dict 的采集函数，由 /api/system/metrics 统一输出。
+指标为每个 worker 独立统计。
+"""
+
+import os
+from collections.abc import Callable
+from typing import Any
+
+from app.utils.logger import logger
+
+MetricsCollector = Callable[[], dict[str, Any]]
+
+_collectors: dict[str, MetricsCollector] = {}
+
+
+def register_metrics(name: str, collector: MetricsCollector) -> None:
+    """
+    注册指标采集函数
+
+    Args:
+        name: 指标分组名
+        collector: 采集函数，返回可 JSON 序列化的字典
+    """
+    _collectors[name] = collector
+
+
+def collect_metrics() -> dict[str, Any]:
+    """采集所有已注册的指标"""
+    result: dict[str, Any] = {"pid": os.getpid()}
+    for name, collector in _collectors.items():
+        try:
+            result[name] = collector()
+        except Exception as e:
+            logger.error(f"Failed to collect metrics '{name}': {e}")
+            result[name] = {}
+    return result
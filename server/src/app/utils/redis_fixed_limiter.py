@@ -11,17 +11,20 @@ import time
 from app.utils.logger import logger
 from app.core.redis import redis_client
 from app.utils.redis_key import build_redis_key
+from app.utils.redis_rate_limiter import RateLimitResult
 
 
 # Lua 脚本：原子性地增加计数器并在首次设置时添加过期时间
 # 返回值：增加后的计数值
-_INCR_WITH_EXPIRE_SCRIPT = """
+_INCR_WITH_EXPIRE_SCRIPT = redis_client.register_script(
+    """
 local current = redis.call('INCR', KEYS[1])
 if current == 1 then
     redis.call('EXPIRE', KEYS[1], ARGV[1])
 end
 return current
 """
+)
 
 
 class RedisFixedLimiter:
@@ -69,22 +72,56 @@ class RedisFixedLimiter:
         Returns:
             True 表示允许，False 表示超过限制
         """
+        result = await self.check(identifier, limit, window)
+        return result.allowed
+
+    async def check(
+        self,
+        identifier: str,
+        limit: int,
+        window: int,
+    ) -> RateLimitResult:
+        """
+        检查并记录一次请求
+
+        Args:
+            identifier: 标识符（如 IP、用户 ID 等）
+            limit: 限制次数
+            window: 时间窗口（秒）
+
+        Returns:
+            限流检查结果（剩余次数、窗口重置时间）
+        """
+        current_time = time.time()
+        window_end = (int(current_time) // window + 1) * window
+        reset_after_ms = max(int((window_end - current_time) * 1000), 0)
+
         try:
             redis_key = self._build_key(identifier, window)
-            redis = await redis_client.get_client()
 
             # 使用 Lua 脚本原子性地增加计数并设置过期时间
-            result = await redis.eval(  # type: ignore[misc]
-                _INCR_WITH_EXPIRE_SCRIPT, 1, redis_key, window + 1
+            result = await redis_client.eval_script(
+                _INCR_WITH_EXPIRE_SCRIPT, keys=[redis_key], args=[window + 1]
             )
             current_count = int(result) if result is not None else 0
 
-            return current_count <= limit
-
         except Exception as e:
             logger.error(f"Fixed window rate limit check failed: {e}")
             # Redis 故障时放行（fail-open），避免因 Redis 故障影响服务可用性
-            return True
+            return RateLimitResult(
+                allowed=True,
+                remaining=limit,
+                retry_after_ms=0,
+                reset_after_ms=reset_after_ms,
+            )
+
+        allowed = current_count <= limit
+        return RateLimitResult(
+            allowed=allowed,
+            remaining=max(limit - current_count, 0),
+            retry_after_ms=0 if allowed else reset_after_ms,
+            reset_after_ms=reset_after_ms,
+        )
 
     async def get_current_count(self, identifier: str, window: int) -> int:
         """
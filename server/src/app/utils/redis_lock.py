@@ -9,6 +9,18 @@ from app.core.redis import redis_client, RedisException
 from app.utils.redis_key import build_redis_key
 
 
+# Lua 脚本：只有持有者才能释放锁
+_RELEASE_LOCK_SCRIPT = redis_client.register_script(
+    """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+)
+
+
 class RedisLockError(RedisException):
     """Redis 锁异常"""
 
@@ -70,19 +82,10 @@ class RedisLock:
         """释放分布式锁"""
         redis_key = self._build_key(key)
 
-        lua_script = """
-        if redis.call("get", KEYS[1]) == ARGV[1] then
-            return redis.call("del", KEYS[1])
-        else
-            return 0
-        end
-        """
-
         try:
-            redis = await redis_client.get_client()
-            result = await redis.eval(
-                lua_script, 1, redis_key, lock_value
-            )  # type: ignore[misc]
+            result = await redis_client.eval_script(
+                _RELEASE_LOCK_SCRIPT, keys=[redis_key], args=[lock_value]
+            )
             return int(result) > 0
         except Exception as e:
             logger.error(f"Failed to release lock '{key}': {e}")
@@ -0,0 +1,117 @@
+"""Redis Pub/Sub 监听器
+
+每个 worker 维持一个订阅连接，把频道消息分发给本地注册的处理函数。
+主要用于跨 worker 失效进程内缓存。
+"""
+
+import asyncio
+import inspect
+from collections.abc import Callable
+from typing import Any
+
+from app.core.redis import redis_client
+from app.utils.logger import logger
+from app.utils.redis_key import build_redis_key
+
+MessageHandler = Callable[[str], Any]
+
+
+class RedisPubSubListener:
+    """Redis Pub/Sub 监听器"""
+
+    def __init__(self) -> None:
+        self._key_prefix = "pubsub"
+        self._handlers: dict[str, list[MessageHandler]] = {}
+        self._task: asyncio.Task | None = None
+
+    def _build_channel(self, channel: str) -> str:
+        """构建频道名"""
+        return build_redis_key(f"{self._key_prefix}:{channel}")
+
+    def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """
+        注册频道处理函数
+
+        需要在 start() 之前调用（通常在模块导入时）。
+
+        Args:
+            channel: 频道名（不含前缀）
+            handler: 处理函数，参数为消息内容，可以是协程函数
+        """
+        self._handlers.setdefault(self._build_channel(channel), []).append(handler)
+
+    async def publish(self, channel: str, message: str) -> int:
+        """
+        发布消息
+
+        Returns:
+            收到消息的订阅者数量，失败返回 0
+        """
+        try:
+            redis = await redis_client.get_client()
+            return int(await redis.publish(self._build_channel(channel), message))
+        except Exception as e:
+            logger.error(f"Failed to publish to channel '{channel}': {e}")
+            return 0
+
+    async def start(self) -> None:
+        """启动后台监听任务"""
+        if self._task is not None or not self._handlers:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止后台监听任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        """监听循环，连接断开后自动重连"""
+        while True:
+            pubsub = None
+            try:
+                redis = await redis_client.get_client()
+                pubsub = redis.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(*self._handlers.keys())
+
+                while True:
+                    # 使用带超时的 get_message，避免触发连接池的 socket_timeout
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message:
+                        await self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis pubsub listener error, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    async def _dispatch(self, message: dict[str, Any]) -> None:
+        """分发消息到处理函数"""
+        channel = str(message.get("channel"))
+        data = str(message.get("data"))
+
+        for handler in self._handlers.get(channel, []):
+            try:
+                result = handler(data)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Pubsub handler failed on channel '{channel}': {e}")
+
+
+# 全局 Pub/Sub 监听器实例
+redis_pubsub = RedisPubSubListener()
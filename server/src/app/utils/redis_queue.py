@@ -99,15 +99,99 @@ class RedisQueue:
             return []
 
     async def acknowledge(
-        self, stream_name: str, group_name: str, message_id: str
+        self,
+        stream_name: str,
+        group_name: str,
+        message_id: str,
+        delete: bool = False,
     ) -> bool:
-        """确认消息已处理"""
+        """确认消息已处理
+
+        Args:
+            delete: 确认后同时 XDEL 删除消息，避免流无限增长
+        """
         try:
             redis_key = self._build_key(stream_name)
             redis = await redis_client.get_client()
-            # XACK: 确认消息已处理
-            result = await redis.xack(redis_key, group_name, message_id)
-            return result > 0
+            if not delete:
+                # XACK: 确认消息已处理
+                result = await redis.xack(redis_key, group_name, message_id)
+                return result > 0
+
+            pipe = redis.pipeline()
+            pipe.xack(redis_key, group_name, message_id)
+            pipe.xdel(redis_key, message_id)
+            acked, _ = await pipe.execute()
+            return acked > 0
         except Exception as e:
             logger.error(f"Failed to acknowledge message '{message_id}': {e}")
             return False
+
+    async def get_stale_pending(
+        self,
+        stream_name: str,
+        group_name: str,
+        min_idle_ms: int,
+        count: int = 10,
+    ) -> list[dict[str, Any]]:
+        """获取空闲超过 min_idle_ms 的待确认消息（XPENDING）
+
+        Returns:
+            [{"message_id", "consumer", "idle_ms", "times_delivered"}, ...]
+        """
+        try:
+            redis_key = self._build_key(stream_name)
+            redis = await redis_client.get_client()
+            entries = await redis.xpending_range(
+                redis_key,
+                group_name,
+                min="-",
+                max="+",
+                count=count,
+                idle=min_idle_ms,
+            )
+            return [
+                {
+                    "message_id": str(entry["message_id"]),
+                    "consumer": str(entry["consumer"]),
+                    "idle_ms": int(entry["time_since_delivered"]),
+                    "times_delivered": int(entry["times_delivered"]),
+                }
+                for entry in entries
+            ]
+        except Exception as e:
+            logger.error(f"Failed to get pending messages of '{stream_name}': {e}")
+            return []
+
+    async def claim(
+        self,
+        stream_name: str,
+        group_name: str,
+        consumer_name: str,
+        min_idle_ms: int,
+        message_ids: list[str],
+    ) -> list[dict[str, Any]]:
+        """把空闲的待确认消息转移给当前消费者（XCLAIM）
+
+        已被删除的消息不会返回。
+        """
+        if not message_ids:
+            return []
+        try:
+            redis_key = self._build_key(stream_name)
+            redis = await redis_client.get_client()
+            result = await redis.xclaim(
+                redis_key, group_name, consumer_name, min_idle_ms, message_ids
+            )
+
+            messages = []
+            for message_id, fields in result:
+                if not fields:
+                    continue
+                message = dict(fields)
+                message["message_id"] = str(message_id)
+                messages.append(message)
+            return messages
+        except Exception as e:
+            logger.error(f"Failed to claim messages of '{stream_name}': {e}")
+            return []
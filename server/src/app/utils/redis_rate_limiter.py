@@ -1,19 +1,144 @@
-"""Redis 限流实现"""
+"""Redis 限流实现
 
+滑动窗口限流，整个检查-写入过程在一个 Lua 脚本中完成（一次往返、无竞态）。
+
+两种模式：
+- 精确模式（默认）：Sorted Set 记录窗口内每次请求，毫秒精度
+- 近似模式：当前/上一固定窗口两个计数器按重叠比例加权，每个 key 只占 O(1) 内存
+"""
+
+import math
 import time
 import uuid
+from dataclasses import dataclass
 
 from app.utils.logger import logger
 from app.core.redis import redis_client
 from app.utils.redis_key import build_redis_key
 
 
+# Lua 脚本：精确滑动窗口（Sorted Set）
+# KEYS[1]: 限流 key
+# ARGV: now_ms, window_ms, limit, member
+# 返回值：{allowed(1/0), remaining, retry_after_ms, reset_after_ms}
+_SLIDING_WINDOW_SCRIPT = redis_client.register_script(
+    """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+-- 移除窗口外的记录
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    -- 最早的记录滑出窗口时额度开始恢复
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    return {1, limit - count - 1, 0, tonumber(oldest[2]) + window - now}
+end
+
+-- 超限：等到第 (count - limit + 1) 早的记录滑出窗口
+local retry_after = window
+local entry = redis.call('ZRANGE', key, count - limit, count - limit, 'WITHSCORES')
+if entry[2] then
+    retry_after = math.max(tonumber(entry[2]) + window - now, 0)
+end
+return {0, 0, retry_after, retry_after}
+"""
+)
+
+# Lua 脚本：近似滑动窗口（两个固定窗口计数器加权）
+# KEYS[1]: 限流 key（Hash：id 当前窗口编号, curr 当前窗口计数, prev 上一窗口计数）
+# ARGV: now_ms, window_ms, limit
+# 返回值：{allowed(1/0), remaining, retry_after_ms, reset_after_ms}
+_APPROXIMATE_WINDOW_SCRIPT = redis_client.register_script(
+    """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+local window_id = math.floor(now / window)
+local elapsed = now - window_id * window
+
+local state = redis.call('HMGET', key, 'id', 'curr', 'prev')
+local stored_id = tonumber(state[1])
+local curr = tonumber(state[2]) or 0
+local prev = tonumber(state[3]) or 0
+
+-- 窗口滚动
+if stored_id ~= window_id then
+    if stored_id == window_id - 1 then
+        prev = curr
+    else
+        prev = 0
+    end
+    curr = 0
+end
+
+local estimated = prev * (window - elapsed) / window + curr
+
+if estimated + 1 <= limit then
+    curr = curr + 1
+    redis.call('HSET', key, 'id', window_id, 'curr', curr, 'prev', prev)
+    redis.call('PEXPIRE', key, window * 2)
+    return {1, math.floor(limit - estimated - 1), 0, window - elapsed}
+end
+
+local retry_after
+if curr + 1 > limit then
+    -- 当前窗口本身已满，至少要等到下一个窗口
+    retry_after = window - elapsed
+else
+    -- 等上一窗口的权重衰减到足够低
+    local target_elapsed = window - (limit - 1 - curr) * window / prev
+    retry_after = math.ceil(target_elapsed - elapsed)
+end
+retry_after = math.max(retry_after, 0)
+return {0, 0, retry_after, retry_after}
+"""
+)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """限流检查结果"""
+
+    allowed: bool
+    # 本次之后窗口内剩余可用次数
+    remaining: int
+    # 被拒绝时，距离下次可能放行的毫秒数；放行时为 0
+    retry_after_ms: int
+    # 距离额度开始恢复的毫秒数
+    reset_after_ms: int = 0
+
+    @property
+    def retry_after(self) -> int:
+        """距离下次可能放行的秒数（向上取整，用于 Retry-After 头）"""
+        return math.ceil(self.retry_after_ms / 1000)
+
+    @property
+    def reset_after(self) -> int:
+        """距离额度开始恢复的秒数（向上取整，用于 RateLimit-Reset 头）"""
+        return math.ceil(self.reset_after_ms / 1000)
+
+
 class RedisRateLimiter:
-    """Redis 限流实现"""
+    """Redis 滑动窗口限流实现"""
 
-    def __init__(self) -> None:
-        self._key_prefix = "rate_limit"
-        self._local_limits: dict[str, list[int]] = {}  # 本地降级
+    def __init__(self, approximate: bool = False) -> None:
+        """
+        初始化限流器
+
+        Args:
+            approximate: 是否使用近似模式（两个固定窗口计数器加权，O(1) 内存）
+        """
+        self._approximate = approximate
+        self._key_prefix = "rate_limit_approx" if approximate else "rate_limit"
+        self._local_limits: dict[str, list[float]] = {}  # 本地降级
 
     def _build_key(self, key: str) -> str:
         """构建限流键名"""
@@ -22,32 +147,59 @@ class RedisRateLimiter:
 
     async def is_allowed(self, key: str, limit: int, window: int) -> bool:
         """检查是否允许请求"""
+        result = await self.check(key, limit, window)
+        return result.allowed
+
+    async def check(self, key: str, limit: int, window: int) -> RateLimitResult:
+        """
+        检查并记录一次请求
+
+        Args:
+            key: 限流标识
+            limit: 窗口内允许的最大请求数
+            window: 窗口大小（秒）
+
+        Returns:
+            限流检查结果
+        """
         try:
             redis_key = self._build_key(key)
-            current_time = int(time.time())
-            redis = await redis_client.get_client()
-
-            # 使用 Sorted Set 实现滑动窗口
-            await redis.zremrangebyscore(redis_key, 0, current_time - window)
-            count = await redis.zcard(redis_key)
+            now_ms = int(time.time() * 1000)
+            window_ms = window * 1000
 
-            if count >= limit:
-                return False
+            if self._approximate:
+                result = await redis_client.eval_script(
+                    _APPROXIMATE_WINDOW_SCRIPT,
+                    keys=[redis_key],
+                    args=[now_ms, window_ms, limit],
+                )
+            else:
+                result = await redis_client.eval_script(
+                    _SLIDING_WINDOW_SCRIPT,
+                    keys=[redis_key],
+                    args=[
+                        now_ms,
+                        window_ms,
+                        limit,
+                        f"{now_ms}-{uuid.uuid4().hex[:8]}",
+                    ],
+                )
 
-            await redis.zadd(
-                redis_key, {f"{current_time}-{uuid.uuid4().hex[:8]}": current_time}
+            allowed, remaining, retry_after_ms, reset_after_ms = result
+            return RateLimitResult(
+                allowed=int(allowed) == 1,
+                remaining=max(int(remaining), 0),
+                retry_after_ms=int(retry_after_ms),
+                reset_after_ms=int(reset_after_ms),
             )
-            await redis.expire(redis_key, window + 1)
-
-            return True
 
         except Exception as e:
             logger.warning(f"Redis rate limit failed, using local fallback: {e}")
             return self._local_check(key, limit, window)
 
-    def _local_check(self, key: str, limit: int, window: int) -> bool:
+    def _local_check(self, key: str, limit: int, window: int) -> RateLimitResult:
         """本地限流降级"""
-        current_time = int(time.time())
+        current_time = time.time()
 
         if key not in self._local_limits:
             self._local_limits[key] = []
@@ -56,25 +208,38 @@ class RedisRateLimiter:
         self._local_limits[key] = [
             t for t in self._local_limits[key] if current_time - t < window
         ]
+        timestamps = self._local_limits[key]
 
         # 检查是否超限
-        if len(self._local_limits[key]) >= limit:
-            return False
+        if len(timestamps) >= limit:
+            retry_after = window
+            if timestamps and limit > 0:
+                oldest = timestamps[len(timestamps) - limit]
+                retry_after = oldest + window - current_time
+            retry_after_ms = max(int(retry_after * 1000), 0)
+            return RateLimitResult(
+                allowed=False,
+                remaining=0,
+                retry_after_ms=retry_after_ms,
+                reset_after_ms=retry_after_ms,
+            )
 
         # 添加当前请求
-        self._local_limits[key].append(current_time)
-
-        # 清理空的 key
-        if not self._local_limits[key]:
-            del self._local_limits[key]
+        timestamps.append(current_time)
 
         # 定期清理过期的 key（每 100 次检查一次）
         if id(key) % 100 == 0:
             self._cleanup_expired_keys(window, current_time)
 
-        return True
+        reset_after = timestamps[0] + window - current_time
+        return RateLimitResult(
+            allowed=True,
+            remaining=limit - len(timestamps),
+            retry_after_ms=0,
+            reset_after_ms=max(int(reset_after * 1000), 0),
+        )
 
-    def _cleanup_expired_keys(self, window: int, current_time: int) -> None:
+    def _cleanup_expired_keys(self, window: int, current_time: float) -> None:
         """清理过期的限流 key"""
         keys_to_delete = []
         for k, timestamps in self._local_limits.items():
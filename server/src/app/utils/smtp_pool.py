@@ -0,0 +1,173 @@
+"""SMTP 连接池
+
+复用已完成 STARTTLS 和登录的 SMTP 连接，避免每封邮件都重新建连握手。
+
+- 空闲超过 pool_idle_timeout 的连接直接关闭
+- 空闲超过 pool_health_check_interval 的连接复用前先发 NOOP 检查
+- 每个连接发送 pool_max_messages_per_connection 封后回收重建
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.message import EmailMessage
+from typing import Any, AsyncIterator
+
+import aiosmtplib
+
+from app.core.config import SMTPSettings
+from app.utils.logger import logger
+
+
+@dataclass
+class _PooledConnection:
+    """池中的连接"""
+
+    smtp: aiosmtplib.SMTP
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+    messages_sent: int = 0
+
+
+class SMTPConnectionPool:
+    """SMTP 连接池"""
+
+    def __init__(self, config: SMTPSettings) -> None:
+        """
+        初始化连接池
+
+        Args:
+            config: SMTP 配置
+        """
+        self.config = config
+        self._idle: deque[_PooledConnection] = deque()
+        # 延迟创建，绑定到实际运行的事件循环
+        self._semaphore: asyncio.Semaphore | None = None
+        self._in_use = 0
+        self._created = 0
+        self._reused = 0
+        self._recycled = 0
+        self._health_check_failures = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.config.pool_size)
+        return self._semaphore
+
+    async def _create_connection(self) -> _PooledConnection:
+        """新建连接（connect 时完成 STARTTLS 和登录）"""
+        # 端口 587: STARTTLS (start_tls=True)
+        # 端口 465: SSL/TLS (use_tls=True)
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.host,
+            port=self.config.port,
+            username=self.config.username or None,
+            password=self.config.password or None,
+            start_tls=(self.config.port == 587),
+            use_tls=(self.config.port == 465),
+            timeout=self.config.timeout,
+        )
+        await smtp.connect()
+        self._created += 1
+        return _PooledConnection(smtp=smtp)
+
+    async def _close_connection(self, conn: _PooledConnection) -> None:
+        """关闭连接，忽略错误"""
+        try:
+            if conn.smtp.is_connected:
+                await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+
+    async def _take_idle(self) -> _PooledConnection | None:
+        """取出一个可用的空闲连接，过期或检查失败的连接直接关闭"""
+        while self._idle:
+            # 后进先出：优先复用最近用过的连接
+            conn = self._idle.pop()
+            idle_seconds = time.monotonic() - conn.last_used_at
+
+            expired = idle_seconds > self.config.pool_idle_timeout
+            if expired or not conn.smtp.is_connected:
+                await self._close_connection(conn)
+                continue
+
+            if idle_seconds > self.config.pool_health_check_interval:
+                try:
+                    await conn.smtp.noop()
+                except Exception:
+                    self._health_check_failures += 1
+                    await self._close_connection(conn)
+                    continue
+
+            self._reused += 1
+            return conn
+        return None
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """
+        借用一个连接
+
+        块内抛出异常时连接被丢弃，否则归还到池中。
+        """
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        self._in_use += 1
+        conn: _PooledConnection | None = None
+        try:
+            conn = await self._take_idle() or await self._create_connection()
+            yield conn.smtp
+        except BaseException:
+            if conn is not None:
+                await self._close_connection(conn)
+            raise
+        else:
+            await self._release(conn)
+        finally:
+            self._in_use -= 1
+            semaphore.release()
+
+    async def _release(self, conn: _PooledConnection) -> None:
+        """归还连接，达到发送上限的连接回收"""
+        conn.messages_sent += 1
+        conn.last_used_at = time.monotonic()
+        if conn.messages_sent >= self.config.pool_max_messages_per_connection:
+            self._recycled += 1
+            await self._close_connection(conn)
+            return
+        self._idle.append(conn)
+
+    async def send_message(self, message: EmailMessage) -> None:
+        """
+        通过池中连接发送邮件
+
+        复用的连接在发送时被服务端断开，换一个新连接重试一次。
+        """
+        try:
+            async with self.connection() as smtp:
+                await smtp.send_message(message)
+            return
+        except (aiosmtplib.SMTPServerDisconnected, ConnectionError) as e:
+            logger.warning(f"SMTP connection dropped, retrying with a new one: {e}")
+
+        async with self.connection() as smtp:
+            await smtp.send_message(message)
+
+    async def close(self) -> None:
+        """关闭所有空闲连接"""
+        while self._idle:
+            await self._close_connection(self._idle.pop())
+
+    def get_stats(self) -> dict[str, Any]:
+        """获取连接池统计"""
+        return {
+            "pool_size": self.config.pool_size,
+            "in_use": self._in_use,
+            "idle": len(self._idle),
+            "created": self._created,
+            "reused": self._reused,
+            "recycled": self._recycled,
+            "health_check_failures": self._health_check_failures,
+        }
@@ -38,6 +38,18 @@ def pytest_configure(config):
     os.environ["PYTHONWARNINGS"] = "ignore::pytest.PytestUnraisableExceptionWarning"
 
 
+def pytest_collection_modifyitems(config, items):
+    """基准测试默认跳过，设置 RUN_BENCHMARKS=1 时运行"""
+    import os
+
+    if os.getenv("RUN_BENCHMARKS") == "1":
+        return
+    skip_benchmark = pytest.mark.skip(reason="设置 RUN_BENCHMARKS=1 运行基准测试")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 # 在会话开始时设置警告过滤器
 @pytest.fixture(scope="session", autouse=True)
 def setup_warnings():
@@ -230,6 +242,43 @@ async def cleanup_db_connections():
         pass  # 忽略清理过程中的错误
 
 
+@pytest.fixture
+async def sqlite_db(tmp_path):
+    """使用临时 SQLite 数据库作为全局引擎（不依赖 MySQL）
+
+    SQLite 的 BIGINT 主键不会自增，插入时需要显式指定 id。
+    """
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    import app.core.database as database
+
+    # 导入所有 models 以确保 SQLAlchemy 能发现所有模型
+    import app.models  # noqa: F401
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    # sqlite3 驱动不会在 SAVEPOINT 前发 BEGIN，最外层 RELEASE 会直接提交；
+    # 关闭驱动的事务处理，由 SQLAlchemy 显式 BEGIN（与 MySQL 行为一致）
+    @event.listens_for(engine.sync_engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    async with engine.begin() as conn:
+        await conn.run_sync(database.Base.metadata.create_all)
+
+    database._engine = engine
+    database._session_factory = None
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+        database.reset_engine_for_test()
+
+
 # Shared fixtures for integration tests
 @pytest.fixture
 async def test_db():
@@ -0,0 +1,57 @@
+"""
+客户端登录：合并游客设备数据
+"""
+
+from app.api.client import auth_client
+
+USER_ID = 1
+DEVICE_ID = "device-1"
+
+
+async def test_merge_anonymous_usage_merges_counters_and_quota(monkeypatch):
+    merged: list[tuple[str, int, str]] = []
+
+    async def merge_counters(user_id: int, device_id: str) -> dict:
+        merged.append(("counter", user_id, device_id))
+        return {}
+
+    async def merge_quota(user_id: int, device_id: str) -> int:
+        merged.append(("quota", user_id, device_id))
+        return 0
+
+    monkeypatch.setattr(
+        auth_client.counter_service, "merge_anonymous_to_user", merge_counters
+    )
+    monkeypatch.setattr(
+        auth_client.quota_service, "merge_anonymous_to_user", merge_quota
+    )
+
+    await auth_client._merge_anonymous_usage(USER_ID, DEVICE_ID)
+
+    assert sorted(merged) == [
+        ("counter", USER_ID, DEVICE_ID),
+        ("quota", USER_ID, DEVICE_ID),
+    ]
+
+
+async def test_merge_anonymous_usage_failure_does_not_block_login(monkeypatch):
+    merged: list[str] = []
+
+    async def merge_counters(user_id: int, device_id: str) -> dict:
+        raise ConnectionError("redis down")
+
+    async def merge_quota(user_id: int, device_id: str) -> int:
+        merged.append("quota")
+        return 0
+
+    monkeypatch.setattr(
+        auth_client.counter_service, "merge_anonymous_to_user", merge_counters
+    )
+    monkeypatch.setattr(
+        auth_client.quota_service, "merge_anonymous_to_user", merge_quota
+    )
+
+    # 计数合并失败时配额仍然合并，且不抛出异常
+    await auth_client._merge_anonymous_usage(USER_ID, DEVICE_ID)
+
+    assert merged == ["quota"]
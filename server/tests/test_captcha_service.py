@@ -0,0 +1,26 @@
+"""
+验证码预渲染池
+"""
+
+import base64
+
+from app.constants.auth import CAPTCHA_LENGTH
+from app.services.captcha_service import captcha_service
+
+
+async def test_render_pool_uses_spawned_workers():
+    await captcha_service.start()
+    try:
+        assert captcha_service._executor is not None
+        # 应用进程是多线程的，渲染进程不能 fork
+        assert captcha_service._executor._mp_context.get_start_method() == "spawn"
+
+        text, image_data = await captcha_service._take()
+
+        assert len(text) == CAPTCHA_LENGTH
+        assert base64.b64decode(image_data).startswith(b"\x89PNG")
+    finally:
+        await captcha_service.stop()
+
+    assert captcha_service._task is None
+    assert captcha_service._executor is None
@@ -0,0 +1,89 @@
+"""
+请求级数据库会话（DBSessionMiddleware）
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import get_async_session, session_scope
+from app.middleware import DBSessionMiddleware
+from app.models.order_model import OrderModel
+from app.services.order_service import order_service
+
+
+def _make_order(order_id: int) -> OrderModel:
+    return OrderModel(  # type: ignore[call-arg]
+        id=order_id,
+        order_no=f"NO{order_id}",
+        user_id=1,
+        product_class=1,
+        product_id="p1",
+        product_name="product",
+        cash=100,
+        expired_at=0,
+    )
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/orders/{order_id}")
+    async def create_order(order_id: int, status_code: int = 200) -> JSONResponse:
+        # BaseService.create 内部调用 commit，作用域内只 flush
+        await order_service.create(_make_order(order_id))
+        if status_code == 599:
+            raise RuntimeError("handler failed after write")
+        return JSONResponse({"id": order_id}, status_code=status_code)
+
+    app.add_middleware(DBSessionMiddleware)
+    return app
+
+
+async def _order_ids() -> list[int]:
+    async with get_async_session(scoped=False) as db:
+        result = await db.execute(select(OrderModel.id).order_by(OrderModel.id))
+        return list(result.scalars().all())
+
+
+@pytest.fixture
+async def client(sqlite_db):
+    transport = ASGITransport(app=_build_app(), raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+async def test_success_response_commits_write(client):
+    response = await client.post("/orders/1")
+
+    assert response.status_code == 200
+    assert await _order_ids() == [1]
+
+
+async def test_server_error_response_rolls_back_write(client):
+    response = await client.post("/orders/2", params={"status_code": 500})
+
+    assert response.status_code == 500
+    assert await _order_ids() == []
+
+
+async def test_unhandled_exception_rolls_back_write(client):
+    response = await client.post("/orders/3", params={"status_code": 599})
+
+    assert response.status_code == 500
+    assert await _order_ids() == []
+
+
+async def test_caught_service_error_only_rolls_back_that_call(sqlite_db):
+    async with session_scope():
+        await order_service.create(_make_order(1))
+        await order_service.create(_make_order(2))
+        # 订单号唯一约束冲突：update_where 内部回滚后抛出，调用方捕获后继续
+        with pytest.raises(IntegrityError):
+            await order_service.update_where({"id": 2}, order_no="NO1")
+        await order_service.create(_make_order(3))
+
+    assert await _order_ids() == [1, 2, 3]
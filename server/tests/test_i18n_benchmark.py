@@ -0,0 +1,134 @@
+"""
+翻译与 Accept-Language 解析微基准
+
+与未优化的实现对比，速度退化到阈值以下时失败：
+- translate：对比逐层查找嵌套字典（平铺表之前的实现）
+- Accept-Language：对比不走缓存的解析
+
+运行：RUN_BENCHMARKS=1 pytest tests/test_i18n_benchmark.py -s
+"""
+
+import json
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+from starlette.requests import Request
+
+from app.i18n.dependencies import (
+    DEFAULT_LANGUAGE,
+    LANGUAGE_MAPPING,
+    parse_accept_language,
+)
+from app.i18n.translator import translator
+from app.utils.common import get_locale
+
+pytestmark = pytest.mark.benchmark
+
+ITERATIONS = 200_000
+REPEAT = 5
+LANGUAGES = ("en-US", "zh-CN", "zh")
+ACCEPT_LANGUAGE = "zh-CN,zh;q=0.9,en;q=0.8"
+
+# 最低加速比，留出余量避免机器抖动误报
+MIN_TRANSLATE_SPEEDUP = 1.3
+MIN_ACCEPT_LANGUAGE_SPEEDUP = 3.0
+
+LOCALES_DIR = Path(__file__).parent.parent / "src/app/i18n/locales"
+
+
+def _load_nested() -> dict[str, Any]:
+    """按语言加载原始嵌套翻译"""
+    nested = {}
+    for json_file in LOCALES_DIR.glob("*.json"):
+        with open(json_file, encoding="utf-8") as f:
+            nested[json_file.stem] = json.load(f)
+    return nested
+
+
+def _sample_keys(nested: dict[str, Any], limit: int = 50) -> list[str]:
+    """取 en-US 中的前若干个点分键"""
+    keys: list[str] = []
+
+    def walk(node: dict, prefix: str) -> None:
+        for key, value in node.items():
+            if isinstance(value, dict):
+                walk(value, f"{prefix}{key}.")
+            else:
+                keys.append(f"{prefix}{key}")
+
+    walk(nested["en-US"], "")
+    return keys[:limit]
+
+
+def _naive_translator(nested: dict[str, Any]) -> Callable[..., str]:
+    """平铺表之前的 translate：每次按点拆分键并逐层查找"""
+
+    def translate(key: str, language: str = DEFAULT_LANGUAGE, **kwargs: Any) -> str:
+        lang = LANGUAGE_MAPPING.get(language, DEFAULT_LANGUAGE)
+        translations = nested.get(lang, {})
+        for k in key.split("."):
+            translations = translations.get(k, {})
+        if isinstance(translations, str):
+            if kwargs:
+                return translations.format(**kwargs)
+            return translations
+        return key
+
+    return translate
+
+
+def _best_ns_per_op(func: Callable[[], None], ops_per_call: int) -> float:
+    """多轮取最快一轮，返回每次操作的纳秒数"""
+    number = max(ITERATIONS // ops_per_call, 1)
+    best = min(timeit.repeat(func, number=number, repeat=REPEAT))
+    return best / (number * ops_per_call) * 1e9
+
+
+def test_translate_benchmark():
+    nested = _load_nested()
+    keys = _sample_keys(nested)
+    cases = [(key, lang) for lang in LANGUAGES for key in keys]
+    translate = translator.translate
+    naive_translate = _naive_translator(nested)
+    for key, lang in cases:
+        assert translate(key, lang) == naive_translate(key, lang)
+
+    def run() -> None:
+        for key, lang in cases:
+            translate(key, lang)
+
+    def run_naive() -> None:
+        for key, lang in cases:
+            naive_translate(key, lang)
+
+    optimized = _best_ns_per_op(run, len(cases))
+    naive = _best_ns_per_op(run_naive, len(cases))
+    print(f"\ntranslate: {optimized:.0f} ns/op, nested lookup: {naive:.0f} ns/op")
+
+    assert naive / optimized >= MIN_TRANSLATE_SPEEDUP
+
+
+def test_accept_language_benchmark():
+    uncached = parse_accept_language.__wrapped__
+    assert parse_accept_language(ACCEPT_LANGUAGE) == uncached(ACCEPT_LANGUAGE)
+
+    cached = _best_ns_per_op(lambda: parse_accept_language(ACCEPT_LANGUAGE), 1)
+    parsed = _best_ns_per_op(lambda: uncached(ACCEPT_LANGUAGE), 1)
+
+    request = Request(
+        {
+            "type": "http",
+            "headers": [(b"accept-language", ACCEPT_LANGUAGE.encode())],
+        }
+    )
+    assert get_locale(request).language == "zh-CN"
+    locale = _best_ns_per_op(lambda: get_locale(request), 1)
+
+    print(
+        f"\nparse_accept_language: {cached:.0f} ns/op cached, "
+        f"{parsed:.0f} ns/op uncached; get_locale: {locale:.0f} ns/op"
+    )
+
+    assert parsed / cached >= MIN_ACCEPT_LANGUAGE_SPEEDUP
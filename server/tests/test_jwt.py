@@ -0,0 +1,30 @@
+"""
+JWT 签发与解码
+"""
+
+from app.constants.auth import TokenType
+from app.utils.jwt import JwtData, JwtUnit
+from app.utils.time import timestamp_now
+
+
+def test_access_token_round_trip():
+    before = timestamp_now()
+    token, expire = JwtUnit.create_access_token(JwtData(user_id=1, email="a@b.c"))
+
+    jwt_data = JwtUnit.decode_token(token)
+
+    assert jwt_data is not None
+    assert jwt_data.user_id == 1
+    assert jwt_data.type == TokenType.USER_ACCESS
+    assert jwt_data.exp == expire
+    assert before <= jwt_data.iat_ms <= timestamp_now()
+
+
+def test_refresh_token_round_trip():
+    token, _ = JwtUnit.create_refresh_token(JwtData(user_id=2, email="a@b.c"))
+
+    jwt_data = JwtUnit.decode_token(token)
+
+    assert jwt_data is not None
+    assert jwt_data.type == TokenType.USER_REFRESH
+    assert jwt_data.iat_ms > 0
@@ -0,0 +1,62 @@
+"""
+HTTP 中间件吞吐基准
+
+用 httpx ASGITransport 在进程内循环请求 /api 路由，测量
+ErrorHandling → CrossOrigin → RequestLogging 中间件栈的每秒请求数。
+不依赖 MySQL / Redis。
+
+运行：RUN_BENCHMARKS=1 pytest tests/test_middleware_benchmark.py -s
+"""
+
+import logging
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.middleware import (
+    CrossOriginMiddleware,
+    ErrorHandlingMiddleware,
+    RequestLoggingMiddleware,
+)
+
+pytestmark = pytest.mark.benchmark
+
+WARMUP_REQUESTS = 200
+BENCHMARK_REQUESTS = 5000
+
+
+def _build_app() -> FastAPI:
+    """与 main.py 相同顺序的中间件栈"""
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping() -> dict[str, str]:
+        return {"status": "ok"}
+
+    app.add_middleware(ErrorHandlingMiddleware)
+    app.add_middleware(CrossOriginMiddleware)
+    app.add_middleware(RequestLoggingMiddleware)
+    return app
+
+
+async def test_api_requests_per_second(monkeypatch):
+    # 只测中间件本身的开销，关闭逐请求的 INFO 日志输出
+    monkeypatch.setattr(logging.getLogger("server"), "level", logging.WARNING)
+
+    transport = ASGITransport(app=_build_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(WARMUP_REQUESTS):
+            await client.get("/api/ping")
+
+        start = time.perf_counter()
+        for _ in range(BENCHMARK_REQUESTS):
+            response = await client.get("/api/ping")
+            assert response.status_code == 200
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"\n/api/ping: {BENCHMARK_REQUESTS} requests in {elapsed:.2f}s, "
+        f"{BENCHMARK_REQUESTS / elapsed:.0f} req/s"
+    )
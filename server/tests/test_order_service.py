@@ -0,0 +1,125 @@
+"""
+订单服务：状态转换
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event, select
+
+from app.constants.order import OrderStatus
+from app.core.database import get_async_session, session_scope
+from app.models.order_model import OrderModel
+from app.services.order_service import order_service
+
+ORDER_NO = "NO1"
+CONCURRENT_CALLBACKS = 100
+
+
+@pytest.fixture
+async def pending_order(sqlite_db):
+    async with get_async_session() as db:
+        db.add(
+            OrderModel(  # type: ignore[call-arg]
+                id=1,
+                order_no=ORDER_NO,
+                user_id=1,
+                product_class=1,
+                product_id="p1",
+                product_name="product",
+                cash=100,
+                order_status=OrderStatus.PENDING.value,
+                expired_at=0,
+            )
+        )
+        await db.commit()
+    return sqlite_db
+
+
+async def test_concurrent_paid_callbacks_update_once(pending_order):
+    # 统计真正改到行的 UPDATE orders 语句
+    writes = []
+
+    def after_cursor_execute(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE orders") and cursor.rowcount:
+            writes.append(statement)
+
+    event.listen(
+        pending_order.sync_engine, "after_cursor_execute", after_cursor_execute
+    )
+
+    results = await asyncio.gather(
+        *(
+            order_service.update_order_by_no(
+                ORDER_NO,
+                OrderStatus.PAID,
+                channel_order_no=f"CH{i}",
+                paid_at=i,
+            )
+            for i in range(CONCURRENT_CALLBACKS)
+        )
+    )
+
+    assert results.count(True) == 1
+    assert len(writes) == 1
+
+    async with get_async_session() as db:
+        order = (
+            await db.execute(select(OrderModel).where(OrderModel.order_no == ORDER_NO))
+        ).scalar_one()
+    winner = results.index(True)
+    assert order.order_status == OrderStatus.PAID.value
+    assert order.payment_channel_order_no == f"CH{winner}"
+    assert order.paid_at == winner
+
+
+async def test_status_transition_invalidates_order_count(pending_order, monkeypatch):
+    invalidated: list[int] = []
+
+    async def record_invalidation(user_id: int) -> None:
+        invalidated.append(user_id)
+
+    monkeypatch.setattr(order_service, "invalidate_order_count", record_invalidation)
+
+    assert await order_service.update_order_by_no(ORDER_NO, OrderStatus.PAID)
+    assert invalidated == [1]
+
+    # 状态不允许的转换不失效缓存
+    assert not await order_service.update_order_by_no(ORDER_NO, OrderStatus.PAID)
+    assert invalidated == [1]
+
+
+async def test_order_count_invalidated_after_commit(pending_order, monkeypatch):
+    # 失效时读取已提交的数据，确认缓存删除发生在提交之后
+    statuses_seen: list[int] = []
+
+    async def record_invalidation(user_id: int) -> None:
+        async with get_async_session(scoped=False) as db:
+            stmt = select(OrderModel.order_status).where(
+                OrderModel.order_no == ORDER_NO
+            )
+            statuses_seen.append((await db.execute(stmt)).scalar_one())
+
+    monkeypatch.setattr(order_service, "invalidate_order_count", record_invalidation)
+
+    async with session_scope():
+        assert await order_service.update_order_by_no(ORDER_NO, OrderStatus.PAID)
+        assert statuses_seen == []
+
+    assert statuses_seen == [OrderStatus.PAID.value]
+
+
+async def test_order_count_not_invalidated_on_rollback(pending_order, monkeypatch):
+    invalidated: list[int] = []
+
+    async def record_invalidation(user_id: int) -> None:
+        invalidated.append(user_id)
+
+    monkeypatch.setattr(order_service, "invalidate_order_count", record_invalidation)
+
+    with pytest.raises(RuntimeError):
+        async with session_scope():
+            assert await order_service.update_order_by_no(ORDER_NO, OrderStatus.PAID)
+            raise RuntimeError("request failed")
+
+    assert invalidated == []
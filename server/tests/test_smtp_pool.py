@@ -0,0 +1,191 @@
+"""
+SMTP 连接池（本地 aiosmtpd 服务器）
+"""
+
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.core.config import SMTPSettings
+from app.utils.smtp_pool import SMTPConnectionPool
+
+
+class _RecordingHandler:
+    """记录收到的邮件和所属连接，可让服务端在下一次 MAIL / NOOP 时断开连接"""
+
+    def __init__(self) -> None:
+        self.messages: list[tuple[tuple[str, int], str]] = []
+        self.noops = 0
+        self.drop_next_mail = False
+        self.drop_next_noop = False
+
+    async def handle_NOOP(self, server, session, envelope, arg):
+        if self.drop_next_noop:
+            self.drop_next_noop = False
+            server.transport.close()
+            return "421 Closing connection"
+        self.noops += 1
+        return "250 OK"
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        if self.drop_next_mail:
+            self.drop_next_mail = False
+            server.transport.close()
+            return "421 Closing connection"
+        envelope.mail_from = address
+        envelope.mail_options.extend(mail_options)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.content.decode()))
+        return "250 Message accepted"
+
+    @property
+    def connections(self) -> set[tuple[str, int]]:
+        return {peer for peer, _ in self.messages}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = _RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    try:
+        yield handler, controller.port
+    finally:
+        controller.stop()
+
+
+def _make_pool(port: int, **overrides) -> SMTPConnectionPool:
+    # 非 587/465 端口且不配置账号：明文连接，不做 STARTTLS 和登录
+    options = {"pool_size": 2, "pool_health_check_interval": 60, **overrides}
+    config = SMTPSettings(
+        host="127.0.0.1",
+        port=port,
+        username="",
+        password="",
+        **options,
+    )
+    return SMTPConnectionPool(config)
+
+
+def _make_message(index: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "noreply@example.com"
+    message["To"] = "user@example.com"
+    message["Subject"] = f"message {index}"
+    message.set_content(f"body {index}")
+    return message
+
+
+async def test_connection_is_reused(smtp_server):
+    handler, port = smtp_server
+    pool = _make_pool(port)
+    try:
+        for i in range(3):
+            await pool.send_message(_make_message(i))
+    finally:
+        await pool.close()
+
+    assert len(handler.messages) == 3
+    assert len(handler.connections) == 1
+    stats = pool.get_stats()
+    assert stats["created"] == 1
+    assert stats["reused"] == 2
+
+
+async def test_connection_recycled_after_max_messages(smtp_server):
+    handler, port = smtp_server
+    pool = _make_pool(port, pool_max_messages_per_connection=2)
+    try:
+        for i in range(5):
+            await pool.send_message(_make_message(i))
+    finally:
+        await pool.close()
+
+    assert len(handler.messages) == 5
+    # 2 + 2 + 1
+    assert len(handler.connections) == 3
+    stats = pool.get_stats()
+    assert stats["created"] == 3
+    assert stats["recycled"] == 2
+
+
+async def test_retry_on_server_disconnect(smtp_server):
+    handler, port = smtp_server
+    pool = _make_pool(port)
+    try:
+        await pool.send_message(_make_message(0))
+        # 服务端在复用连接上断开，换新连接重试后送达
+        handler.drop_next_mail = True
+        await pool.send_message(_make_message(1))
+    finally:
+        await pool.close()
+
+    assert [content.count("message 1") for _, content in handler.messages] == [0, 1]
+    assert len(handler.connections) == 2
+    assert pool.get_stats()["created"] == 2
+
+
+async def test_idle_connection_closed_after_timeout(smtp_server):
+    handler, port = smtp_server
+    pool = _make_pool(port, pool_idle_timeout=30)
+    try:
+        await pool.send_message(_make_message(0))
+        # 空闲超过 pool_idle_timeout：关闭并新建，不做 NOOP 检查
+        pool._idle[-1].last_used_at -= 31
+        await pool.send_message(_make_message(1))
+    finally:
+        await pool.close()
+
+    assert len(handler.messages) == 2
+    assert len(handler.connections) == 2
+    assert handler.noops == 0
+    stats = pool.get_stats()
+    assert stats["created"] == 2
+    assert stats["reused"] == 0
+
+
+async def test_health_check_before_reusing_idle_connection(smtp_server):
+    handler, port = smtp_server
+    pool = _make_pool(port, pool_health_check_interval=0)
+    try:
+        for i in range(3):
+            await pool.send_message(_make_message(i))
+    finally:
+        await pool.close()
+
+    # 每次复用前各一次 NOOP
+    assert handler.noops == 2
+    assert len(handler.connections) == 1
+    stats = pool.get_stats()
+    assert stats["created"] == 1
+    assert stats["reused"] == 2
+    assert stats["health_check_failures"] == 0
+
+
+async def test_failed_health_check_replaces_connection(smtp_server):
+    handler, port = smtp_server
+    pool = _make_pool(port, pool_health_check_interval=0)
+    try:
+        await pool.send_message(_make_message(0))
+        # 服务端在 NOOP 时断开：丢弃该连接，新建连接发送
+        handler.drop_next_noop = True
+        await pool.send_message(_make_message(1))
+    finally:
+        await pool.close()
+
+    assert len(handler.messages) == 2
+    assert len(handler.connections) == 2
+    stats = pool.get_stats()
+    assert stats["health_check_failures"] == 1
+    assert stats["created"] == 2
+    assert stats["reused"] == 0
@@ -0,0 +1,104 @@
+"""
+SMTP 连接池吞吐基准
+
+向本地 aiosmtpd 服务器连续发送邮件，对比连接池复用连接与每封邮件
+单独建连（aiosmtplib.send）的每秒发送数，连接池没有更快时失败。
+不依赖外部 SMTP 服务器。
+
+运行：RUN_BENCHMARKS=1 pytest tests/test_smtp_pool_benchmark.py -s
+"""
+
+import socket
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.core.config import SMTPSettings
+from app.utils.smtp_pool import SMTPConnectionPool
+
+pytestmark = pytest.mark.benchmark
+
+HOST = "127.0.0.1"
+WARMUP_MESSAGES = 20
+BENCHMARK_MESSAGES = 500
+
+# 最低加速比：本地明文连接没有 TLS 握手和登录，差距远小于真实服务器，
+# 留出余量避免机器抖动误报
+MIN_POOL_SPEEDUP = 1.1
+
+
+class _CountingHandler:
+    """只统计收到的邮件数"""
+
+    def __init__(self) -> None:
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def _make_message(index: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "noreply@example.com"
+    message["To"] = "user@example.com"
+    message["Subject"] = f"message {index}"
+    message.set_content(f"body {index}")
+    return message
+
+
+async def _messages_per_second(send, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        await send(_make_message(i))
+    return count / (time.perf_counter() - start)
+
+
+async def test_pool_messages_per_second():
+    handler = _CountingHandler()
+    controller = Controller(handler, hostname=HOST, port=_free_port())
+    controller.start()
+
+    # 非 587/465 端口且不配置账号：明文连接，不做 STARTTLS 和登录
+    config = SMTPSettings(
+        host=HOST,
+        port=controller.port,
+        username="",
+        password="",
+        pool_size=1,
+        pool_max_messages_per_connection=WARMUP_MESSAGES + BENCHMARK_MESSAGES,
+    )
+    pool = SMTPConnectionPool(config)
+
+    async def send_per_message(message: EmailMessage) -> None:
+        await aiosmtplib.send(message, hostname=HOST, port=controller.port)
+
+    try:
+        await _messages_per_second(pool.send_message, WARMUP_MESSAGES)
+        await _messages_per_second(send_per_message, WARMUP_MESSAGES)
+
+        pooled = await _messages_per_second(pool.send_message, BENCHMARK_MESSAGES)
+        unpooled = await _messages_per_second(send_per_message, BENCHMARK_MESSAGES)
+        stats = pool.get_stats()
+    finally:
+        await pool.close()
+        controller.stop()
+
+    print(
+        f"\nSMTP {BENCHMARK_MESSAGES} messages: pool {pooled:.0f} msg/s, "
+        f"per-message connection {unpooled:.0f} msg/s "
+        f"({pooled / unpooled:.1f}x)"
+    )
+
+    assert handler.received == 2 * (WARMUP_MESSAGES + BENCHMARK_MESSAGES)
+    assert stats["created"] == 1
+    assert pooled / unpooled >= MIN_POOL_SPEEDUP